@@ -0,0 +1,166 @@
+# benchmark.py
+# This script measures how the bot's pipeline scales on synthetic data. It generates a
+# deterministic Odds API payload (see payload_generator.py) and times each stage:
+#   1. Parsing: process_api_data turning the raw payload into Game objects.
+#   2. Analysis: the surebet engine (and middle detection) over every market.
+#   3. Formatting: building the Telegram message of every surebet found.
+# For each stage it reports throughput, latency percentiles and peak memory, and appends
+# the results to a JSON Lines file so regressions between versions are easy to spot.
+#
+# Example:
+#   python benchmark.py --games 500 --bookmakers 30 --lines 4 --engine numpy
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import time
+import tracemalloc
+import config
+from main import process_api_data, select_markets, analyze_markets
+from notifier import format_surebet_alert
+from payload_generator import generate_payload
+
+def percentile(samples: list[float], fraction: float) -> float:
+    """Returns the value below which the given fraction of the sorted samples fall."""
+    ordered = sorted(samples)
+    index = min(int(round(fraction * (len(ordered) - 1))), len(ordered) - 1)
+    return ordered[index]
+
+def measure(stage, repeat: int) -> tuple[list[float], int, object]:
+    """
+    Runs a stage several times, timing each run, then once more under tracemalloc.
+
+    Args:
+        stage: A function with no arguments that runs the stage and returns its output.
+        repeat: How many timed runs to do.
+
+    Returns:
+        A tuple (run_times_in_seconds, peak_memory_in_bytes, output_of_the_last_run).
+    """
+    run_times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        output = stage()
+        run_times.append(time.perf_counter() - started)
+
+    # Memory is measured in a separate run, because tracemalloc slows the code down.
+    tracemalloc.start()
+    output = stage()
+    peak_memory = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return run_times, peak_memory, output
+
+def summarize(run_times: list[float], peak_memory: int, items: int) -> dict:
+    """Builds the report of one stage: throughput in items per second and latencies in milliseconds."""
+    return {
+        'items': items,
+        'throughput_per_s': items / statistics.mean(run_times) if items else 0.0,
+        'p50_ms': percentile(run_times, 0.50) * 1000,
+        'p95_ms': percentile(run_times, 0.95) * 1000,
+        'p99_ms': percentile(run_times, 0.99) * 1000,
+        'peak_memory_mb': peak_memory / (1024 * 1024)
+    }
+
+def git_revision() -> str:
+    """Returns the current git commit, so each result can be tied to a version of the code."""
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+def run_benchmark(args: argparse.Namespace) -> dict:
+    """
+    Generates the payload and benchmarks every stage of the pipeline.
+
+    Args:
+        args: The parsed command-line arguments.
+
+    Returns:
+        A dictionary with the parameters, environment and per-stage results.
+    """
+    config.SUREBET_ENGINE = args.engine
+    payload = generate_payload(games=args.games, bookmakers=args.bookmakers, markets=tuple(args.markets.split(',')),
+                               lines=args.lines, surebet_density=args.density, include_draw=args.draw, seed=args.seed)
+    odds_count = sum(len(market['outcomes']) for game in payload for bookmaker in game['bookmakers'] for market in bookmaker['markets'])
+
+    parse_times, parse_memory, games = measure(lambda: process_api_data(payload), args.repeat)
+    market_pairs = select_markets(games)
+    analyze_times, analyze_memory, surebets = measure(lambda: analyze_markets(market_pairs), args.repeat)
+    format_times, format_memory, _ = measure(lambda: [format_surebet_alert(surebet) for surebet in surebets], args.repeat)
+
+    return {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'revision': git_revision(),
+        'python': platform.python_version(),
+        'params': {
+            'games': args.games, 'bookmakers': args.bookmakers, 'markets': args.markets, 'lines': args.lines,
+            'density': args.density, 'draw': args.draw, 'seed': args.seed, 'engine': args.engine, 'repeat': args.repeat
+        },
+        'counts': {'odds': odds_count, 'markets': len(market_pairs), 'surebets': len(surebets)},
+        'stages': {
+            'parse': summarize(parse_times, parse_memory, odds_count),
+            'analyze': summarize(analyze_times, analyze_memory, len(market_pairs)),
+            'format': summarize(format_times, format_memory, len(surebets))
+        }
+    }
+
+def output_path(path: str) -> str:
+    """Returns the path of the results file (relative paths are resolved from the project folder)."""
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), path)
+
+def previous_result(path: str, params: dict) -> dict | None:
+    """Finds the most recent saved result that was run with exactly the same parameters."""
+    if not os.path.exists(path):
+        return None
+    match = None
+    with open(path, encoding='utf-8') as file:
+        for line in file:
+            result = json.loads(line)
+            if result['params'] == params:
+                match = result
+    return match
+
+def print_report(result: dict, baseline: dict | None):
+    """Prints the results as a table, comparing the median latency with the baseline when there is one."""
+    counts = result['counts']
+    print(f"\n--- BENCHMARK ({result['revision']}, engine: {result['params']['engine']}) ---")
+    print(f"{counts['odds']} odds, {counts['markets']} markets, {counts['surebets']} surebets\n")
+    print(f"{'Stage':<10}{'Items/s':>14}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'Peak MB':>10}{'vs base':>10}")
+    for name, stage in result['stages'].items():
+        change = ''
+        if baseline and baseline['stages'][name]['p50_ms']:
+            change = f"{(stage['p50_ms'] / baseline['stages'][name]['p50_ms'] - 1) * 100:+.1f}%"
+        print(f"{name:<10}{stage['throughput_per_s']:>14,.0f}{stage['p50_ms']:>10.2f}{stage['p95_ms']:>10.2f}"
+              f"{stage['p99_ms']:>10.2f}{stage['peak_memory_mb']:>10.2f}{change:>10}")
+    if baseline:
+        print(f"\nBaseline: revision {baseline['revision']} from {baseline['timestamp']}.")
+
+def parse_arguments() -> argparse.Namespace:
+    """Defines and parses the command-line options."""
+    parser = argparse.ArgumentParser(description="Benchmark parsing, analysis and alert formatting on synthetic odds.")
+    parser.add_argument('--games', type=int, default=200, help="Number of games in the payload.")
+    parser.add_argument('--bookmakers', type=int, default=20, help="Number of bookmakers per game.")
+    parser.add_argument('--markets', default='h2h,totals,spreads', help="Comma-separated market keys.")
+    parser.add_argument('--lines', type=int, default=3, help="Lines per totals/spreads market.")
+    parser.add_argument('--density', type=float, default=0.01, help="Share of markets with an injected surebet.")
+    parser.add_argument('--draw', action='store_true', help="Use 3-way h2h markets (Home/Draw/Away).")
+    parser.add_argument('--seed', type=int, default=42, help="Seed of the payload generator.")
+    parser.add_argument('--engine', choices=['python', 'numpy', 'process'], default=config.SUREBET_ENGINE, help="Surebet engine to benchmark.")
+    parser.add_argument('--repeat', type=int, default=20, help="Timed runs per stage.")
+    parser.add_argument('--output', default='benchmark_results.jsonl', help="JSON Lines file where results are appended, relative to the project folder.")
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    args = parse_arguments()
+    path = output_path(args.output)
+    result = run_benchmark(args)
+    print_report(result, previous_result(path, result['params']))
+
+    with open(path, 'a', encoding='utf-8') as file:
+        file.write(json.dumps(result) + '\n')
+    print(f"\nResults appended to '{path}'.")
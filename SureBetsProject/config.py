@@ -4,16 +4,84 @@
 API_KEY = ''  # Your key from The Odds API.
 TARGET_SPORTS = [
     'soccer_brazil_serie_b', 'soccer_conmebol_copa_libertadores'
-]  # Sports to scan for odds.
+]  # Sports to scan for odds. Wildcards like 'soccer_*' are allowed when the sports catalog is enabled.
 TARGET_MARKETS = 'totals,spreads'  # Bet markets to fetch (h2h, totals, spreads).
 REGIONS = 'eu,uk,us,br,au'  # Bookmaker regions to check.
 ODDS_FORMAT = 'decimal'  # 'decimal' or 'american' odds format.
+ODDS_API_BASE_URL = 'https://api.the-odds-api.com/v4'  # Change to point the bot at a local mock (see load_harness.py).
+
+# --- Fetching ---
+CONCURRENT_FETCH_ENABLED = True  # Fetch all target sports in parallel instead of one by one.
+MAX_CONCURRENT_REQUESTS = 8  # Maximum number of API requests in flight at the same time.
+STREAMING_PARSE_ENABLED = False  # Parse responses game by game instead of loading the whole payload.
+
+# --- Request Planner ---
+REQUEST_PLANNER_ENABLED = False  # Learn which markets and bookmakers supply the best prices and only request those.
+PLANNER_FULL_SWEEP_EVERY = 6  # One poll in this many requests every market in every region, to relearn.
+PLANNER_COVERAGE = 0.95  # Share of a market's best prices the requested bookmakers must have supplied.
+PLANNER_MAX_BOOKMAKERS = 10  # Bookmakers per shaped request (the API bills every 10 bookmakers as one region).
+PLANNER_MARKET_MARGIN = 0.05  # Markets are requested if their best prices came within this of an arbitrage.
+HOT_SPORT_SPEEDUP = 2.0  # With the planner enabled and quota to spare, volatile sports are polled up to this many times more often.
+
+# --- HTTP Cache ---
+CACHE_ENABLED = True  # Share compressed API snapshots on disk between runs and processes.
+CACHE_DIR = '.cache'  # Cache folder, relative to the project folder.
+CACHE_TTL_SECONDS = {  # How long a snapshot is reused without asking the API again, per endpoint.
+    'odds': 30,
+    'sports': 3600
+}
+
+# --- Sports Catalog ---
+SPORTS_CATALOG_ENABLED = True  # Resolve wildcards in TARGET_SPORTS and skip inactive or idle sports.
+SPORT_IDLE_AFTER_HOURS = 24  # A sport that returned no games for this long is skipped...
+SPORT_IDLE_RECHECK_HOURS = 6  # ...except for one check every this many hours, to notice when its season starts.
+SPORTS_STATE_PATH = 'sports_state.json'  # Per-sport activity state, relative to the project folder.
+
+# --- Analysis ---
+SUREBET_ENGINE = 'python'  # 'python' (game by game), 'numpy' (vectorized batch) or 'process' (numpy split across worker processes); the last two require NumPy.
+INCREMENTAL_ANALYSIS_ENABLED = True  # In automation mode, only re-analyze markets whose best prices changed.
+GAME_RETENTION_HOURS = 4  # Games are forgotten this long after kickoff (their pre-match odds are dropped at kickoff).
+ANALYSIS_WORKERS = None  # Worker processes of the 'process' engine. None = one per CPU core.
+PARALLEL_MIN_MARKETS = 5000  # Below this many markets in a batch, the 'process' engine analyzes in the main process. With STREAMING_PARSE_ENABLED, changed markets are sent to it in chunks of this size.
+
+# --- Price History ---
+PRICE_HISTORY_ENABLED = True  # Track recent price changes to estimate each surebet's lifetime and send the most urgent alerts first.
+PRICE_HISTORY_SIZE = 8  # Best-price changes kept per outcome and line (ring buffer size).
+DEFAULT_SUREBET_LIFETIME_SECONDS = 300  # Assumed lifetime of a surebet whose prices have not moved yet.
+
+# --- History ---
+HISTORY_ENABLED = False  # Record each cycle's odds and surebets in a local SQLite database.
+HISTORY_DB_PATH = 'odds_history.sqlite3'  # Database file, relative to the project folder.
 
 # --- Telegram ---
+TELEGRAM_API_BASE_URL = 'https://api.telegram.org'  # Change to point the alerts at a local mock (see load_harness.py).
 TELEGRAM_ENABLED = True  # Enable or disable Telegram notifications.
 TELEGRAM_BOT_TOKEN = ''  # Your Telegram bot's token.
 TELEGRAM_CHAT_ID = ''  # The chat ID to send alerts to.
+ALERT_DISPATCHER_ENABLED = True  # Send alerts from a background queue so scans never wait on Telegram.
+ALERT_RATE_PER_SECOND = 1.0  # Average messages per second (Telegram allows about 1 per second per chat).
+ALERT_BURST = 3  # Messages that may be sent back to back before the rate limit kicks in.
+ALERT_BATCH_SIZE = 5  # Waiting surebets combined into a single message.
+ALERT_DEDUP_TTL_MINUTES = 60  # Don't repeat an alert for the same game, market and bookmakers within this time.
 
 # --- Automation ---
 AUTOMATION_ENABLED = True  # Set to True to run scans automatically.
 RUN_INTERVAL_MINUTES = 60  # Minutes between scans when automation is enabled.
+
+# --- Adaptive Scheduling ---
+ADAPTIVE_SCHEDULING_ENABLED = True  # Poll each sport based on kickoff times and odds volatility instead of a fixed interval.
+MIN_POLL_INTERVAL_MINUTES = 5  # Fastest polling rate, used for volatile sports with games about to start.
+KICKOFF_HORIZON_HOURS = 72  # Sports whose next game is further away than this are polled every RUN_INTERVAL_MINUTES.
+ERROR_BACKOFF_MINUTES = 1  # Retry delay after a failed request; doubles on each consecutive failure of the same sport.
+QUOTA_RESERVE = 50  # API requests kept in reserve; polling slows down so they are never spent.
+
+# --- Streaming ---
+STREAM_SOURCE = None  # Feed of the streaming daemon: 'tcp://127.0.0.1:9109' or the path of an NDJSON file to follow. None = polling mode.
+STREAM_QUEUE_SIZE = 10000  # Updates waiting to be processed before the feed readers are slowed down.
+
+# --- Metrics & Profiling ---
+METRICS_ENABLED = False  # Serve Prometheus-style metrics at http://METRICS_HOST:METRICS_PORT/metrics.
+METRICS_HOST = '127.0.0.1'  # Interface of the metrics endpoint (keep it local unless you need remote scraping).
+METRICS_PORT = 9108  # Port of the metrics endpoint.
+PROFILE_CYCLE = None  # Number of the cycle to profile with cProfile and tracemalloc (e.g., 3), or None.
+PROFILE_DIR = 'profiles'  # Folder for profile dumps, relative to the project folder.
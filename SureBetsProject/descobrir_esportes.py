@@ -4,29 +4,17 @@
 
 import requests
 import json
+import config
+from sports_catalog import fetch_sports, resolve_sport_patterns
 
-# IMPORTANT: Paste your API key from The Odds API here to run this script.
+# IMPORTANT: Paste your API key from The Odds API here to run this script (or set it in config.py).
 API_KEY = ''
 
-# The API endpoint for retrieving the list of sports.
-url = 'https://api.the-odds-api.com/v4/sports'
-
-# Set the required parameters for the API request.
-params = {
-    'api_key': API_KEY
-}
-
 print("Fetching the list of all available sports from the API...")
 
 try:
-    # Send the GET request to the API.
-    response = requests.get(url, params=params)
-    
-    # Check if the request was successful (raises an error for 4xx or 5xx responses).
-    response.raise_for_status()  
-
-    # Parse the JSON data from the response.
-    sports_list = response.json()
+    # Get the catalog (reusing a recent snapshot from the on-disk cache when there is one).
+    sports_list = fetch_sports(requests.Session(), API_KEY or config.API_KEY)
 
     print("\nSUCCESS! List of sports received.")
     print("-----------------------------------------")
@@ -35,6 +23,13 @@ try:
     print(json.dumps(sports_list, indent=4))
     print("-----------------------------------------")
 
+    # Show which sports the current TARGET_SPORTS (including wildcard patterns) would check.
+    target_sports = resolve_sport_patterns(config.TARGET_SPORTS, sports_list)
+    inactive = {sport['key'] for sport in sports_list if not sport.get('active')}
+    print(f"TARGET_SPORTS in config.py resolves to {len(target_sports)} sport(s):")
+    for sport_key in target_sports:
+        print(f"  - {sport_key}{' (inactive, will be skipped)' if sport_key in inactive else ''}")
+
 # Handle potential HTTP errors, like an invalid API key or bad request.
 except requests.exceptions.HTTPError as err:
     print(f"\nHTTP Error while fetching data: {err}")
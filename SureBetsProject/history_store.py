@@ -0,0 +1,230 @@
+# history_store.py
+# This module records every cycle's odds and detected surebets in a local SQLite database,
+# so questions like "how long do surebets on bookmaker X survive?" or "which lines move first?"
+# can be answered later with plain SQL.
+#   - The database runs in WAL mode, so readers (e.g., an analysis notebook) never block the bot.
+#   - Rows are handed to a background writer thread and inserted in large batches with
+#     executemany inside a single transaction, so the scan loop only pays for a queue.put().
+#   - Indexes cover the usual lookups: by game, by market, by bookmaker and by time. Each bet of
+#     a surebet also gets a row in 'surebet_legs', so surebets can be looked up by bookmaker.
+#   - The queue is bounded: if the disk falls behind, new records are dropped (and counted)
+#     instead of piling up in memory.
+
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+import config
+from metrics import metrics
+from models import Game, Market
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS odds (
+    recorded_at   REAL    NOT NULL,  -- Unix timestamp of the cycle.
+    sport_key     TEXT,
+    game_id       TEXT    NOT NULL,
+    market_key    TEXT    NOT NULL,
+    line          TEXT    NOT NULL,  -- The market's line (e.g., '2.5'); '0.0' for h2h.
+    outcome       TEXT    NOT NULL,
+    bookmaker     TEXT    NOT NULL,
+    price         REAL    NOT NULL,
+    point         REAL
+);
+CREATE INDEX IF NOT EXISTS idx_odds_game_time      ON odds (game_id, recorded_at);
+CREATE INDEX IF NOT EXISTS idx_odds_market_time    ON odds (game_id, market_key, line, recorded_at);
+CREATE INDEX IF NOT EXISTS idx_odds_bookmaker_time ON odds (bookmaker, recorded_at);
+CREATE INDEX IF NOT EXISTS idx_odds_time           ON odds (recorded_at);
+
+CREATE TABLE IF NOT EXISTS surebets (
+    recorded_at   REAL    NOT NULL,
+    sport_key     TEXT,
+    game_id       TEXT    NOT NULL,
+    home_team     TEXT,
+    away_team     TEXT,
+    commence_time TEXT,
+    type          TEXT    NOT NULL,  -- 'surebet' or 'middle'.
+    market_key    TEXT    NOT NULL,
+    line          TEXT    NOT NULL,
+    bookmakers    TEXT    NOT NULL,  -- Comma-separated bookmakers of the bets, e.g., 'betfair,pinnacle'.
+    profit_margin REAL    NOT NULL,
+    legs          TEXT    NOT NULL   -- JSON list of {name, price, bookmaker, point, stake}.
+);
+CREATE INDEX IF NOT EXISTS idx_surebets_game_time   ON surebets (game_id, recorded_at);
+CREATE INDEX IF NOT EXISTS idx_surebets_market_time ON surebets (game_id, market_key, line, recorded_at);
+CREATE INDEX IF NOT EXISTS idx_surebets_time        ON surebets (recorded_at);
+
+CREATE TABLE IF NOT EXISTS surebet_legs (
+    surebet_id    INTEGER NOT NULL,  -- The rowid of the surebet in the 'surebets' table.
+    recorded_at   REAL    NOT NULL,
+    game_id       TEXT    NOT NULL,
+    leg           INTEGER NOT NULL,  -- Position of the bet in the surebet (0, 1, ...).
+    outcome       TEXT    NOT NULL,
+    bookmaker     TEXT    NOT NULL,
+    price         REAL    NOT NULL,
+    point         REAL,
+    stake         REAL    NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_surebet_legs_surebet        ON surebet_legs (surebet_id);
+CREATE INDEX IF NOT EXISTS idx_surebet_legs_bookmaker_time ON surebet_legs (bookmaker, recorded_at);
+"""
+
+# Rows are written once this many are waiting, or at the latest every FLUSH_INTERVAL_SECONDS.
+BATCH_SIZE = 5000
+FLUSH_INTERVAL_SECONDS = 2.0
+
+# Records (one cycle's odds or surebets each) that may wait for the writer before new ones are dropped.
+MAX_QUEUED_RECORDS = 1000
+
+def odds_rows(market_pairs: list[tuple[Game, Market]], recorded_at: float) -> list[tuple]:
+    """Flattens the odds of the given markets into rows of the 'odds' table."""
+    return [
+        (recorded_at, game.sport_key, game.id, market.key, str(market.point), odd.name, odd.bookmaker, odd.price, odd.point)
+        for game, market in market_pairs
+        for odd in market.outcomes
+    ]
+
+def surebet_rows(surebets: list[dict], recorded_at: float) -> list[tuple[tuple, list[tuple]]]:
+    """
+    Flattens surebet dictionaries into rows of the 'surebets' table, each with the rows of its
+    bets in 'surebet_legs' (without the surebet_id, which is only known once the surebet is inserted).
+    """
+    rows = []
+    for surebet in surebets:
+        game, market = surebet['game'], surebet['market']
+        legs = surebet['legs']
+        leg_rows = [(recorded_at, game.id, position, odd.name, odd.bookmaker, odd.price, odd.point, stake)
+                    for position, (odd, stake) in enumerate(zip(legs, surebet['stakes']))]
+        rows.append(((
+            recorded_at, game.sport_key, game.id, game.home_team, game.away_team, game.commence_time,
+            surebet.get('type', 'surebet'), market.key, str(market.point),
+            ','.join(odd.bookmaker for odd in legs), surebet['profit_margin'],
+            json.dumps([{'name': odd.name, 'price': odd.price, 'bookmaker': odd.bookmaker, 'point': odd.point, 'stake': stake}
+                        for odd, stake in zip(legs, surebet['stakes'])])
+        ), leg_rows))
+    return rows
+
+class HistoryStore:
+    """An append-only history of odds and surebets, written by a background thread."""
+    def __init__(self, path: str = None):
+        self.path = path or os.path.join(os.path.dirname(os.path.abspath(__file__)), config.HISTORY_DB_PATH)
+        self.queue = queue.Queue(maxsize=MAX_QUEUED_RECORDS)
+        self.written_rows = 0
+        self.dropped_records = 0
+        # Create the schema right away, so errors (e.g., a read-only folder) show up at startup.
+        self.connect().close()
+        self.thread = threading.Thread(target=self.run, name='history-writer', daemon=True)
+        self.thread.start()
+
+    def connect(self) -> sqlite3.Connection:
+        """Opens a connection in WAL mode and makes sure the tables and indexes exist."""
+        connection = sqlite3.connect(self.path)
+        connection.execute('PRAGMA journal_mode=WAL')
+        connection.execute('PRAGMA synchronous=NORMAL')  # Safe with WAL, and much faster than FULL.
+        connection.executescript(SCHEMA)
+        return connection
+
+    def record_odds(self, market_pairs: list[tuple[Game, Market]], recorded_at: float = None):
+        """
+        Queues the odds of the given markets for writing. Only a reference is queued here;
+        the rows are built and inserted by the writer thread.
+
+        Args:
+            market_pairs: A list of (game, market) tuples, e.g., the markets that changed this cycle.
+            recorded_at: The cycle's timestamp. Defaults to now.
+        """
+        if market_pairs:
+            self.enqueue(('odds', market_pairs, recorded_at or time.time()))
+
+    def record_surebets(self, surebets: list[dict], recorded_at: float = None):
+        """
+        Queues detected surebets for writing.
+
+        Args:
+            surebets: A list of surebet dictionaries.
+            recorded_at: The cycle's timestamp. Defaults to now.
+        """
+        if surebets:
+            self.enqueue(('surebets', surebets, recorded_at or time.time()))
+
+    def enqueue(self, record: tuple):
+        """Queues a record for the writer without blocking; when the queue is full, the record is dropped and counted."""
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped_records += 1
+            metrics.increment('surebet_history_dropped_total', kind=record[0])
+            print(f"History writer is falling behind: {record[0]} record dropped ({self.dropped_records} so far).")
+
+    def run(self):
+        """The writer loop: collects queued records and inserts them in batches, one transaction per batch."""
+        connection = self.connect()
+        pending = {'odds': [], 'surebets': []}
+        pending_count = 0
+        taken_records = 0       # Records taken from the queue but not yet committed.
+        last_flush = time.monotonic()
+
+        while True:
+            try:
+                kind, items, recorded_at = self.queue.get(timeout=FLUSH_INTERVAL_SECONDS)
+            except queue.Empty:
+                pass
+            else:
+                taken_records += 1
+                try:
+                    rows = odds_rows(items, recorded_at) if kind == 'odds' else surebet_rows(items, recorded_at)
+                    pending[kind].extend(rows)
+                    pending_count += len(rows)
+                except Exception as e:
+                    # A malformed record is dropped; it must not stop the writer thread.
+                    print(f"Error while preparing {kind} history rows: {e}")
+
+            # Write when the batch is full, when it is getting old, or when nothing else is waiting.
+            if taken_records and (pending_count >= BATCH_SIZE or self.queue.empty()
+                                  or time.monotonic() - last_flush >= FLUSH_INTERVAL_SECONDS):
+                try:
+                    with connection:  # One transaction for the whole batch.
+                        connection.executemany('INSERT INTO odds VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)', pending['odds'])
+                        # Surebets are few, so each is inserted on its own to learn its rowid for the legs.
+                        for row, leg_rows in pending['surebets']:
+                            surebet_id = connection.execute('INSERT INTO surebets VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)', row).lastrowid
+                            connection.executemany('INSERT INTO surebet_legs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                                                   [(surebet_id, *leg_row) for leg_row in leg_rows])
+                    self.written_rows += pending_count
+                except Exception as e:
+                    # The batch is lost, but the writer keeps running for the next ones.
+                    print(f"Error while writing odds history: {e}")
+                finally:
+                    for _ in range(taken_records):
+                        self.queue.task_done()
+                    pending = {'odds': [], 'surebets': []}
+                    pending_count = 0
+                    taken_records = 0
+                    last_flush = time.monotonic()
+
+    def flush(self, timeout: float = 30.0):
+        """
+        Waits until every queued record has been committed (or until the timeout expires).
+
+        Args:
+            timeout: The maximum number of seconds to wait.
+        """
+        deadline = time.monotonic() + timeout
+        while self.queue.unfinished_tasks and time.monotonic() < deadline:
+            time.sleep(0.05)
+
+# The store is created on first use, so importing this module does not open the database.
+_history_store = None
+
+def get_history_store() -> HistoryStore:
+    """Returns the shared HistoryStore, opening the database on first use."""
+    global _history_store
+    if _history_store is None:
+        _history_store = HistoryStore()
+    return _history_store
+
+def flush_history(timeout: float = 30.0):
+    """Waits for the history writer (if it was started) to commit every queued record."""
+    if _history_store is not None:
+        _history_store.flush(timeout)
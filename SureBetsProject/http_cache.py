@@ -0,0 +1,345 @@
+# http_cache.py
+# This module adds a small on-disk cache under the bot's GET requests. Every script of the
+# project (main.py, scheduler.py, test_runner.py, descobrir_esportes.py) runs as a separate
+# process, so the cache lives on disk where all of them can share it:
+#   - Responses are stored gzip-compressed, one file per URL + query parameters.
+#   - A snapshot is reused without any request while it is younger than its endpoint's TTL.
+#   - Once stale, it is revalidated with a conditional request (ETag / Last-Modified) when the
+#     server provided those headers; a '304 Not Modified' answer simply refreshes the snapshot.
+#   - Files are written to a temporary file and then atomically renamed, so a parallel process
+#     never reads a half-written snapshot. Streamed downloads are written while the caller reads them.
+#   - Snapshots served from disk carry no quota headers: only live answers update the quota.
+#   - The cache is only an optimisation: if it cannot be written (missing permissions, a full
+#     disk), the live response is used and the error is logged.
+
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+import time
+import zlib
+import requests
+from requests.structures import CaseInsensitiveDict
+import config
+
+# Chunk size used to copy response bodies to and from the cache.
+CHUNK_SIZE = 64 * 1024
+
+# Transport headers that no longer describe the stored (already decoded) body.
+TRANSPORT_HEADERS = {'content-encoding', 'content-length', 'transfer-encoding', 'connection'}
+
+# Quota headers of The Odds API; they are only meaningful on live answers.
+QUOTA_HEADERS = ('x-requests-remaining', 'x-requests-used', 'x-requests-last')
+
+# Errors raised by a truncated or corrupt snapshot. gzip.BadGzipFile and json.JSONDecodeError
+# are subclasses of OSError and ValueError.
+SNAPSHOT_ERRORS = (EOFError, OSError, ValueError, zlib.error)
+
+def cache_dir() -> str:
+    """Returns the cache directory (relative paths are resolved from the project folder)."""
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), config.CACHE_DIR)
+
+def cache_path(url: str, params: dict) -> str:
+    """
+    Builds the cache file path of a request. The API key is left out of the key,
+    so rotating the key does not invalidate the cache.
+
+    Args:
+        url: The request URL.
+        params: The query parameters.
+
+    Returns:
+        The absolute path of the cache file.
+    """
+    public_params = sorted((k, str(v)) for k, v in params.items() if k != 'api_key')
+    digest = hashlib.sha256(json.dumps([url, public_params]).encode()).hexdigest()
+    return os.path.join(cache_dir(), f"{digest}.json.gz")
+
+def read_headers(path: str) -> CaseInsensitiveDict:
+    """Reads the headers stored on the first line of a cache file."""
+    with gzip.open(path, 'rb') as file:
+        return CaseInsensitiveDict(json.loads(file.readline()))
+
+class CachedResponse:
+    """
+    A response served from a cache file. It supports the subset of requests.Response used by the bot.
+    The file is opened once and both the headers and the body are read from that handle, so a
+    snapshot replaced by another process in between can never pair one entry's headers with
+    another's body.
+    """
+    status_code = 200
+
+    def __init__(self, path: str, from_cache: bool = True, live_headers: dict = None):
+        self.path = path
+        self.from_cache = from_cache  # False when the data was just downloaded (and cost API quota).
+        self.file = gzip.open(path, 'rb')
+        self.headers = CaseInsensitiveDict(json.loads(self.file.readline()))
+        if from_cache:
+            # The stored quota headers describe the account when the snapshot was downloaded;
+            # only a live answer (e.g., a '304 Not Modified') tells the current quota.
+            for name in QUOTA_HEADERS:
+                self.headers.pop(name, None)
+                if live_headers and name in live_headers:
+                    self.headers[name] = live_headers[name]
+
+    def raise_for_status(self):
+        """Cached responses are always successful."""
+
+    def iter_content(self, chunk_size: int = CHUNK_SIZE):
+        """Yields the response body in chunks, reading it straight from the compressed file."""
+        with self.file:
+            while chunk := self.file.read(chunk_size):
+                yield chunk
+
+    def json(self):
+        """Decodes the whole response body as JSON."""
+        with self.file:
+            return json.load(self.file)
+
+    def close(self):
+        """Closes the cache file."""
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+        return False
+
+class SnapshotWriter:
+    """
+    Writes one snapshot to a temporary file: the headers go on the first line and the body
+    follows, all gzip-compressed. commit() atomically moves it into place; discard() drops it.
+    """
+    def __init__(self, path: str, headers: dict):
+        self.path = path
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, self.temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        self.raw_file = os.fdopen(fd, 'wb')
+        self.file = gzip.open(self.raw_file, 'wb', compresslevel=5)
+        stored_headers = {k: v for k, v in headers.items() if k.lower() not in TRANSPORT_HEADERS}
+        try:
+            self.file.write(json.dumps(stored_headers).encode() + b'\n')
+        except OSError:
+            self.discard()
+            raise
+
+    def write(self, chunk: bytes):
+        self.file.write(chunk)
+
+    def commit(self):
+        self.file.close()
+        self.raw_file.close()
+        os.replace(self.temp_path, self.path)  # Atomic on both POSIX and Windows.
+
+    def discard(self):
+        # Also called after a failed write, so cleanup errors are ignored.
+        for cleanup in (self.file.close, self.raw_file.close, lambda: os.unlink(self.temp_path)):
+            try:
+                cleanup()
+            except OSError:
+                pass
+
+def log_write_error(error: OSError):
+    """Reports that a snapshot could not be written; the request goes on without the cache."""
+    print(f"Could not write to the HTTP cache, using the live response: {error!r}")
+
+def store_response(writer: SnapshotWriter, response: requests.Response) -> bool:
+    """
+    Writes a response to the cache atomically. The body is copied in chunks, never fully in memory.
+
+    Args:
+        writer: The SnapshotWriter of the cache file.
+        response: A successful response opened with stream=True.
+
+    Returns:
+        True if the snapshot was stored, False if writing it failed (the body was still read).
+    """
+    try:
+        for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+            try:
+                writer.write(chunk)
+            except OSError as e:
+                log_write_error(e)
+                writer.discard()
+                return False
+    except BaseException:
+        writer.discard()
+        raise
+    try:
+        writer.commit()
+    except OSError as e:
+        log_write_error(e)
+        writer.discard()
+        return False
+    return True
+
+class TeeResponse:
+    """
+    A live response whose body is written to the cache while the caller reads it, so a streaming
+    parser can start on the first chunk instead of waiting for the whole download. The snapshot
+    is only kept if the body was read to the end.
+    """
+    from_cache = False
+
+    def __init__(self, path: str, response: requests.Response):
+        self.path = path
+        self.response = response
+        self.status_code = response.status_code
+        self.headers = response.headers
+
+    def raise_for_status(self):
+        self.response.raise_for_status()
+
+    def iter_content(self, chunk_size: int = CHUNK_SIZE):
+        """
+        Yields the body chunks as they arrive, copying each one to the cache file. If the cache
+        cannot be written, the chunks are still yielded and no snapshot is kept.
+        """
+        try:
+            writer = SnapshotWriter(self.path, self.response.headers)
+        except OSError as e:
+            log_write_error(e)
+            writer = None
+        try:
+            for chunk in self.response.iter_content(chunk_size=chunk_size):
+                if writer is not None:
+                    try:
+                        writer.write(chunk)
+                    except OSError as e:
+                        log_write_error(e)
+                        writer.discard()
+                        writer = None
+                yield chunk
+        except BaseException:
+            # A failed download or a caller that stopped early (GeneratorExit) leaves no snapshot.
+            if writer is not None:
+                writer.discard()
+            raise
+        if writer is not None:
+            try:
+                writer.commit()
+            except OSError as e:
+                log_write_error(e)
+                writer.discard()
+
+    def json(self):
+        """Decodes the whole response body as JSON."""
+        return json.loads(b''.join(self.iter_content()))
+
+    def close(self):
+        self.response.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+        return False
+
+def discard_snapshot(path: str):
+    """Deletes a cache file, ignoring one that another process already removed."""
+    try:
+        os.unlink(path)
+    except OSError:
+        pass  # Already removed by another process, or not removable: it is rewritten on the next download.
+
+def open_snapshot(path: str, live_headers: dict = None) -> CachedResponse:
+    """
+    Opens a cached snapshot and checks that its whole body decompresses (the gzip trailer holds a
+    checksum and the length), so a truncated or corrupt file is detected here rather than in the
+    caller's parser. The body is read in chunks and never held in memory.
+
+    Args:
+        path: The cache file path.
+        live_headers: The headers of a live '304 Not Modified' answer, if any (see CachedResponse).
+
+    Returns:
+        A CachedResponse positioned at the start of the body.
+
+    Raises:
+        One of SNAPSHOT_ERRORS if the file cannot be read.
+    """
+    response = CachedResponse(path, live_headers=live_headers)
+    try:
+        body_start = response.file.tell()
+        while response.file.read(CHUNK_SIZE):
+            pass
+        response.file.seek(body_start)
+    except BaseException:
+        response.close()
+        raise
+    return response
+
+def cached_get(session: requests.Session, url: str, params: dict, ttl: float, stream: bool = False):
+    """
+    Performs a GET request through the on-disk cache.
+
+    Args:
+        session: The HTTP session used when the network is needed.
+        url: The request URL.
+        params: The query parameters.
+        ttl: How many seconds a stored snapshot stays fresh for this endpoint.
+        stream: When True, a new download is handed to the caller while it is being stored
+            (see TeeResponse) instead of after it has been stored.
+
+    Returns:
+        A CachedResponse for fresh or revalidated data, a CachedResponse or TeeResponse for new
+        data, or the raw requests.Response when the request failed (so the caller's error handling
+        still applies).
+    """
+    if not config.CACHE_ENABLED:
+        return session.get(url, params=params, stream=stream)
+
+    path = cache_path(url, params)
+    headers = {}
+
+    if os.path.exists(path):
+        try:
+            # The file's modification time is the moment the snapshot was last confirmed fresh.
+            if time.time() - os.path.getmtime(path) < ttl:
+                return open_snapshot(path)
+
+            # The snapshot is stale: ask the server whether it changed, if it supports that.
+            stored_headers = read_headers(path)
+            if 'ETag' in stored_headers:
+                headers['If-None-Match'] = stored_headers['ETag']
+            if 'Last-Modified' in stored_headers:
+                headers['If-Modified-Since'] = stored_headers['Last-Modified']
+        except SNAPSHOT_ERRORS as e:
+            # A truncated or corrupt snapshot is removed and the data is downloaded again.
+            print(f"Discarding unreadable cache file '{path}': {e!r}")
+            discard_snapshot(path)
+            headers = {}
+
+    response = session.get(url, params=params, headers=headers, stream=True)
+
+    if response.status_code == 304:
+        response.close()
+        try:
+            os.utime(path)  # Mark the stored snapshot as fresh again.
+            return open_snapshot(path, live_headers=response.headers)
+        except SNAPSHOT_ERRORS as e:
+            print(f"Discarding unreadable cache file '{path}': {e!r}")
+            discard_snapshot(path)
+            return cached_get(session, url, params, ttl, stream)
+
+    if not response.ok:
+        return response
+
+    if stream:
+        return TeeResponse(path, response)
+
+    try:
+        writer = SnapshotWriter(path, response.headers)
+    except OSError as e:
+        log_write_error(e)
+        return response  # Its body has not been read yet.
+    with response:
+        stored = store_response(writer, response)
+    if not stored:
+        # The body was consumed while writing failed, so it is downloaded once more, without the cache.
+        return session.get(url, params=params)
+    return CachedResponse(path, from_cache=False)
@@ -0,0 +1,84 @@
+# line_index.py
+# This module finds cross-line opportunities ("middles") in totals and spreads markets.
+# A middle pairs two opposite bets on different lines, such as Over 2.5 at one bookmaker
+# and Under 3.5 at another: at least one of them always wins, and both win if the result
+# lands between the two lines. When the two prices also sum to less than 1 in implied
+# probability, the pair is a guaranteed profit with a chance of a double win.
+
+from models import Game, Market, make_surebet
+
+class LineIndex:
+    """
+    A per-game index of the best odds of one market type (totals or spreads), sorted by line.
+
+    Every odd is stored on a "low" or a "high" side. A low-side bet at line A and a high-side
+    bet at line B cover every possible result whenever A < B:
+      - Totals: Over is the low side and Under is the high side.
+      - Spreads: lines are the home team's handicap; the away team is the low side and
+        the home team is the high side.
+    """
+    def __init__(self, game: Game, market_key: str):
+        self.game = game
+        self.market_key = market_key
+        self.best_low = {}      # Maps each line to the best low-side Odd at that line.
+        self.best_high = {}     # Maps each line to the best high-side Odd at that line.
+
+        for market in game.markets.values():
+            if market.key != market_key:
+                continue
+            for odd in market.outcomes:
+                if market_key == 'totals':
+                    is_high_side = odd.name == 'Under'
+                else:
+                    is_high_side = odd.name == game.home_team
+                best = self.best_high if is_high_side else self.best_low
+                current = best.get(market.point)
+                if current is None or odd.price > current.price:
+                    best[market.point] = odd
+
+        # Sorting the distinct lines is the only super-linear step: O(n log n).
+        self.lines = sorted(self.best_low.keys() | self.best_high.keys())
+
+    def find_middles(self) -> list:
+        """
+        Scans the sorted lines once, pairing each high-side odd with the best low-side odd
+        found at any strictly lower line.
+
+        Returns:
+            A list of middle dictionaries whose combined margin is below 1.
+        """
+        middles_found = []
+        best_low_so_far = None  # The best low-side Odd among all lines seen so far.
+        best_low_line = None
+
+        for line in self.lines:
+            high_odd = self.best_high.get(line)
+            if high_odd and best_low_so_far:
+                margin = (1 / best_low_so_far.price) + (1 / high_odd.price)
+                if margin < 1:
+                    # Describe the pair as a synthetic market spanning both lines.
+                    market = Market(key=self.market_key, point=(best_low_line, line))
+                    market.add_odds([best_low_so_far, high_odd])
+                    middles_found.append(make_surebet(self.game, market, [best_low_so_far, high_odd], margin, type="middle"))
+
+            # Only update after checking, so a line is never paired with itself.
+            low_odd = self.best_low.get(line)
+            if low_odd and (best_low_so_far is None or low_odd.price > best_low_so_far.price):
+                best_low_so_far, best_low_line = low_odd, line
+
+        return middles_found
+
+def find_middles_for_game(game: Game) -> list:
+    """
+    Finds all cross-line opportunities in the totals and spreads markets of a game.
+
+    Args:
+        game: A Game object containing all its markets.
+
+    Returns:
+        A list of middle dictionaries. Returns an empty list if none are found.
+    """
+    middles_found = []
+    for market_key in ('totals', 'spreads'):
+        middles_found.extend(LineIndex(game, market_key).find_middles())
+    return middles_found
@@ -0,0 +1,169 @@
+# load_harness.py
+# This script load-tests complete check cycles end to end, without spending API quota or
+# messaging a real chat. It starts local stand-ins for The Odds API and Telegram (see
+# mock_servers.py), points the bot at them and runs cycles through run_single_check, with the
+# real fetching, analysis and alert dispatcher. It then reports:
+#   - cycle times and the time spent in each stage,
+#   - how the bot coped with the injected failures (server errors, 429 answers, latency),
+#   - alert delivery: how many alerts were queued, suppressed, delivered or lost, and the
+#     latency from queuing an alert until the mock Telegram server confirmed its message.
+#
+# Example:
+#   python load_harness.py --sports 8 --games 200 --cycles 5 --odds-latency 0.3 --odds-errors 0.05 --telegram-429 0.1
+
+import argparse
+import contextlib
+import io
+import os
+import tempfile
+import time
+import config
+import main
+import notifier
+from benchmark import percentile
+from metrics import metrics
+from mock_servers import FaultProfile, MockOddsAPI, MockTelegram
+from odds_book import OddsBook
+
+def configure(args: argparse.Namespace, odds_api: MockOddsAPI, telegram: MockTelegram):
+    """Points the bot at the mock servers and applies the harness settings."""
+    config.API_KEY = 'harness-key'
+    config.ODDS_API_BASE_URL = odds_api.base_url
+    config.TELEGRAM_API_BASE_URL = telegram.base_url
+    config.TELEGRAM_ENABLED = True
+    config.TELEGRAM_BOT_TOKEN = 'harness-token'
+    config.TELEGRAM_CHAT_ID = 'harness-chat'
+    config.TARGET_SPORTS = ['mock_sport_*']
+    config.SPORTS_CATALOG_ENABLED = True
+    config.CACHE_ENABLED = False        # Every cycle must reach the mock server.
+    config.HISTORY_ENABLED = False
+    config.SUREBET_ENGINE = args.engine
+    config.STREAMING_PARSE_ENABLED = args.streaming
+    config.ALERT_DISPATCHER_ENABLED = True
+    config.ALERT_RATE_PER_SECOND = args.alert_rate
+    config.ALERT_BURST = args.alert_burst
+    # Keep the harness's sports out of the real activity state file.
+    config.SPORTS_STATE_PATH = os.path.join(tempfile.mkdtemp(prefix='surebet_harness_'), 'sports_state.json')
+
+def stage_means() -> dict:
+    """Averages the bot's own stage timings (see metrics.py) across sports and runs."""
+    totals = {}
+    for labels, (total, count) in metrics.timings.items():
+        stage = dict(labels)['stage']
+        stage_total = totals.setdefault(stage, [0.0, 0])
+        stage_total[0] += total
+        stage_total[1] += count
+    return {stage: total / count for stage, (total, count) in totals.items() if count}
+
+def run_harness(args: argparse.Namespace) -> dict:
+    """
+    Starts the mock servers and runs the requested number of cycles against them.
+
+    Args:
+        args: The parsed command-line arguments.
+
+    Returns:
+        A dictionary with the measurements.
+    """
+    odds_api = MockOddsAPI(sports=args.sports, games=args.games, bookmakers=args.bookmakers, lines=args.lines,
+                           surebet_density=args.density, quota=args.quota, fault=FaultProfile(args.odds_latency, error_rate=args.odds_errors,
+                                                                            rate_limit_rate=args.odds_429, seed=1)).start()
+    telegram = MockTelegram(max_per_second=args.telegram_max_rate, retry_after=args.retry_after,
+                            fault=FaultProfile(args.telegram_latency, error_rate=args.telegram_errors,
+                                               rate_limit_rate=args.telegram_429, seed=2)).start()
+    configure(args, odds_api, telegram)
+    dispatcher = notifier.get_dispatcher()  # Created now, with the harness's rate settings.
+    odds_book = OddsBook() if args.incremental else None
+
+    cycle_times = []
+    failed_fetches = 0
+    surebets_found = 0
+    output = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(io.StringIO())
+    with output:
+        for cycle in range(args.cycles):
+            cycle_started = time.time()
+            surebets_found += len(main.run_single_check(odds_book))
+            cycle_times.append(time.time() - cycle_started)
+            failed_fetches += sum(1 for status in main.last_fetch_status.values()
+                                  if not status['ok'] and status['checked_at'] >= cycle_started)
+
+        drain_started = time.time()
+        dispatcher.flush(args.flush_timeout)
+        drain_time = time.time() - drain_started
+
+    # The dispatcher records which alerts (game ID, market, bookmakers) each confirmed message carried.
+    # The log only keeps the latest DELIVERY_LOG_SIZE entries, so the totals come from its counters.
+    deliveries = list(dispatcher.deliveries)
+    latencies = [delivered_at - queued_at for _, queued_at, delivered_at in deliveries]
+    return {
+        'cycle_times': cycle_times,
+        'stages': stage_means(),
+        'odds_api': dict(odds_api.counters, quota_used=args.quota - odds_api.remaining),
+        'failed_fetches': failed_fetches,
+        'telegram': dict(telegram.counters),
+        'surebets_found': surebets_found,
+        'alerts_queued': dispatcher.queued_count,
+        'alerts_suppressed': dispatcher.suppressed_count,
+        'alerts_delivered': dispatcher.delivered_count,
+        'alerts_failed': dispatcher.failed_count,
+        'alerts_undelivered': dispatcher.queued_count - dispatcher.delivered_count,
+        'games_alerted': len({key[0] for key, _, _ in deliveries}),
+        'alert_latencies': latencies,
+        'drain_time': drain_time
+    }
+
+def print_report(args: argparse.Namespace, result: dict):
+    """Prints the measurements as a short report."""
+    def milliseconds(samples: list[float]) -> str:
+        if not samples:
+            return 'n/a'
+        return (f"p50 {percentile(samples, 0.50) * 1000:.0f} ms, p95 {percentile(samples, 0.95) * 1000:.0f} ms, "
+                f"max {max(samples) * 1000:.0f} ms")
+
+    odds_api, telegram = result['odds_api'], result['telegram']
+    print(f"\n--- LOAD HARNESS ({args.sports} sports x {args.games} games x {args.bookmakers} bookmakers, "
+          f"{args.cycles} cycles, engine: {args.engine}) ---")
+    print(f"Cycle time:      {milliseconds(result['cycle_times'])}")
+    print("Stages (mean):   " + ', '.join(f"{stage} {seconds * 1000:.1f} ms" for stage, seconds in sorted(result['stages'].items())))
+    print(f"Odds API:        {odds_api.get('odds_requests', 0)} odds requests served, {odds_api.get('errors', 0)} errors (500), "
+          f"{odds_api.get('rate_limited', 0)} rate limited (429), quota used {odds_api['quota_used']}")
+    print(f"Fetch failures:  {result['failed_fetches']} sport fetch(es) failed and were skipped for their cycle")
+    print(f"Surebets:        {result['surebets_found']} found, {result['alerts_queued']} alerts queued, "
+          f"{result['alerts_suppressed']} suppressed as repeats")
+    print(f"Telegram:        {telegram.get('messages', 0)} messages accepted, {telegram.get('rate_limited', 0)} rate limited (429), "
+          f"{telegram.get('errors', 0)} errors (500)")
+    print(f"Alert delivery:  {result['alerts_delivered']} delivered ({result['games_alerted']} games), "
+          f"{result['alerts_undelivered']} lost ({result['alerts_failed']} failed to send), "
+          f"queue drained {result['drain_time']:.1f} s after the last cycle")
+    print(f"Alert latency:   {milliseconds(result['alert_latencies'])}")
+
+def parse_arguments() -> argparse.Namespace:
+    """Defines and parses the command-line options."""
+    parser = argparse.ArgumentParser(description="Load-test full check cycles against local mock Odds API and Telegram servers.")
+    parser.add_argument('--sports', type=int, default=4, help="Number of mock sports.")
+    parser.add_argument('--games', type=int, default=50, help="Games per sport.")
+    parser.add_argument('--bookmakers', type=int, default=20, help="Bookmakers per game.")
+    parser.add_argument('--lines', type=int, default=3, help="Lines per totals/spreads market.")
+    parser.add_argument('--density', type=float, default=0.01, help="Share of markets with an injected surebet.")
+    parser.add_argument('--cycles', type=int, default=5, help="Number of check cycles to run.")
+    parser.add_argument('--incremental', action='store_true', help="Keep an OddsBook between cycles, like the scheduler.")
+    parser.add_argument('--streaming', action='store_true', help="Parse responses game by game.")
+    parser.add_argument('--engine', choices=['python', 'numpy', 'process'], default=config.SUREBET_ENGINE, help="Surebet engine.")
+    parser.add_argument('--quota', type=int, default=100000, help="Starting quota reported by the mock Odds API.")
+    parser.add_argument('--odds-latency', type=float, default=0.1, help="Mean Odds API response time, in seconds.")
+    parser.add_argument('--odds-errors', type=float, default=0.0, help="Share of Odds API requests answered with 500.")
+    parser.add_argument('--odds-429', type=float, default=0.0, help="Share of Odds API requests answered with 429.")
+    parser.add_argument('--telegram-latency', type=float, default=0.05, help="Mean Telegram response time, in seconds.")
+    parser.add_argument('--telegram-errors', type=float, default=0.0, help="Share of Telegram requests answered with 500.")
+    parser.add_argument('--telegram-429', type=float, default=0.0, help="Share of Telegram requests answered with 429.")
+    parser.add_argument('--telegram-max-rate', type=float, default=None, help="Answer 429 above this many messages per second.")
+    parser.add_argument('--retry-after', type=float, default=1, help="The retry_after value of Telegram's 429 answers.")
+    parser.add_argument('--alert-rate', type=float, default=config.ALERT_RATE_PER_SECOND, help="Dispatcher messages per second.")
+    parser.add_argument('--alert-burst', type=int, default=config.ALERT_BURST, help="Dispatcher burst size.")
+    parser.add_argument('--flush-timeout', type=float, default=120.0, help="Seconds to wait for queued alerts after the last cycle.")
+    parser.add_argument('--verbose', action='store_true', help="Show the bot's own output.")
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    args = parse_arguments()
+    print_report(args, run_harness(args))
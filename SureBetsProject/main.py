@@ -5,12 +5,131 @@
 # 3. Analyze the data to find surebet opportunities.
 # 4. Trigger notifications for any surebets found.
 
+import queue
+import threading
 import requests
 import time
 import config
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from requests.adapters import HTTPAdapter
 from models import Game, Market, Odd
-from surebet_calculator import find_surebets_for_game
-from notifier import send_telegram_alert
+from odds_book import OddsBook
+from surebet_calculator import check_market
+from line_index import find_middles_for_game
+from notifier import dispatch_surebet_alert, flush_alerts
+from stream_parser import iter_json_array
+from http_cache import cached_get
+from sports_catalog import select_sports, record_sport_results
+from request_planner import planner
+from price_history import tracker, rank_surebets
+from history_store import get_history_store, flush_history
+from metrics import metrics, profile_cycle
+
+# A single HTTP session shared by every request, so TCP/TLS connections are kept alive and reused.
+_session = None
+
+def get_session() -> requests.Session:
+    """
+    Returns the shared keep-alive HTTP session, creating it on first use.
+    The connection pool is sized to match the configured concurrency limit.
+
+    Returns:
+        The shared requests.Session object.
+    """
+    global _session
+    if _session is None:
+        _session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=config.MAX_CONCURRENT_REQUESTS, pool_maxsize=config.MAX_CONCURRENT_REQUESTS)
+        _session.mount('https://', adapter)
+        _session.mount('http://', adapter)
+    return _session
+
+# The outcome of the latest request for each sport, used by the adaptive scheduler.
+# Maps each sport key to a dict with 'ok', 'requests_remaining', 'requests_last' and 'checked_at'.
+last_fetch_status = {}
+
+def record_fetch_status(sport_key: str, ok: bool, response: requests.Response = None):
+    """
+    Stores the outcome of a request and the API quota reported in its response headers.
+
+    Args:
+        sport_key: The key of the sport that was fetched.
+        ok: Whether the request succeeded.
+        response: The HTTP response, if one was received.
+    """
+    headers = response.headers if response is not None else {}
+    # Snapshots served from the disk cache carry no quota headers (see http_cache.py), so the
+    # remaining quota is only updated from live answers.
+    remaining = headers.get('x-requests-remaining')
+    # A snapshot served from the disk cache did not cost any quota.
+    last_cost = '0' if getattr(response, 'from_cache', False) else headers.get('x-requests-last')
+    last_fetch_status[sport_key] = {
+        'ok': ok,
+        'requests_remaining': int(float(remaining)) if remaining is not None else None,
+        'requests_last': int(float(last_cost)) if last_cost is not None else None,
+        'checked_at': time.time()
+    }
+
+    if not ok:
+        metrics.increment('surebet_errors_total', sport=sport_key)
+    if remaining is not None:
+        metrics.set_gauge('surebet_requests_remaining', float(remaining))
+
+def add_odds_to_game(game: Game, game_data: dict):
+    """
+    Adds every bookmaker odd of one raw API game object to a Game, grouped by market.
+
+    Args:
+        game: The Game object to fill.
+        game_data: One game object from The Odds API response.
+    """
+    # Iterate through bookmakers and their markets for the current game.
+    for bookmaker in game_data['bookmakers']:
+        bookmaker_key = bookmaker['key']
+        for market in bookmaker['markets']:
+            market_key = market['key']
+            for outcome in market['outcomes']:
+                # For totals/spreads, the 'point' is the line (e.g., 2.5). Default to 0.0 for h2h.
+                point = outcome.get('point', 0.0)
+                
+                # Both sides of a spread are keyed by the home team's handicap, so 'Home -1.5 / Away +1.5'
+                # and 'Home +1.5 / Away -1.5' stay in separate markets.
+                if market_key == 'spreads':
+                    line = point if outcome['name'] == game.home_team else -point
+                else:
+                    line = abs(point)
+                
+                # Create a unique market ID combining the key and the line (e.g., ('totals', 2.5)).
+                market_id = (market_key, line)
+                
+                # If this market doesn't exist for the game yet, create it.
+                market_obj = game.markets.get(market_id)
+                if market_obj is None:
+                    market_obj = game.markets[market_id] = Market(key=market_key, point=line)
+                
+                # Create the Odd object and add it to the correct market.
+                odd = Odd(name=outcome['name'], price=outcome['price'], bookmaker=bookmaker_key, point=point)
+                market_obj.add_odd(odd)
+
+def build_game(game_data: dict) -> Game:
+    """
+    Transforms one raw game object from the API into a structured Game object.
+
+    Args:
+        game_data: One game object from The Odds API response.
+
+    Returns:
+        A Game object containing structured market and odds data.
+    """
+    game = Game(
+        id=game_data['id'], 
+        home_team=game_data['home_team'], 
+        away_team=game_data['away_team'], 
+        commence_time=game_data['commence_time'],
+        sport_key=game_data.get('sport_key')
+    )
+    add_odds_to_game(game, game_data)
+    return game
 
 def process_api_data(api_data: list) -> list[Game]:
     """
@@ -26,71 +145,93 @@ def process_api_data(api_data: list) -> list[Game]:
     processed_games = {}  # Use a dict to efficiently group odds by game ID.
     
     for game_data in api_data:
-        game_id = game_data['id']
+        game = processed_games.get(game_data['id'])
         
         # If this is the first time we see this game, create a new Game object.
-        if game_id not in processed_games:
-            processed_games[game_id] = Game(
-                id=game_id, 
-                home_team=game_data['home_team'], 
-                away_team=game_data['away_team'], 
-                commence_time=game_data['commence_time']
-            )
-        
-        game = processed_games[game_id]
-        
-        # Iterate through bookmakers and their markets for the current game.
-        for bookmaker in game_data['bookmakers']:
-            bookmaker_key = bookmaker['key']
-            for market in bookmaker['markets']:
-                market_key = market['key']
-                for outcome in market['outcomes']:
-                    # For totals/spreads, the 'point' is the line (e.g., 2.5). Default to 0.0 for h2h.
-                    point = outcome.get('point', 0.0)
-                    
-                    # Create a unique market ID combining the key and the line (e.g., 'totals_2.5').
-                    market_id = f"{market_key}_{abs(point)}"
-                    
-                    # If this market doesn't exist for the game yet, create it.
-                    if market_id not in game.markets:
-                        game.markets[market_id] = Market(key=market_key, point=abs(point))
-                    
-                    # Create the Odd object and add it to the correct market.
-                    odd = Odd(name=outcome['name'], price=outcome['price'], bookmaker=bookmaker_key, point=point)
-                    game.markets[market_id].outcomes.append(odd)
+        if game is None:
+            processed_games[game_data['id']] = build_game(game_data)
+        else:
+            add_odds_to_game(game, game_data)
                     
     return list(processed_games.values()) # Return the structured Game objects as a list.
 
-def fetch_odds_for_sport(sport_key: str) -> list[Game]:
+def build_odds_params() -> dict:
+    """
+    Builds the query parameters for an odds request from the settings in config.py.
+
+    Returns:
+        A dictionary of query parameters.
+    """
+    return {
+        'api_key': config.API_KEY, 
+        'regions': config.REGIONS, 
+        'markets': config.TARGET_MARKETS, 
+        'oddsFormat': config.ODDS_FORMAT
+    }
+
+# What the latest request of each sport covered: None for every target market in every region, or
+# the (bookmaker, market_key) pairs of a request shaped by the planner. Shaped responses replace
+# the requested market keys in the OddsBook; the other market keys are kept.
+request_scopes = {}
+
+def plan_odds_request(sport_key: str) -> tuple[dict, bool]:
+    """
+    Builds the query parameters of a sport's next odds request, shaped by the request planner
+    when it is enabled.
+
+    Args:
+        sport_key: The key of the sport.
+
+    Returns:
+        A tuple (params, is_full_sweep). is_full_sweep is only True when the planner should learn from the response.
+    """
+    if not config.REQUEST_PLANNER_ENABLED:
+        request_scopes[sport_key] = None
+        return build_odds_params(), False
+    params, full_sweep = planner.plan(sport_key, build_odds_params())
+    if 'bookmakers' in params:
+        markets, bookmakers = params['markets'].split(','), params['bookmakers'].split(',')
+        print(f"Requesting {len(markets)} market(s) from {len(bookmakers)} bookmaker(s).")
+        request_scopes[sport_key] = {(bookmaker, market_key) for bookmaker in bookmakers for market_key in markets}
+    else:
+        request_scopes[sport_key] = None
+    return params, full_sweep
+
+def fetch_odds_for_sport(sport_key: str, session: requests.Session = None) -> list[Game]:
     """
     Fetches and processes odds for a single sport from The Odds API.
 
     Args:
         sport_key: The key for the sport to fetch (e.g., 'soccer_brazil_serie_a').
+        session: Optional HTTP session to reuse. Defaults to the shared keep-alive session.
 
     Returns:
         A list of processed Game objects for the sport, or an empty list if an error occurs.
     """
     print(f"\n--- Fetching and processing data for: '{sport_key}' ---")
-    url = f'https://api.the-odds-api.com/v4/sports/{sport_key}/odds'
-    params = {
-        'api_key': config.API_KEY, 
-        'regions': config.REGIONS, 
-        'markets': config.TARGET_MARKETS, 
-        'oddsFormat': config.ODDS_FORMAT
-    }
+    url = f'{config.ODDS_API_BASE_URL}/sports/{sport_key}/odds'
+    params, full_sweep = plan_odds_request(sport_key)
     
     try:
-        response = requests.get(url, params=params)
+        with metrics.timer('http', sport_key):
+            response = cached_get(session or get_session(), url, params, config.CACHE_TTL_SECONDS['odds'])
         response.raise_for_status()  # Raise an exception for HTTP errors (4xx or 5xx).
         
-        api_data = response.json()
+        with metrics.timer('json_decode', sport_key):
+            api_data = response.json()
+        record_fetch_status(sport_key, True, response)
         if not api_data:
             print(f"No upcoming games found for '{sport_key}'.")
             return []
             
         # Process the raw data into structured objects.
-        structured_games = process_api_data(api_data)
+        with metrics.timer('process', sport_key):
+            structured_games = process_api_data(api_data)
+        if full_sweep:
+            # Learn which markets and bookmakers supply the best prices of this sport.
+            for game in structured_games:
+                planner.observe_game(sport_key, game)
+            planner.finish_sweep(sport_key)
         
         print(f"SUCCESS! {len(structured_games)} games analyzed.")
         remaining_requests = response.headers.get('x-requests-remaining', 'N/A')
@@ -100,52 +241,416 @@ def fetch_odds_for_sport(sport_key: str) -> list[Game]:
         
     except requests.exceptions.HTTPError as err:
         print(f"HTTP Error: {err}")
+        record_fetch_status(sport_key, False, err.response)
         return []
     except requests.exceptions.RequestException as e:
         print(f"Connection Error: {e}")
+        record_fetch_status(sport_key, False)
         return []
 
-def run_single_check():
+def stream_odds_for_sport(sport_key: str, session: requests.Session = None):
+    """
+    Fetches odds for a single sport and parses the response body incrementally.
+    Each game is yielded as soon as it has been parsed, so only one game needs to be
+    in memory at a time instead of the whole response.
+
+    Args:
+        sport_key: The key for the sport to fetch (e.g., 'soccer_brazil_serie_a').
+        session: Optional HTTP session to reuse. Defaults to the shared keep-alive session.
+
+    Yields:
+        One Game object per game in the response. Nothing is yielded if an error occurs.
+    """
+    print(f"\n--- Streaming data for: '{sport_key}' ---")
+    url = f'{config.ODDS_API_BASE_URL}/sports/{sport_key}/odds'
+    params, full_sweep = plan_odds_request(sport_key)
+    
+    try:
+        with metrics.timer('http', sport_key):
+            response = cached_get(session or get_session(), url, params, config.CACHE_TTL_SECONDS['odds'], stream=True)
+        with response:
+            response.raise_for_status()  # Raise an exception for HTTP errors (4xx or 5xx).
+
+            games_count = 0
+            chunks = response.iter_content(chunk_size=64 * 1024)
+            game_datas = iter_json_array(chunks)
+            while True:
+                # Decoding and processing are timed separately, one game at a time.
+                with metrics.timer('json_decode', sport_key):
+                    game_data = next(game_datas, None)
+                if game_data is None:
+                    break
+                with metrics.timer('process', sport_key):
+                    game = build_game(game_data)
+                if full_sweep:
+                    planner.observe_game(sport_key, game)
+                games_count += 1
+                yield game
+
+            # Read what follows the array (at most some whitespace), so a body being copied to the
+            # disk cache (see http_cache.TeeResponse) is complete and gets stored.
+            for _ in chunks:
+                pass
+            record_fetch_status(sport_key, True, response)
+            if full_sweep:
+                planner.finish_sweep(sport_key)
+            if not games_count:
+                print(f"No upcoming games found for '{sport_key}'.")
+                return
+
+            print(f"SUCCESS! {games_count} games streamed for '{sport_key}'.")
+            remaining_requests = response.headers.get('x-requests-remaining', 'N/A')
+            print(f"API requests remaining this month: {remaining_requests}")
+
+    except requests.exceptions.HTTPError as err:
+        print(f"HTTP Error: {err}")
+        record_fetch_status(sport_key, False, err.response)
+    except requests.exceptions.RequestException as e:
+        print(f"Connection Error: {e}")
+        record_fetch_status(sport_key, False)
+    except ValueError as e:
+        print(f"Invalid response for '{sport_key}': {e}")
+        record_fetch_status(sport_key, False)
+    finally:
+        if full_sweep:
+            planner.discard_sweep(sport_key)  # No-op once the sweep was finished.
+
+def fetch_odds_concurrently(sport_keys: list[str]):
+    """
+    Fetches odds for several sports in parallel using a bounded thread pool.
+    Results are yielded as soon as each sport arrives, not in the original order,
+    so the caller can start analyzing a sport while the others are still downloading.
+
+    Args:
+        sport_keys: The list of sport keys to fetch.
+
+    Yields:
+        A tuple (sport_key, games) for each sport, where games is a list of Game objects.
+    """
+    session = get_session()
+    with ThreadPoolExecutor(max_workers=config.MAX_CONCURRENT_REQUESTS) as executor:
+        futures = {executor.submit(fetch_odds_for_sport, sport, session): sport for sport in sport_keys}
+        for future in as_completed(futures):
+            yield futures[future], future.result()
+
+def stream_odds_concurrently(sport_keys: list[str]):
+    """
+    Streams odds for several sports in parallel. Worker threads parse their responses
+    game by game and hand each Game over through a small bounded queue, so games from
+    all sports can be analyzed as they arrive while memory stays bounded.
+
+    Args:
+        sport_keys: The list of sport keys to fetch.
+
+    Yields:
+        A tuple (sport_key, game) for each game, in the order they are parsed.
+    """
+    session = get_session()
+    games_queue = queue.Queue(maxsize=config.MAX_CONCURRENT_REQUESTS * 2)
+    # Set when the consumer stops early (an error, Ctrl+C or the generator being closed),
+    # so workers never stay blocked on a full queue nobody reads anymore.
+    stop = threading.Event()
+
+    def put(item) -> bool:
+        """Puts an item on the queue, waiting for room; returns False once the consumer has stopped."""
+        while not stop.is_set():
+            try:
+                games_queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def stream_into_queue(sport):
+        games = stream_odds_for_sport(sport, session)
+        try:
+            for game in games:
+                if not put((sport, game)):
+                    break
+        finally:
+            games.close()  # Closes the response if the loop stopped early.
+            put((sport, None))  # Marks the end of this sport.
+
+    executor = ThreadPoolExecutor(max_workers=config.MAX_CONCURRENT_REQUESTS)
+    try:
+        for sport in sport_keys:
+            executor.submit(stream_into_queue, sport)
+
+        sports_pending = len(sport_keys)
+        while sports_pending:
+            sport, game = games_queue.get()
+            if game is None:
+                sports_pending -= 1
+            else:
+                yield sport, game
+    finally:
+        stop.set()
+        # Unblock any worker waiting for room, then let the pool wind down in the background.
+        while True:
+            try:
+                games_queue.get_nowait()
+            except queue.Empty:
+                break
+        executor.shutdown(wait=False, cancel_futures=True)
+
+def select_markets(games: list[Game], odds_book: OddsBook = None, scope: set = None) -> list[tuple[Game, Market]]:
+    """
+    Chooses which markets of the given games need to be analyzed.
+
+    Args:
+        games: The list of freshly fetched Game objects.
+        odds_book: Optional OddsBook. When given, only the markets that changed are selected.
+        scope: The (bookmaker, market_key) pairs a shaped request covered (see request_scopes), or
+            None for a full snapshot. The requested market keys are replaced in the book, dropping the
+            odds of bookmakers that were not requested; the other market keys are kept.
+
+    Returns:
+        A list of (game, market) tuples.
+    """
+    if odds_book is not None:
+        if scope is not None:
+            return [pair for game in games for pair in odds_book.apply_update(game, scope, exclusive=True)]
+        return odds_book.merge(games)
+    return [(game, market) for game in games for market in game.markets.values()]
+
+def analyze_markets(market_pairs: list[tuple[Game, Market]]) -> list:
+    """
+    Runs the surebet engine selected in config.py over a batch of markets.
+    Games with a totals or spreads market in the batch are also searched for cross-line middles.
+    When price history is enabled, each surebet is annotated with its expected lifetime and alert priority.
+    When history is enabled, the markets and the surebets found are queued for the history store.
+
+    Args:
+        market_pairs: A list of (game, market) tuples to analyze.
+
+    Returns:
+        A list of surebet dictionaries found in the markets.
+    """
+    if config.PRICE_HISTORY_ENABLED:
+        tracker.record_markets(market_pairs)
+
+    if config.SUREBET_ENGINE == 'numpy':
+        # Imported here so NumPy is only required when the vectorized engine is used.
+        from vectorized_calculator import find_surebets_vectorized
+        surebets = find_surebets_vectorized(market_pairs)
+    elif config.SUREBET_ENGINE == 'process':
+        from parallel_calculator import find_surebets_parallel
+        surebets = find_surebets_parallel(market_pairs)
+    else:
+        surebets = []
+        # For each market, run the surebet calculation logic.
+        for game, market in market_pairs:
+            surebet_info = check_market(game, market)
+            if surebet_info:
+                surebets.append(surebet_info)
+
+    # A changed line can open a middle against any other line of the same game.
+    games_with_lines = {game.id: game for game, market in market_pairs if market.key in ('totals', 'spreads')}
+    for game in games_with_lines.values():
+        surebets.extend(find_middles_for_game(game))
+
+    if config.PRICE_HISTORY_ENABLED:
+        # Estimate how long each surebet will last, to prioritize its alert.
+        tracker.annotate(surebets)
+
+    if config.HISTORY_ENABLED:
+        # Only a reference is queued: the rows are built and written by a background thread.
+        history = get_history_store()
+        history.record_odds(market_pairs)
+        history.record_surebets(surebets)
+    return surebets
+
+def record_sport_activity(sport: str, games: list[Game], market_pairs: list, surebets: list):
+    """Updates the per-sport counters with the games fetched and the markets analyzed."""
+    metrics.increment('surebet_games_total', len(games), sport=sport)
+    metrics.increment('surebet_markets_total', sum(len(game.markets) for game in games), sport=sport)
+    metrics.increment('surebet_odds_total', sum(len(market.outcomes) for game in games for market in game.markets.values()), sport=sport)
+    metrics.increment('surebet_markets_analyzed_total', len(market_pairs), sport=sport)
+    metrics.increment('surebet_found_total', len(surebets), sport=sport)
+
+def expire_started_games(odds_book: OddsBook):
+    """
+    Removes started and finished games from the odds book and updates the eviction metrics.
+
+    Args:
+        odds_book: The OddsBook kept between cycles.
+    """
+    markets_dropped, games_removed = odds_book.expire()
+    if markets_dropped or games_removed:
+        print(f"Expired {markets_dropped} market(s) of started games and {games_removed} finished game(s).")
+        metrics.increment('surebet_evicted_total', markets_dropped, kind='markets')
+        metrics.increment('surebet_evicted_total', games_removed, kind='games')
+    metrics.set_gauge('surebet_book_entries', len(odds_book), kind='games')
+    metrics.set_gauge('surebet_book_entries', len(odds_book.signatures), kind='markets')
+
+def scan_sports(sport_keys: list[str], odds_book: OddsBook = None) -> list:
+    """
+    Fetches the given sports and analyzes their markets, as configured in config.py
+    (streaming or not, concurrent or not, incremental or not).
+
+    Args:
+        sport_keys: The list of sports to check.
+        odds_book: Optional OddsBook; when given, only changed markets are analyzed.
+
+    Returns:
+        The list of surebet dictionaries found.
+    """
+    started_at = time.time()
+    all_surebets = []
+    # How many markets each sport offered and how many of them changed, for the scheduler.
+    markets_seen = dict.fromkeys(sport_keys, 0)
+    markets_changed = dict.fromkeys(sport_keys, 0)
+
+    # The 'process' engine pays a fixed cost per call (a shared memory block and one task per
+    # worker). In streaming mode, changed markets are therefore sent to it in chunks of about
+    # PARALLEL_MIN_MARKETS instead of one game at a time; a fetched sport is analyzed as a whole.
+    batch_markets = config.SUREBET_ENGINE == 'process' and config.STREAMING_PARSE_ENABLED
+    pending = []    # (sport, market_pairs) waiting for the next chunk.
+    pending_count = 0
+
+    def analyze_pending():
+        nonlocal pending_count
+        with metrics.timer('analyze'):
+            surebets = analyze_markets([pair for _, market_pairs in pending for pair in market_pairs])
+        sport_by_game = {game.id: sport for sport, market_pairs in pending for game, _ in market_pairs}
+        for surebet in surebets:
+            metrics.increment('surebet_found_total', sport=sport_by_game[surebet['game'].id])
+        all_surebets.extend(surebets)
+        pending.clear()
+        pending_count = 0
+
+    def analyze_sport(sport: str, games: list[Game], market_pairs: list):
+        nonlocal pending_count
+        if not batch_markets:
+            with metrics.timer('analyze', sport):
+                surebets = analyze_markets(market_pairs)
+            record_sport_activity(sport, games, market_pairs, surebets)
+            all_surebets.extend(surebets)
+            return
+        # Only the changed markets are held until the chunk is analyzed; the surebets are counted then.
+        record_sport_activity(sport, games, market_pairs, [])
+        if market_pairs:
+            pending.append((sport, market_pairs))
+            pending_count += len(market_pairs)
+            if pending_count >= config.PARALLEL_MIN_MARKETS:
+                analyze_pending()
+
+    if config.STREAMING_PARSE_ENABLED:
+        # Stream the sports game by game, either in parallel or one by one.
+        if config.CONCURRENT_FETCH_ENABLED:
+            game_results = stream_odds_concurrently(sport_keys)
+        else:
+            game_results = ((sport, game) for sport in sport_keys for game in stream_odds_for_sport(sport))
+
+        # Analyze each game as soon as it is parsed, then let it go.
+        for sport, game in game_results:
+            market_pairs = select_markets([game], odds_book, request_scopes.get(sport))
+            markets_seen[sport] += len(game.markets)
+            markets_changed[sport] += len(market_pairs)
+            analyze_sport(sport, [game], market_pairs)
+    else:
+        # Fetch the sports either in parallel or one by one, depending on the config.
+        if config.CONCURRENT_FETCH_ENABLED:
+            sport_results = fetch_odds_concurrently(sport_keys)
+        else:
+            sport_results = ((sport, fetch_odds_for_sport(sport)) for sport in sport_keys)
+
+        # Analyze each sport as soon as its data arrives.
+        for sport, processed_games in sport_results:
+            market_pairs = select_markets(processed_games, odds_book, request_scopes.get(sport))
+            if odds_book is not None:
+                print(f"{len(market_pairs)} market(s) changed in '{sport}'.")
+            markets_seen[sport] += sum(len(game.markets) for game in processed_games)
+            markets_changed[sport] += len(market_pairs)
+            analyze_sport(sport, processed_games, market_pairs)
+
+    if pending:
+        analyze_pending()
+
+    # All fetches are finished at this point, so the status entries can be safely updated.
+    for sport in sport_keys:
+        if sport in last_fetch_status:
+            last_fetch_status[sport]['markets'] = markets_seen[sport]
+            last_fetch_status[sport]['changed_markets'] = markets_changed[sport]
+
+    if config.SPORTS_CATALOG_ENABLED:
+        # Remember which sports answered with no games, so idle ones can be skipped later.
+        record_sport_results({sport: markets_seen[sport] for sport in sport_keys
+                              if sport in last_fetch_status and last_fetch_status[sport]['ok']
+                              and last_fetch_status[sport]['checked_at'] >= started_at})
+
+    return all_surebets
+
+def record_skipped_sport(sport_key: str):
+    """
+    Stores a status for a sport skipped by the sports catalog: a successful poll that cost
+    nothing and returned no markets, so the adaptive scheduler simply waits a full interval.
+
+    Args:
+        sport_key: The key of the skipped sport.
+    """
+    last_fetch_status[sport_key] = {
+        'ok': True,
+        'requests_remaining': None,
+        'requests_last': 0,
+        'checked_at': time.time(),
+        'markets': 0,
+        'changed_markets': 0,
+        'skipped': True
+    }
+
+def run_single_check(odds_book: OddsBook = None, sport_keys: list[str] = None) -> list:
     """
     Executes one full cycle of the bot: fetches odds for all target sports,
     analyzes them for surebets, and sends alerts for any opportunities found.
+
+    Args:
+        odds_book: Optional OddsBook that persists between cycles. When given, the new data
+            is merged into it and only the markets whose best prices changed are re-analyzed.
+        sport_keys: Optional list of sports (or wildcard patterns) to check. Defaults to config.TARGET_SPORTS.
+
+    Returns:
+        The list of surebet dictionaries found in this cycle.
     """
     print("Starting check cycle...")
     
     # Critical check to ensure the user has configured the API key.
     if not config.API_KEY or config.API_KEY == 'SUA_CHAVE_API_AQUI':
         print("\nCRITICAL ERROR: Please set your API_KEY in the config.py file.")
-        return
+        return []
 
-    all_surebets = []
-    # Loop through each sport defined in the config file.
-    for sport in config.TARGET_SPORTS:
-        processed_games = fetch_odds_for_sport(sport)
-        # For each game, run the surebet calculation logic.
-        for game in processed_games:
-            surebets_in_game = find_surebets_for_game(game)
-            if surebets_in_game:
-                all_surebets.extend(surebets_in_game)
-
-    if not all_surebets:
-        print("\nNo surebets found in this check.")
-    else:
-        print(f"\nSUCCESS! {len(all_surebets)} SUREBET OPPORTUNITY(S) FOUND!")
-        # For each surebet found, format and send a Telegram alert.
-        for surebet in all_surebets:
-            message = (
-                f"<b>💰 NEW SUREBET FOUND! 💰</b>\n\n"
-                f"<b>Guaranteed Profit:</b> {surebet['profit_margin']:.2f}%\n\n"
-                f"<b>Game:</b> {surebet['game'].home_team} vs {surebet['game'].away_team}\n"
-                f"<b>Market:</b> {surebet['market'].key.capitalize()} (Line: {surebet['market'].point})\n\n"
-                f"<b>Bets to place:</b>\n"
-                f"  1. <b>{surebet['best_odd_A'].price}</b> on <code>{surebet['best_odd_A'].name}</code> at <b>{surebet['best_odd_A'].bookmaker}</b>\n"
-                f"  2. <b>{surebet['best_odd_B'].price}</b> on <code>{surebet['best_odd_B'].name}</code> at <b>{surebet['best_odd_B'].bookmaker}</b>"
-            )
-            send_telegram_alert(message)
+    sport_keys = sport_keys if sport_keys is not None else config.TARGET_SPORTS
+    if config.SPORTS_CATALOG_ENABLED:
+        # Resolve wildcard patterns and leave out inactive or idle sports.
+        sport_keys, skipped_sports = select_sports(sport_keys, get_session())
+        for sport in skipped_sports:
+            record_skipped_sport(sport)
+
+    cycle_number = metrics.start_cycle()
+    cycle_started = time.perf_counter()
+
+    # The chosen cycle (config.PROFILE_CYCLE) runs under cProfile and tracemalloc.
+    with profile_cycle(cycle_number):
+        if odds_book is not None:
+            expire_started_games(odds_book)
+        all_surebets = scan_sports(sport_keys, odds_book)
+
+        if not all_surebets:
+            print("\nNo surebets found in this check.")
+        else:
+            print(f"\nSUCCESS! {len(all_surebets)} SUREBET OPPORTUNITY(S) FOUND!")
+            # For each surebet found, send (or queue) a Telegram alert, the most urgent first.
+            with metrics.timer('notify'):
+                for surebet in rank_surebets(all_surebets):
+                    dispatch_surebet_alert(surebet)
+
+    metrics.set_gauge('surebet_last_cycle_seconds', time.perf_counter() - cycle_started)
+    return all_surebets
 
 # This block allows the script to be run directly for a single check (e.g., for testing).
 # The main application entry point for automation is scheduler.py.
 if __name__ == "__main__":
     print("This file acts as the engine. To start automation, run scheduler.py")
     run_single_check()
+    flush_alerts()  # Let queued alerts go out before the program exits.
+    flush_history()
@@ -0,0 +1,186 @@
+# metrics.py
+# This module collects timings and counters for every stage of the scan loop and exposes them
+# in the Prometheus text format through an optional local HTTP endpoint. It also provides an
+# opt-in profiling mode that dumps cProfile and tracemalloc data for one chosen cycle.
+#
+# Stages timed per sport: 'http' (waiting on the API), 'json_decode', 'process'
+# (process_api_data / build_game), 'analyze' (surebet engine) and 'notify' (alert dispatch).
+# In streaming mode, 'stream' times each update from its arrival to the end of its analysis.
+
+import contextlib
+import cProfile
+import os
+import threading
+import time
+import tracemalloc
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import config
+
+# Help text of every metric, shown in the Prometheus output.
+METRIC_HELP = {
+    'surebet_stage_seconds': ('summary', "Time spent in each stage of the scan loop."),
+    'surebet_cycles_total': ('counter', "Check cycles started."),
+    'surebet_games_total': ('counter', "Games fetched from the API."),
+    'surebet_markets_total': ('counter', "Markets fetched from the API."),
+    'surebet_odds_total': ('counter', "Individual odds fetched from the API."),
+    'surebet_markets_analyzed_total': ('counter', "Markets run through the surebet engine."),
+    'surebet_found_total': ('counter', "Surebets and middles found."),
+    'surebet_errors_total': ('counter', "Failed API requests."),
+    'surebet_stream_updates_total': ('counter', "Odds updates received by the streaming daemon."),
+    'surebet_stream_errors_total': ('counter', "Malformed odds updates ignored by the streaming daemon."),
+    'surebet_history_dropped_total': ('counter', "Odds or surebet records dropped because the history writer fell behind."),
+    'surebet_evicted_total': ('counter', "Markets and games removed from the odds book after kickoff."),
+    'surebet_book_entries': ('gauge', "Games and markets currently held in the odds book."),
+    'surebet_requests_remaining': ('gauge', "API requests remaining, as reported by the API."),
+    'surebet_last_cycle_seconds': ('gauge', "Duration of the latest complete cycle."),
+}
+
+def format_labels(labels: dict) -> str:
+    """Formats a label dict as Prometheus labels, e.g. '{sport="soccer_epl",stage="http"}'."""
+    if not labels:
+        return ''
+    escaped = (f'{key}="{str(value).replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34))}"'
+               for key, value in sorted(labels.items()))
+    return '{' + ','.join(escaped) + '}'
+
+class Metrics:
+    """A thread-safe registry of counters, gauges and stage timings."""
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counters = {}      # Maps (name, labels) to a running total.
+        self.gauges = {}        # Maps (name, labels) to the latest value.
+        self.timings = {}       # Maps (labels) to [total_seconds, count] for 'surebet_stage_seconds'.
+        self.cycle_number = 0
+
+    def increment(self, name: str, value: float = 1, **labels):
+        """Adds a value to a counter."""
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def set_gauge(self, name: str, value: float, **labels):
+        """Sets a gauge to its latest value."""
+        with self.lock:
+            self.gauges[(name, tuple(sorted(labels.items())))] = value
+
+    def observe(self, stage: str, seconds: float, sport: str = None):
+        """Records the duration of one run of a stage."""
+        key = (('sport', sport or 'all'), ('stage', stage))
+        with self.lock:
+            total = self.timings.setdefault(key, [0.0, 0])
+            total[0] += seconds
+            total[1] += 1
+
+    @contextlib.contextmanager
+    def timer(self, stage: str, sport: str = None):
+        """
+        Times the code inside a 'with' block as one run of a stage.
+
+        Args:
+            stage: The stage name (e.g., 'http', 'analyze').
+            sport: The sport being processed, or None for stages that cover all sports.
+        """
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - started, sport)
+
+    def start_cycle(self) -> int:
+        """Counts a new cycle and returns its number (starting at 1)."""
+        with self.lock:
+            self.cycle_number += 1
+            cycle_number = self.cycle_number
+        self.increment('surebet_cycles_total')
+        return cycle_number
+
+    def render_prometheus(self) -> str:
+        """Renders every metric in the Prometheus text exposition format."""
+        with self.lock:
+            samples = {}
+            for (name, labels), value in list(self.counters.items()) + list(self.gauges.items()):
+                samples.setdefault(name, []).append((name, dict(labels), value))
+            for labels, (total, count) in self.timings.items():
+                samples.setdefault('surebet_stage_seconds', []).append(('surebet_stage_seconds_sum', dict(labels), total))
+                samples['surebet_stage_seconds'].append(('surebet_stage_seconds_count', dict(labels), count))
+
+        lines = []
+        for name in sorted(samples):
+            metric_type, help_text = METRIC_HELP.get(name, ('untyped', name))
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            for sample_name, labels, value in samples[name]:
+                lines.append(f"{sample_name}{format_labels(labels)} {value}")
+        return '\n'.join(lines) + '\n'
+
+# The registry shared by the whole bot.
+metrics = Metrics()
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    """Serves the metrics at /metrics."""
+    def do_GET(self):
+        if self.path.split('?')[0] != '/metrics':
+            self.send_error(404)
+            return
+        body = metrics.render_prometheus().encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        """Keeps scrapes out of the bot's console output."""
+
+def start_metrics_server(host: str = None, port: int = None) -> ThreadingHTTPServer:
+    """
+    Starts the metrics endpoint in a background thread.
+
+    Args:
+        host: The interface to listen on. Defaults to config.METRICS_HOST.
+        port: The port to listen on. Defaults to config.METRICS_PORT.
+
+    Returns:
+        The running server.
+    """
+    host = config.METRICS_HOST if host is None else host
+    port = config.METRICS_PORT if port is None else port
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, name='metrics-server', daemon=True).start()
+    print(f"Metrics available at http://{server.server_address[0]}:{server.server_address[1]}/metrics")
+    return server
+
+@contextlib.contextmanager
+def profile_cycle(cycle_number: int):
+    """
+    Profiles the code inside a 'with' block if it is the cycle chosen in config.PROFILE_CYCLE.
+    It writes a cProfile file (open it with 'python -m pstats' or snakeviz) and a tracemalloc
+    report of the top memory allocations to config.PROFILE_DIR.
+
+    Args:
+        cycle_number: The number of the cycle being run.
+    """
+    if config.PROFILE_CYCLE != cycle_number:
+        yield
+        return
+
+    profile_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), config.PROFILE_DIR)
+    os.makedirs(profile_dir, exist_ok=True)
+    profiler = cProfile.Profile()
+    tracemalloc.start(25)
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        snapshot = tracemalloc.take_snapshot()
+        peak_memory = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        profiler.dump_stats(os.path.join(profile_dir, f"cycle_{cycle_number}.prof"))
+        snapshot.dump(os.path.join(profile_dir, f"cycle_{cycle_number}.tracemalloc"))
+        with open(os.path.join(profile_dir, f"cycle_{cycle_number}_memory.txt"), 'w', encoding='utf-8') as file:
+            file.write(f"Peak traced memory: {peak_memory / (1024 * 1024):.2f} MB\n\n")
+            for stat in snapshot.statistics('lineno')[:50]:
+                file.write(f"{stat}\n")
+        print(f"Profile of cycle {cycle_number} saved to '{profile_dir}'.")
@@ -0,0 +1,254 @@
+# mock_servers.py
+# This module provides local HTTP stand-ins for The Odds API and the Telegram Bot API, so full
+# cycles can be load-tested without spending quota or messaging a real chat. Point the bot at
+# them through config.ODDS_API_BASE_URL and config.TELEGRAM_API_BASE_URL.
+#   - MockOddsAPI serves '/v4/sports' and '/v4/sports/{sport}/odds' with synthetic payloads
+#     (see payload_generator.py) and the same quota headers as the real API.
+#   - MockTelegram accepts '/bot{token}/sendMessage' and records every message it receives.
+# Both can add latency and answer with server errors or '429 Too Many Requests' at given rates.
+
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+from payload_generator import generate_payload
+
+class FaultProfile:
+    """The latency and failure behavior of a mock server."""
+    def __init__(self, latency: float = 0.0, jitter: float = 0.5, error_rate: float = 0.0,
+                 rate_limit_rate: float = 0.0, seed: int = 0):
+        self.latency = latency                  # Mean response time added to every request, in seconds.
+        self.jitter = jitter                    # Latency varies uniformly by +/- this share of the mean.
+        self.error_rate = error_rate            # Share of requests answered with '500 Internal Server Error'.
+        self.rate_limit_rate = rate_limit_rate  # Share of requests answered with '429 Too Many Requests'.
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()            # random.Random is shared by the server threads.
+
+    def delay(self):
+        """Sleeps for one randomized response time."""
+        if self.latency > 0:
+            with self.lock:
+                seconds = self.latency * self.rng.uniform(1 - self.jitter, 1 + self.jitter)
+            time.sleep(seconds)
+
+    def pick_failure(self) -> int | None:
+        """Returns 500 or 429 for a request that should fail, or None for a normal answer."""
+        with self.lock:
+            roll = self.rng.random()
+        if roll < self.error_rate:
+            return 500
+        if roll < self.error_rate + self.rate_limit_rate:
+            return 429
+        return None
+
+class MockHandler(BaseHTTPRequestHandler):
+    """Shared helpers of the mock request handlers."""
+    protocol_version = 'HTTP/1.1'  # Keep-alive, like the real APIs.
+
+    def send_json(self, status: int, body: bytes, headers: dict = None):
+        """Writes a JSON response."""
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        """Keeps requests out of the console output."""
+
+class OddsAPIHandler(MockHandler):
+    """Serves the sports list and synthetic odds."""
+    def do_GET(self):
+        server = self.server
+        parts = urlsplit(self.path)
+        path = parts.path.rstrip('/').split('/')
+        server.fault.delay()
+
+        failure = server.fault.pick_failure()
+        if failure:
+            server.count('errors' if failure == 500 else 'rate_limited')
+            self.send_json(failure, json.dumps({'message': 'Mock failure'}).encode())
+            return
+
+        if path[-1] == 'sports':
+            server.count('sports_requests')
+            self.send_json(200, server.sports_body)
+        elif len(path) >= 2 and path[-1] == 'odds' and path[-2] in server.payloads:
+            # The API bills markets x regions (every 10 bookmakers count as one region).
+            params = parse_qs(parts.query)
+            markets = len(params.get('markets', ['h2h'])[0].split(','))
+            if 'bookmakers' in params:
+                regions = -(-len(params['bookmakers'][0].split(',')) // 10)
+            else:
+                regions = len(params.get('regions', ['us'])[0].split(','))
+            cost = markets * regions
+            remaining = server.spend(cost)
+
+            variants = server.payloads[path[-2]]
+            body = variants[server.count('odds_requests') % len(variants)]
+            self.send_json(200, body, {'x-requests-remaining': str(remaining), 'x-requests-last': str(cost)})
+        else:
+            self.send_json(404, json.dumps({'message': 'Unknown endpoint'}).encode())
+
+class MockOddsAPI(ThreadingHTTPServer):
+    """A local stand-in for The Odds API."""
+    daemon_threads = True
+
+    def __init__(self, sports: int = 4, games: int = 50, bookmakers: int = 20, lines: int = 3,
+                 surebet_density: float = 0.01, variants: int = 3, quota: int = 100000,
+                 fault: FaultProfile = None, host: str = '127.0.0.1', port: int = 0):
+        """
+        Generates the payloads and binds the server (call start() to serve).
+
+        Args:
+            sports: Number of sports offered ('mock_sport_0', 'mock_sport_1', ...).
+            games: Games per sport.
+            bookmakers: Bookmakers per game.
+            lines: Lines per totals/spreads market.
+            surebet_density: Share of markets with an injected surebet.
+            variants: Number of snapshots per sport; requests cycle through them, so prices move.
+            quota: The starting value of the 'x-requests-remaining' header.
+            fault: The latency and failure behavior. Defaults to none.
+            host: The interface to listen on.
+            port: The port to listen on (0 picks a free one).
+        """
+        super().__init__((host, port), OddsAPIHandler)
+        self.fault = fault or FaultProfile()
+        self.remaining = quota
+        self.counters = {}
+        self.lock = threading.Lock()
+
+        sport_keys = [f"mock_sport_{index}" for index in range(sports)]
+        self.sports_body = json.dumps([
+            {'key': key, 'group': 'Mock', 'title': key.replace('_', ' ').title(), 'active': True, 'has_outrights': False}
+            for key in sport_keys
+        ]).encode()
+        self.payloads = {}
+        for sport_index, sport_key in enumerate(sport_keys):
+            snapshots = []
+            kickoffs = None
+            for variant in range(variants):
+                payload = generate_payload(games=games, bookmakers=bookmakers, lines=lines, surebet_density=surebet_density,
+                                           sport_key=sport_key, seed=sport_index * 1000 + variant)
+                # Keep the same games (IDs and kickoff times) in every snapshot, so only the prices move.
+                kickoffs = kickoffs or [game['commence_time'] for game in payload]
+                for game_index, game in enumerate(payload):
+                    game['id'] = f"{sport_key}_{game_index:05d}"
+                    game['commence_time'] = kickoffs[game_index]
+                snapshots.append(json.dumps(payload).encode())
+            self.payloads[sport_key] = snapshots
+
+    @property
+    def base_url(self) -> str:
+        """The value to use as config.ODDS_API_BASE_URL."""
+        return f"http://{self.server_address[0]}:{self.server_address[1]}/v4"
+
+    def count(self, name: str) -> int:
+        """Increments a request counter and returns its previous value."""
+        with self.lock:
+            value = self.counters.get(name, 0)
+            self.counters[name] = value + 1
+            return value
+
+    def spend(self, cost: int) -> int:
+        """Takes quota for a request and returns what is left."""
+        with self.lock:
+            self.remaining -= cost
+            return self.remaining
+
+    def start(self):
+        """Serves requests in a background thread."""
+        threading.Thread(target=self.serve_forever, name='mock-odds-api', daemon=True).start()
+        return self
+
+class TelegramHandler(MockHandler):
+    """Accepts sendMessage calls and records them."""
+    def do_POST(self):
+        server = self.server
+        body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        server.fault.delay()
+
+        if not self.path.endswith('/sendMessage'):
+            self.send_json(404, json.dumps({'ok': False, 'error_code': 404, 'description': 'Not Found'}).encode())
+            return
+
+        failure = server.fault.pick_failure() or (429 if server.over_rate_limit() else None)
+        if failure == 429:
+            server.count('rate_limited')
+            self.send_json(429, json.dumps({
+                'ok': False, 'error_code': 429, 'description': f"Too Many Requests: retry after {server.retry_after}",
+                'parameters': {'retry_after': server.retry_after}
+            }).encode())
+            return
+        if failure == 500:
+            server.count('errors')
+            self.send_json(500, json.dumps({'ok': False, 'error_code': 500, 'description': 'Internal Server Error'}).encode())
+            return
+
+        message = json.loads(body)
+        server.record(message.get('text', ''))
+        self.send_json(200, json.dumps({'ok': True, 'result': {'message_id': server.count('messages')}}).encode())
+
+class MockTelegram(ThreadingHTTPServer):
+    """A local stand-in for the Telegram Bot API."""
+    daemon_threads = True
+
+    def __init__(self, max_per_second: float = None, retry_after: float = 1, fault: FaultProfile = None,
+                 host: str = '127.0.0.1', port: int = 0):
+        """
+        Binds the server (call start() to serve).
+
+        Args:
+            max_per_second: Like Telegram, answer '429' when more messages than this arrive within
+                one second. None disables the limit.
+            retry_after: The 'retry_after' value sent with every 429 answer, in seconds.
+            fault: The latency and random failure behavior. Defaults to none.
+            host: The interface to listen on.
+            port: The port to listen on (0 picks a free one).
+        """
+        super().__init__((host, port), TelegramHandler)
+        self.fault = fault or FaultProfile()
+        self.max_per_second = max_per_second
+        self.retry_after = retry_after
+        self.messages = []      # (received_at, text) of every accepted message.
+        self.recent = []        # Arrival times of the messages of the last second.
+        self.counters = {}
+        self.lock = threading.Lock()
+
+    @property
+    def base_url(self) -> str:
+        """The value to use as config.TELEGRAM_API_BASE_URL."""
+        return f"http://{self.server_address[0]}:{self.server_address[1]}"
+
+    def count(self, name: str) -> int:
+        """Increments a request counter and returns its previous value."""
+        with self.lock:
+            value = self.counters.get(name, 0)
+            self.counters[name] = value + 1
+            return value
+
+    def over_rate_limit(self) -> bool:
+        """Tells whether a message arriving now exceeds max_per_second, and records its arrival."""
+        if self.max_per_second is None:
+            return False
+        now = time.monotonic()
+        with self.lock:
+            self.recent = [arrival for arrival in self.recent if now - arrival < 1.0]
+            if len(self.recent) >= self.max_per_second:
+                return True
+            self.recent.append(now)
+            return False
+
+    def record(self, text: str):
+        """Stores an accepted message with its arrival time."""
+        with self.lock:
+            self.messages.append((time.time(), text))
+
+    def start(self):
+        """Serves requests in a background thread."""
+        threading.Thread(target=self.serve_forever, name='mock-telegram', daemon=True).start()
+        return self
@@ -1,14 +1,25 @@
 # models.py
 # This file defines the data structures (classes) used to represent games,
-# markets, and odds in a structured way.
+# markets, and odds in a structured way, plus make_surebet, which builds the
+# dictionary describing an opportunity.
+# All classes use __slots__ (no per-instance __dict__) because a single cycle can create
+# hundreds of thousands of Odd objects, and repeated names are interned so that every
+# odd from the same bookmaker or outcome shares one string in memory.
+# A Market also keeps its prices and outcome codes in flat arrays, filled as odds are added,
+# so the NumPy engines can read a whole batch of markets without looping over every Odd.
+
+import sys
+from array import array
 
 class Odd:
     """Represents a single betting odd from a specific bookmaker for one outcome."""
+    __slots__ = ('name', 'price', 'bookmaker', 'point')
+
     def __init__(self, name: str, price: float, bookmaker: str, point: float = None):
-        self.name = name          # The name of the outcome (e.g., 'Home', 'Away', 'Over').
-        self.price = price        # The decimal betting odd (e.g., 1.95).
-        self.bookmaker = bookmaker# The key of the bookmaker offering the odd (e.g., 'betfair').
-        self.point = point        # The point value for totals or spreads (e.g., 2.5 for Over/Under).
+        self.name = sys.intern(name)          # The name of the outcome (e.g., 'Home', 'Away', 'Over').
+        self.price = price                    # The decimal betting odd (e.g., 1.95).
+        self.bookmaker = sys.intern(bookmaker)# The key of the bookmaker offering the odd (e.g., 'betfair').
+        self.point = point                    # The point value for totals or spreads (e.g., 2.5 for Over/Under).
 
     def __repr__(self):
         """Provides a string representation for debugging."""
@@ -16,10 +27,30 @@ class Odd:
 
 class Market:
     """Represents a specific betting market within a game, like 'totals' at a 2.5 line."""
+    __slots__ = ('key', 'point', 'outcomes', 'outcome_codes', 'prices', 'codes')
+
     def __init__(self, key: str, point: float):
-        self.key = key          # The type of market (e.g., 'h2h', 'totals', 'spreads').
+        self.key = sys.intern(key) # The type of market (e.g., 'h2h', 'totals', 'spreads').
         self.point = point      # The line for this market (e.g., 2.5).
         self.outcomes = []      # A list to hold all Odd objects for this market.
+        self.outcome_codes = {} # Maps each outcome name to its local code (0, 1, ...), in first-seen order.
+        self.prices = array('d') # The price of each odd in 'outcomes', in the same order.
+        self.codes = array('i')  # The outcome code of each odd in 'outcomes', in the same order.
+
+    def add_odd(self, odd: Odd):
+        """Adds an odd to the market, keeping the price and outcome code columns in step."""
+        self.outcomes.append(odd)
+        self.prices.append(odd.price)
+        self.codes.append(self.outcome_codes.setdefault(odd.name, len(self.outcome_codes)))
+
+    def add_odds(self, odds):
+        """Adds several odds to the market (see add_odd)."""
+        for odd in odds:
+            self.add_odd(odd)
+
+    def columns_in_sync(self) -> bool:
+        """Tells whether the columns cover every odd (False if 'outcomes' was edited directly)."""
+        return len(self.prices) == len(self.outcomes)
 
     def __str__(self):
         """Provides a user-friendly, multi-line string representation of the market."""
@@ -33,13 +64,46 @@ class Market:
 
 class Game:
     """Represents a single sporting event, containing all its associated markets and odds."""
-    def __init__(self, id: str, home_team: str, away_team: str, commence_time: str):
+    __slots__ = ('id', 'home_team', 'away_team', 'commence_time', 'sport_key', 'markets')
+
+    def __init__(self, id: str, home_team: str, away_team: str, commence_time: str, sport_key: str = None):
         self.id = id                      # The unique ID of the game from the API.
         self.home_team = home_team
         self.away_team = away_team
         self.commence_time = commence_time # The start time of the game (in ISO 8601 format).
-        self.markets = {}                 # A dictionary to store Market objects, keyed by a unique market ID.
+        self.sport_key = sport_key        # The key of the sport the game belongs to (e.g., 'soccer_epl').
+        self.markets = {}                 # A dictionary to store Market objects, keyed by a (market_key, point) tuple.
 
     def __repr__(self):
         """Provides a simple string representation of the game for easy identification."""
         return f"Game: {self.home_team} vs {self.away_team} (Starts: {self.commence_time})"
+
+def make_surebet(game: Game, market: Market, legs: list[Odd], margin: float, **extra) -> dict:
+    """
+    Builds the surebet dictionary shared by every engine, the notifier and the history store.
+    Backing each leg with a share of the total stake proportional to 1 / price makes every
+    leg pay out the same amount: the total stake divided by the margin.
+
+    Args:
+        game: The Game object the opportunity belongs to.
+        market: The Market object (for middles, a synthetic market spanning both lines).
+        legs: The best Odd object of each outcome, one bet per outcome.
+        margin: The sum of 1 / price over the legs; below 1 for a surebet.
+        **extra: Additional fields, such as type='middle'.
+
+    Returns:
+        A dictionary with 'game', 'market', 'legs', 'stakes' (the share of the total stake to
+        place on each leg) and 'profit_margin' (percentage). Two-leg surebets also keep the
+        'best_odd_A' and 'best_odd_B' fields.
+    """
+    surebet = {
+        "game": game,
+        "market": market,
+        "legs": legs,
+        "stakes": [(1 / odd.price) / margin for odd in legs],
+        "profit_margin": (1 - margin) * 100
+    }
+    if len(legs) == 2:
+        surebet["best_odd_A"], surebet["best_odd_B"] = legs
+    surebet.update(extra)
+    return surebet
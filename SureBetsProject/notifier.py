@@ -1,33 +1,104 @@
 # notifier.py
 # This module handles sending formatted alert messages to a Telegram chat.
+# Alerts can be sent synchronously with send_telegram_alert, or handed to the AlertDispatcher,
+# which sends them from a background thread so that scanning never waits on Telegram.
+# The dispatcher sends the most urgent alerts first (see price_history.py).
 
+import collections
+import itertools
+import queue
+import threading
+import time
 import requests
 import config 
 
-def send_telegram_alert(message: str):
+# Telegram rejects messages longer than this many characters.
+TELEGRAM_MAX_MESSAGE_LENGTH = 4096
+
+# How many delivered alerts the dispatcher remembers (see AlertDispatcher.deliveries).
+DELIVERY_LOG_SIZE = 10000
+
+def format_surebet_alert(surebet: dict, title: str = "NEW SUREBET FOUND!") -> str:
+    """
+    Formats a surebet dictionary into an HTML message for Telegram.
+
+    Args:
+        surebet: A surebet dictionary, as returned by the surebet calculator.
+        title: The headline shown at the top of the message.
+
+    Returns:
+        The formatted message.
+    """
+    game = surebet['game']
+    market = surebet['market']
+    legs = surebet['legs']
+
+    if surebet.get('type') == 'middle':
+        # A middle spans two lines, so show the line of each bet next to its outcome.
+        market_line = f"{market.key.capitalize()} Middle (Lines: {market.point[0]} / {market.point[1]})"
+        names = [f"{odd.name} {odd.point}" for odd in legs]
+    else:
+        market_line = f"{market.key.capitalize()} (Line: {market.point})"
+        names = [odd.name for odd in legs]
+
+    # One line per bet, with the share of the total stake that makes every bet pay out the same.
+    bets = "\n".join(
+        f"  {number}. <b>{odd.price}</b> on <code>{name}</code> at <b>{odd.bookmaker}</b> ({stake:.1%} of the stake)"
+        for number, (odd, name, stake) in enumerate(zip(legs, names, surebet['stakes']), start=1)
+    )
+
+    # Only shown when the price history could estimate how long the surebet will last.
+    lifetime_line = ''
+    if 'expected_lifetime' in surebet:
+        lifetime_line = f"<b>Expected to last:</b> ~{format_duration(surebet['expected_lifetime'])}\n"
+
+    return (
+        f"<b>💰 {title} 💰</b>\n\n"
+        f"<b>Guaranteed Profit:</b> {surebet['profit_margin']:.2f}%\n"
+        f"{lifetime_line}\n"
+        f"<b>Game:</b> {game.home_team} vs {game.away_team}\n"
+        f"<b>Market:</b> {market_line}\n\n"
+        f"<b>Bets to place:</b>\n"
+        f"{bets}"
+    )
+
+def format_duration(seconds: float) -> str:
+    """Formats a number of seconds as a short, human-readable duration (e.g., '45s', '12 min', '3.5 h')."""
+    if seconds < 60:
+        return f"{seconds:.0f}s"
+    if seconds < 3600:
+        return f"{seconds / 60:.0f} min"
+    return f"{seconds / 3600:.1f} h"
+
+def send_telegram_alert(message: str, session: requests.Session = None) -> bool:
     """
     Sends a message to the configured Telegram chat.
     It checks the config file to ensure notifications are enabled and credentials are set.
+    If Telegram answers '429 Too Many Requests', it waits the requested time and retries once.
 
     Args:
         message: The string message to be sent. HTML formatting is supported.
+        session: Optional HTTP session to reuse, so the connection to Telegram is kept alive.
+
+    Returns:
+        True if Telegram confirmed the message was sent, False otherwise.
     """
     
     # If Telegram notifications are globally disabled in config.py, do nothing.
     if not config.TELEGRAM_ENABLED:
         print("Telegram notifications are disabled. Skipping alert.")
-        return 
+        return False
 
     # Validate that the bot token and chat ID are properly configured.
     if not config.TELEGRAM_BOT_TOKEN or config.TELEGRAM_BOT_TOKEN == 'SEU_TOKEN_AQUI':
         print("WARNING: Telegram Bot Token is not set in config.py. Cannot send alert.")
-        return
+        return False
     if not config.TELEGRAM_CHAT_ID or config.TELEGRAM_CHAT_ID == 'SEU_CHAT_ID_AQUI':
         print("WARNING: Telegram Chat ID is not set in config.py. Cannot send alert.")
-        return
+        return False
 
     # The URL for the Telegram Bot API's sendMessage method.
-    url = f"https://api.telegram.org/bot{config.TELEGRAM_BOT_TOKEN}/sendMessage"
+    url = f"{config.TELEGRAM_API_BASE_URL}/bot{config.TELEGRAM_BOT_TOKEN}/sendMessage"
 
     # The payload containing the recipient's chat ID and the message text.
     # 'parse_mode': 'HTML' allows for rich formatting like <b>bold</b> and <code>code</code>.
@@ -38,8 +109,17 @@ def send_telegram_alert(message: str):
     }
 
     try:
-        # Send the message via an HTTP POST request.
-        response = requests.post(url, json=payload)
+        for attempt in range(2):
+            # Send the message via an HTTP POST request.
+            response = (session or requests).post(url, json=payload)
+
+            # Telegram's rate limit: wait the time it asks for, then try one more time.
+            if response.status_code == 429 and attempt == 0:
+                retry_after = response.json().get('parameters', {}).get('retry_after', 1)
+                print(f"Telegram rate limit reached. Retrying in {retry_after} seconds...")
+                time.sleep(min(retry_after, 60))
+                continue
+            break
         
         # Raise an exception for HTTP errors (e.g., 401 for an invalid token).
         response.raise_for_status() 
@@ -47,10 +127,204 @@ def send_telegram_alert(message: str):
         # Check the 'ok' field in Telegram's JSON response to confirm the message was sent.
         if response.json().get('ok'):
             print("Surebet alert sent successfully to Telegram!")
-        else:
-            print(f"Failed to send Telegram alert: {response.text}")
+            return True
+        print(f"Failed to send Telegram alert: {response.text}")
+        return False
 
     # Catch any network-related errors during the request.
     except requests.exceptions.RequestException as e:
         print(f"Connection error while trying to send Telegram alert: {e}")
+        return False
+
+def alert_key(surebet: dict) -> tuple:
+    """
+    Identifies an opportunity by its game, market and the bookmakers of its bets,
+    so the same opportunity is recognized again in later cycles.
+
+    Args:
+        surebet: A surebet dictionary.
+
+    Returns:
+        A hashable key.
+    """
+    market = surebet['market']
+    bookmakers = tuple(odd.bookmaker for odd in surebet['legs'])
+    return (surebet['game'].id, market.key, market.point, bookmakers)
+
+class TokenBucket:
+    """A token-bucket rate limiter: allows short bursts while enforcing an average rate."""
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate                # Tokens added per second.
+        self.capacity = capacity        # Maximum tokens stored, i.e., the largest burst.
+        self.tokens = float(capacity)
+        self.updated_at = time.monotonic()
+
+    def acquire(self):
+        """Blocks until a token is available, then consumes it."""
+        while True:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+            self.updated_at = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            time.sleep((1 - self.tokens) / self.rate)
+
+class AlertDispatcher:
+    """
+    Sends surebet alerts from a background thread.
+      - Repeated alerts for the same game, market and bookmakers are suppressed while one is
+        waiting to be sent, and for a TTL once it was delivered. An alert that fails to send
+        can be queued again by the next cycle.
+      - Waiting surebets are sent in order of priority (the most urgent first) and
+        combined into batched messages.
+      - A token bucket keeps the sending rate within Telegram's limits.
+      - A single HTTP session keeps the connection to Telegram alive.
+    """
+    def __init__(self):
+        self.queue = queue.PriorityQueue()  # (-priority, sequence, surebet); the sequence keeps ties in order.
+        self.sequence = itertools.count()
+        self.session = requests.Session()
+        self.rate_limiter = TokenBucket(config.ALERT_RATE_PER_SECOND, config.ALERT_BURST)
+        self.recent_alerts = {}         # Maps each delivered alert's key to the time its suppression expires.
+        self.pending_alerts = {}        # Maps the key of each alert queued but not sent yet to when it was queued.
+        self.lock = threading.Lock()
+        self.queued_count = 0
+        self.suppressed_count = 0
+        self.sent_count = 0            # Messages confirmed by Telegram.
+        self.delivered_count = 0       # Alerts carried by those messages.
+        self.failed_count = 0          # Alerts whose message failed, so they were not delivered.
+        # (alert_key, queued_at, delivered_at) of the latest delivered alerts, as Unix timestamps.
+        self.deliveries = collections.deque(maxlen=DELIVERY_LOG_SIZE)
+        self.thread = threading.Thread(target=self.run, name='alert-dispatcher', daemon=True)
+        self.thread.start()
+
+    def submit(self, surebet: dict) -> bool:
+        """
+        Queues a surebet for sending, unless the same opportunity is already queued or was alerted recently.
+        This call never blocks on the network.
+
+        Args:
+            surebet: A surebet dictionary.
+
+        Returns:
+            True if the surebet was queued, False if it was suppressed as a repeat.
+        """
+        now = time.monotonic()
+        key = alert_key(surebet)
+        with self.lock:
+            if key in self.pending_alerts or self.recent_alerts.get(key, 0) > now:
+                self.suppressed_count += 1
+                return False
+            self.pending_alerts[key] = time.time()
+            self.queued_count += 1
+
+        self.queue.put((-surebet.get('priority', 0.0), next(self.sequence), surebet))
+        return True
+
+    def next_batch(self) -> list:
+        """Waits for the most urgent surebet, then takes the next most urgent ones, up to the batch size."""
+        batch = [self.queue.get()[2]]
+        while len(batch) < config.ALERT_BATCH_SIZE:
+            try:
+                batch.append(self.queue.get_nowait()[2])
+            except queue.Empty:
+                break
+        return batch
+
+    def run(self):
+        """The background loop: takes batches from the queue and sends them, respecting the rate limit."""
+        while True:
+            batch = self.next_batch()
+            try:
+                messages = [(format_surebet_alert(surebet), [surebet]) for surebet in batch]
+                if len(batch) > 1:
+                    messages.insert(0, (f"<b>{len(batch)} surebets found:</b>", []))
+
+                # Group the messages into as few Telegram messages as the length limit allows.
+                chunk, surebets = '', []
+                for message, message_surebets in messages:
+                    if chunk and len(chunk) + len(message) + 2 > TELEGRAM_MAX_MESSAGE_LENGTH:
+                        self.send(chunk, surebets)
+                        chunk, surebets = '', []
+                    chunk = f"{chunk}\n\n{message}" if chunk else message
+                    surebets += message_surebets
+                self.send(chunk, surebets)
+            except Exception as e:
+                # Never let one bad alert stop the dispatcher thread.
+                print(f"Error while dispatching alerts: {e}")
+            finally:
+                # Alerts that were not delivered are no longer waiting and may be queued again.
+                # Delivered alerts already left pending_alerts in send().
+                with self.lock:
+                    for surebet in batch:
+                        if self.pending_alerts.pop(alert_key(surebet), None) is not None:
+                            self.failed_count += 1
+                for _ in batch:
+                    self.queue.task_done()
+
+    def send(self, message: str, surebets: list):
+        """
+        Sends one message once the rate limiter allows it. If it is delivered, repeats of its
+        surebets are suppressed for the dedup TTL.
+
+        Args:
+            message: The message text.
+            surebets: The surebets whose alerts the message contains.
+        """
+        self.rate_limiter.acquire()
+        if not send_telegram_alert(message, self.session):
+            return
+        self.sent_count += 1
+
+        now, delivered_at = time.monotonic(), time.time()
+        with self.lock:
+            for surebet in surebets:
+                key = alert_key(surebet)
+                self.recent_alerts[key] = now + config.ALERT_DEDUP_TTL_MINUTES * 60
+                self.deliveries.append((key, self.pending_alerts.pop(key, delivered_at), delivered_at))
+            self.delivered_count += len(surebets)
+            # Forget expired keys once the cache grows, so it stays small over long runs.
+            if len(self.recent_alerts) > 10000:
+                self.recent_alerts = {k: expiry for k, expiry in self.recent_alerts.items() if expiry > now}
+
+    def flush(self, timeout: float = 30.0):
+        """
+        Waits until every queued alert has been sent (or until the timeout expires).
+        Useful before the program exits, since the dispatcher thread does not keep it alive.
+
+        Args:
+            timeout: The maximum number of seconds to wait.
+        """
+        deadline = time.monotonic() + timeout
+        while self.queue.unfinished_tasks and time.monotonic() < deadline:
+            time.sleep(0.05)
+
+# The dispatcher is created on first use, so importing this module does not start a thread.
+_dispatcher = None
+
+def get_dispatcher() -> AlertDispatcher:
+    """Returns the shared AlertDispatcher, starting it on first use."""
+    global _dispatcher
+    if _dispatcher is None:
+        _dispatcher = AlertDispatcher()
+    return _dispatcher
+
+def dispatch_surebet_alert(surebet: dict):
+    """
+    Sends the alert of a surebet, either through the background dispatcher or synchronously,
+    depending on config.ALERT_DISPATCHER_ENABLED.
+
+    Args:
+        surebet: A surebet dictionary.
+    """
+    if config.ALERT_DISPATCHER_ENABLED:
+        if not get_dispatcher().submit(surebet):
+            print("Repeated surebet alert suppressed.")
+    else:
+        send_telegram_alert(format_surebet_alert(surebet))
 
+def flush_alerts(timeout: float = 30.0):
+    """Waits for the background dispatcher (if it was started) to send every queued alert."""
+    if _dispatcher is not None:
+        _dispatcher.flush(timeout)
@@ -0,0 +1,236 @@
+# odds_book.py
+# This module keeps a persistent, in-memory copy of every game and market seen by the bot.
+# New API data is merged into it as a diff: only markets whose best prices actually moved
+# are marked as "dirty" and need to be re-analyzed, so the work done per cycle scales with
+# the number of price changes instead of the total size of the book.
+#
+# Games are expired in two stages, driven by a heap keyed on their kickoff time:
+#   1. At kickoff, their pre-match markets are dropped: bookmakers suspend those prices, and
+#      mixing them with live prices would produce surebets that no longer exist.
+#   2. GAME_RETENTION_HOURS later (once the game is over), the game itself is removed.
+# So a long-running process only holds upcoming and in-play games, whatever its uptime.
+
+import heapq
+import time
+from datetime import datetime, timezone
+import config
+from models import Game, Market
+
+# Expiry stages, in the order they happen.
+STAGE_KICKOFF = 0   # Drop the game's pre-match markets.
+STAGE_FINISHED = 1  # Remove the game from the book.
+
+def parse_commence_time(commence_time: str) -> datetime:
+    """
+    Converts an ISO 8601 kickoff time from the API (e.g., '2025-05-01T19:00:00Z') into a datetime.
+
+    Args:
+        commence_time: The kickoff time string.
+
+    Returns:
+        A timezone-aware datetime in UTC.
+    """
+    return datetime.fromisoformat(commence_time.replace('Z', '+00:00'))
+
+def best_price_signature(market: Market) -> tuple:
+    """
+    Builds a compact fingerprint of the best available price for each outcome of a market.
+    Two snapshots of a market with the same signature always produce the same surebet result.
+
+    Args:
+        market: The Market object to fingerprint.
+
+    Returns:
+        A sorted tuple of (outcome_name, best_price) pairs.
+    """
+    best_prices = {}
+    for odd in market.outcomes:
+        if odd.price > best_prices.get(odd.name, 0):
+            best_prices[odd.name] = odd.price
+    return tuple(sorted(best_prices.items()))
+
+class OddsBook:
+    """A persistent store of games and markets, keyed by game ID and market ID."""
+    def __init__(self):
+        self.games = {}         # Maps each game ID to its stored Game object.
+        self.signatures = {}    # Maps each (game_id, market_id) to its last best-price signature.
+        self.expiry_heap = []   # (due_time, stage, game_id, commence_time); entries of rescheduled games are skipped.
+        self.evicted = {'markets': 0, 'games': 0}  # Totals removed by expire(), for monitoring.
+
+    def store_game(self, game: Game) -> Game:
+        """
+        Returns the stored copy of a game, creating it on first sight and keeping its kickoff time up to date.
+
+        Args:
+            game: A freshly built Game object.
+
+        Returns:
+            The Game object held by the book.
+        """
+        stored_game = self.games.get(game.id)
+        if stored_game is None:
+            stored_game = self.games[game.id] = Game(
+                id=game.id,
+                home_team=game.home_team,
+                away_team=game.away_team,
+                commence_time=game.commence_time,
+                sport_key=game.sport_key
+            )
+            self.schedule_expiry(stored_game)
+        elif stored_game.commence_time != game.commence_time:
+            # Kickoff times can be rescheduled, so always keep the latest one.
+            stored_game.commence_time = game.commence_time
+            self.schedule_expiry(stored_game)
+        return stored_game
+
+    def schedule_expiry(self, game: Game):
+        """
+        Schedules the kickoff stage of a game's expiry. Any older entry of the game stays in the
+        heap and is skipped when popped, since its commence_time no longer matches.
+
+        Args:
+            game: The stored Game object.
+        """
+        kickoff = parse_commence_time(game.commence_time).timestamp()
+        heapq.heappush(self.expiry_heap, (kickoff, STAGE_KICKOFF, game.id, game.commence_time))
+
+    def expire(self, now: float = None) -> tuple[int, int]:
+        """
+        Applies every expiry stage that is due: drops the markets of games that have kicked off
+        and removes games that kicked off more than GAME_RETENTION_HOURS ago. Each game costs a
+        constant number of heap operations over its lifetime, and a call with nothing due only
+        looks at the top of the heap.
+
+        Args:
+            now: The current time as a Unix timestamp. Defaults to time.time().
+
+        Returns:
+            A tuple (markets_dropped, games_removed).
+        """
+        now = now or time.time()
+        markets_dropped = games_removed = 0
+
+        while self.expiry_heap and self.expiry_heap[0][0] <= now:
+            due_time, stage, game_id, commence_time = heapq.heappop(self.expiry_heap)
+            game = self.games.get(game_id)
+            if game is None or game.commence_time != commence_time:
+                continue  # The game was removed or rescheduled; a newer entry covers it.
+
+            # Markets received after kickoff (live odds) are dropped together with the game.
+            for market_id in game.markets:
+                self.signatures.pop((game_id, market_id), None)
+            markets_dropped += len(game.markets)
+            game.markets = {}
+
+            if stage == STAGE_KICKOFF:
+                heapq.heappush(self.expiry_heap, (due_time + config.GAME_RETENTION_HOURS * 3600, STAGE_FINISHED, game_id, commence_time))
+            else:
+                del self.games[game_id]
+                games_removed += 1
+
+        self.evicted['markets'] += markets_dropped
+        self.evicted['games'] += games_removed
+        return markets_dropped, games_removed
+
+    def merge(self, games: list[Game]) -> list[tuple[Game, Market]]:
+        """
+        Merges freshly fetched games into the book and reports which markets changed.
+
+        Args:
+            games: A list of Game objects, as returned by process_api_data.
+
+        Returns:
+            A list of (game, market) tuples for every new market or market whose best price changed.
+        """
+        dirty_markets = []
+
+        for game in games:
+            stored_game = self.store_game(game)
+
+            # Forget the signatures of markets that are no longer offered.
+            for market_id in stored_game.markets.keys() - game.markets.keys():
+                self.signatures.pop((game.id, market_id), None)
+
+            for market_id, market in game.markets.items():
+                signature = best_price_signature(market)
+                key = (game.id, market_id)
+                if self.signatures.get(key) != signature:
+                    self.signatures[key] = signature
+                    dirty_markets.append((stored_game, market))
+
+            # The latest snapshot of the markets replaces the old one.
+            stored_game.markets = game.markets
+
+        return dirty_markets
+
+    def apply_update(self, game: Game, updated: set[tuple[str, str]], exclusive: bool = False) -> list[tuple[Game, Market]]:
+        """
+        Applies a partial update (e.g., one bookmaker's new prices from a streaming feed, or the response
+        of a request shaped by the planner) to the book.
+        For each (bookmaker, market_key) pair listed in 'updated', that bookmaker's odds on every line
+        of the market are replaced by the ones in 'game' (so a line it no longer offers disappears);
+        all other bookmakers' odds are kept, unless 'exclusive' is set. Changed markets are rebuilt as
+        new Market objects rather than edited in place, so surebets still waiting to be alerted keep
+        the prices they were found with.
+
+        Args:
+            game: A Game object holding only the updated odds, as built by build_game.
+            updated: The (bookmaker_key, market_key) pairs covered by the update.
+            exclusive: When True, the odds of bookmakers missing from 'updated' are also dropped from
+                the market keys it covers. Used for shaped requests, whose other bookmakers were last
+                seen in an older full sweep and must not be combined with fresh prices.
+
+        Returns:
+            A list of (game, market) tuples for every market whose best price changed.
+        """
+        dirty_markets = []
+        stored_game = self.store_game(game)
+        updated_market_keys = {market_key for _, market_key in updated}
+        touched_ids = {market_id for market_id, market in stored_game.markets.items() if market.key in updated_market_keys}
+
+        for market_id in touched_ids | game.markets.keys():
+            new_market = Market(key=market_id[0], point=market_id[1])
+            old_market = stored_game.markets.get(market_id)
+            if old_market is not None and not exclusive:
+                new_market.add_odds(odd for odd in old_market.outcomes if (odd.bookmaker, old_market.key) not in updated)
+            if market_id in game.markets:
+                new_market.add_odds(game.markets[market_id].outcomes)
+
+            key = (game.id, market_id)
+            if not new_market.outcomes:
+                # Nobody offers this line anymore.
+                stored_game.markets.pop(market_id, None)
+                self.signatures.pop(key, None)
+                continue
+
+            stored_game.markets[market_id] = new_market
+            signature = best_price_signature(new_market)
+            if self.signatures.get(key) != signature:
+                self.signatures[key] = signature
+                dirty_markets.append((stored_game, new_market))
+
+        return dirty_markets
+
+    def next_kickoff(self, sport_key: str, now: datetime = None) -> datetime | None:
+        """
+        Finds the earliest upcoming kickoff among the stored games of a sport.
+
+        Args:
+            sport_key: The key of the sport.
+            now: The current time. Defaults to the current UTC time.
+
+        Returns:
+            The earliest kickoff that has not happened yet, or None if the sport has no upcoming games.
+        """
+        now = now or datetime.now(timezone.utc)
+        kickoffs = [parse_commence_time(game.commence_time) for game in self.games.values() if game.sport_key == sport_key]
+        upcoming = [kickoff for kickoff in kickoffs if kickoff > now]
+        return min(upcoming, default=None)
+
+    def __len__(self):
+        """Returns the number of games currently stored in the book."""
+        return len(self.games)
+
+    def __repr__(self):
+        """Provides a concise string representation for debugging."""
+        return f"OddsBook(games={len(self.games)}, markets={len(self.signatures)})"
@@ -0,0 +1,163 @@
+# parallel_calculator.py
+# This module spreads the vectorized surebet engine over several worker processes, so the
+# analysis of very large cycles is not pinned to one core by the GIL.
+#   1. The parent joins the price and outcome columns each Market filled while it was parsed
+#      (see vectorized_calculator.OddsMatrix); no Odd is visited in this step.
+#   2. The columns (market, outcome, price) are copied once into one shared memory block.
+#   3. Each worker receives only the block's name and a shard (a range of rows covering whole
+#      markets), maps the arrays without copying, and returns the surebet rows of its shard.
+#   4. The parent turns those rows back into the usual surebet dictionaries.
+# No Game, Market or Odd object is ever pickled; only small arrays of row indexes come back.
+
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import numpy as np
+import config
+from models import Game, Market
+from vectorized_calculator import OddsMatrix, evaluate_markets, build_surebets, find_surebets_vectorized
+
+# The columns placed in shared memory, in order, with their types.
+SHARED_COLUMNS = (('market', np.int32), ('outcome', np.int32), ('price', np.float64))
+
+def attach_shared_memory(name: str) -> shared_memory.SharedMemory:
+    """
+    Opens an existing shared memory block from a worker. Workers share the parent's
+    resource tracker, so the block stays registered once and is only deleted by the
+    parent's unlink() (or by the tracker if the parent dies).
+
+    Args:
+        name: The name of the block.
+
+    Returns:
+        The attached SharedMemory object.
+    """
+    return shared_memory.SharedMemory(name=name)
+
+def column_views(buffer, rows: int) -> dict:
+    """
+    Maps the shared columns onto a buffer without copying.
+
+    Args:
+        buffer: The shared memory buffer.
+        rows: The number of rows in each column.
+
+    Returns:
+        A dictionary of NumPy arrays, keyed by column name.
+    """
+    views = {}
+    offset = 0
+    for name, dtype in SHARED_COLUMNS:
+        views[name] = np.ndarray((rows,), dtype=dtype, buffer=buffer, offset=offset)
+        offset += rows * np.dtype(dtype).itemsize
+    return views
+
+def analyze_shard(block_name: str, rows: int, start: int, end: int) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Worker task: evaluates the markets stored in rows [start, end) of the shared columns.
+
+    Args:
+        block_name: The name of the shared memory block.
+        rows: The total number of rows in the block.
+        start: The first row of the shard.
+        end: The row after the last row of the shard.
+
+    Returns:
+        A tuple (leg_rows, leg_counts, margins) with global row indexes, as returned by evaluate_markets.
+    """
+    block = attach_shared_memory(block_name)
+    try:
+        columns = column_views(block.buf, rows)
+        leg_rows, leg_counts, margins = evaluate_markets(columns['market'][start:end], columns['outcome'][start:end], columns['price'][start:end])
+        result = (leg_rows + start, leg_counts, margins)
+        del columns  # Release the views before closing the block.
+        return result
+    finally:
+        block.close()
+
+def shard_bounds(market: np.ndarray, shards: int) -> list[tuple[int, int]]:
+    """
+    Splits the rows into roughly equal shards without cutting a market in two.
+
+    Args:
+        market: The market index of each row (rows of a market are contiguous).
+        shards: The desired number of shards.
+
+    Returns:
+        A list of (start, end) row ranges.
+    """
+    rows = len(market)
+    cuts = [0]
+    for shard in range(1, shards):
+        cut = rows * shard // shards
+        # Move the cut forward to the first row of the next market.
+        while 0 < cut < rows and market[cut] == market[cut - 1]:
+            cut += 1
+        if cut > cuts[-1]:
+            cuts.append(cut)
+    if cuts[-1] < rows:
+        cuts.append(rows)
+    return list(zip(cuts[:-1], cuts[1:]))
+
+# The worker pool is created on first use and reused for every cycle, with its size.
+_pool = None
+_pool_workers = 0
+
+def analysis_workers() -> int:
+    """Returns the number of worker processes the engine uses (see config.ANALYSIS_WORKERS)."""
+    return config.ANALYSIS_WORKERS or os.cpu_count() or 1
+
+def get_pool() -> tuple[ProcessPoolExecutor, int]:
+    """
+    Returns the shared worker pool and its number of workers, starting it on first use.
+    Workers are started with 'spawn': forking a process that already runs the fetch, alert and
+    history threads could copy a lock held by one of them into the child.
+    """
+    global _pool, _pool_workers
+    if _pool is None:
+        _pool_workers = analysis_workers()
+        _pool = ProcessPoolExecutor(max_workers=_pool_workers, mp_context=multiprocessing.get_context('spawn'))
+    return _pool, _pool_workers
+
+def find_surebets_parallel(market_pairs: list[tuple[Game, Market]]) -> list:
+    """
+    Analyzes many markets across worker processes that read the odds from shared memory.
+    Small batches, and every batch when only one worker is available, are analyzed in this
+    process instead, since starting work in other processes would cost more than it saves.
+
+    Args:
+        market_pairs: A list of (game, market) tuples.
+
+    Returns:
+        The same list of surebet dictionaries as find_surebets_vectorized.
+    """
+    if len(market_pairs) < config.PARALLEL_MIN_MARKETS or analysis_workers() < 2:
+        return find_surebets_vectorized(market_pairs)
+
+    matrix = OddsMatrix(market_pairs)
+    rows = len(matrix)
+    if rows == 0:
+        return []
+
+    # Copy the columns into a single shared memory block, once.
+    size = sum(rows * np.dtype(dtype).itemsize for _, dtype in SHARED_COLUMNS)
+    block = shared_memory.SharedMemory(create=True, size=size)
+    try:
+        columns = column_views(block.buf, rows)
+        for name, _ in SHARED_COLUMNS:
+            columns[name][:] = getattr(matrix, name)
+        del columns
+
+        pool, workers = get_pool()
+        futures = [pool.submit(analyze_shard, block.name, rows, start, end)
+                   for start, end in shard_bounds(matrix.market, workers)]
+        results = [future.result() for future in futures]
+    finally:
+        block.close()
+        block.unlink()
+
+    leg_rows = np.concatenate([leg_rows for leg_rows, _, _ in results])
+    leg_counts = np.concatenate([leg_counts for _, leg_counts, _ in results])
+    margins = np.concatenate([margins for _, _, margins in results])
+    return build_surebets(matrix, leg_rows, leg_counts, margins)
@@ -0,0 +1,112 @@
+# payload_generator.py
+# This module builds synthetic, deterministic Odds API responses. The payloads have exactly
+# the same shape as the real '/v4/sports/{sport}/odds' response, so they can be fed to
+# process_api_data, the benchmarks and the local mock servers without spending API quota.
+
+import random
+from datetime import datetime, timedelta, timezone
+
+# Bookmaker margin range applied on top of the fair odds (e.g., 0.05 = 5% overround).
+MIN_BOOKMAKER_MARGIN = 0.03
+MAX_BOOKMAKER_MARGIN = 0.08
+
+def priced_outcomes(rng: random.Random, probabilities: list[float], margin: float) -> list[float]:
+    """
+    Turns fair outcome probabilities into bookmaker decimal odds with a margin and some noise.
+
+    Args:
+        rng: The random generator to use.
+        probabilities: The fair probability of each outcome (summing to 1).
+        margin: The bookmaker's overround.
+
+    Returns:
+        A list of decimal prices, one per outcome.
+    """
+    return [round(1 / (p * (1 + margin) * rng.uniform(0.985, 1.015)), 2) for p in probabilities]
+
+def generate_payload(games: int = 50, bookmakers: int = 20, markets: tuple = ('h2h', 'totals', 'spreads'),
+                     lines: int = 3, surebet_density: float = 0.01, include_draw: bool = False,
+                     sport_key: str = 'soccer_synthetic', seed: int = 42) -> list[dict]:
+    """
+    Generates a realistic Odds API payload.
+
+    Args:
+        games: Number of games in the payload.
+        bookmakers: Number of bookmakers quoting each game.
+        markets: The market keys to include ('h2h', 'totals', 'spreads').
+        lines: Number of distinct lines per totals/spreads market.
+        surebet_density: Probability that a given market gets one mispriced odd creating a surebet.
+        include_draw: Whether h2h markets have a third 'Draw' outcome (e.g., soccer).
+        sport_key: The sport key written in every game.
+        seed: Seed of the random generator; the same arguments always produce the same payload.
+
+    Returns:
+        A list of game dictionaries, in the same format as The Odds API.
+    """
+    rng = random.Random(seed)
+    start = datetime(2030, 1, 1, tzinfo=timezone.utc)
+    bookmaker_keys = [f"bookie_{index:02d}" for index in range(bookmakers)]
+    payload = []
+
+    for game_index in range(games):
+        home_team, away_team = f"Home Team {game_index}", f"Away Team {game_index}"
+        commence_time = start + timedelta(hours=rng.randint(1, 24 * 14))
+
+        # The fair probabilities of each market, shared by all bookmakers of this game.
+        home_strength = rng.uniform(0.25, 0.75)
+        fair_markets = []   # List of (market_key, [(name, point, probability), ...]).
+        if 'h2h' in markets:
+            if include_draw:
+                draw = rng.uniform(0.2, 0.3)
+                outcomes = [(home_team, None, home_strength * (1 - draw)), ('Draw', None, draw),
+                            (away_team, None, (1 - home_strength) * (1 - draw))]
+            else:
+                outcomes = [(home_team, None, home_strength), (away_team, None, 1 - home_strength)]
+            fair_markets.append(('h2h', outcomes))
+        totals_base = rng.randint(0, 2)  # Lowest totals line is 0.5, 1.5 or 2.5.
+        lowest_over = rng.uniform(0.6, 0.8)  # Chance of going over the lowest line; higher lines are less likely.
+        for line_index in range(lines):
+            if 'totals' in markets:
+                point = 0.5 + totals_base + line_index
+                over = max(lowest_over - 0.2 * line_index, 0.1)
+                fair_markets.append(('totals', [('Over', point, over), ('Under', point, 1 - over)]))
+            if 'spreads' in markets:
+                handicap = line_index - (lines // 2) - 0.5
+                cover = min(max(home_strength + 0.15 * handicap, 0.1), 0.9)
+                fair_markets.append(('spreads', [(home_team, handicap, cover), (away_team, -handicap, 1 - cover)]))
+
+        # Pick the mispriced (bookmaker, market, outcome) cells that create the surebets.
+        boosted = set()
+        for market_index, (market_key, outcomes) in enumerate(fair_markets):
+            if rng.random() < surebet_density:
+                boosted.add((rng.randrange(bookmakers), market_index, rng.randrange(len(outcomes))))
+
+        bookmaker_list = []
+        for bookmaker_index, bookmaker_key in enumerate(bookmaker_keys):
+            margin = rng.uniform(MIN_BOOKMAKER_MARGIN, MAX_BOOKMAKER_MARGIN)
+            market_list = []
+            for market_index, (market_key, outcomes) in enumerate(fair_markets):
+                prices = priced_outcomes(rng, [p for _, _, p in outcomes], margin)
+                outcome_list = []
+                for outcome_index, ((name, point, probability), price) in enumerate(zip(outcomes, prices)):
+                    if (bookmaker_index, market_index, outcome_index) in boosted:
+                        # Price this outcome 20% above fair odds, far enough to beat any overround.
+                        price = round(1.2 / probability, 2)
+                    outcome = {'name': name, 'price': max(price, 1.01)}
+                    if point is not None:
+                        outcome['point'] = point
+                    outcome_list.append(outcome)
+                market_list.append({'key': market_key, 'last_update': commence_time.isoformat(), 'outcomes': outcome_list})
+            bookmaker_list.append({'key': bookmaker_key, 'title': bookmaker_key.replace('_', ' ').title(), 'markets': market_list})
+
+        payload.append({
+            'id': f"{sport_key}_{seed}_{game_index:05d}",
+            'sport_key': sport_key,
+            'sport_title': sport_key.replace('_', ' ').title(),
+            'commence_time': commence_time.strftime('%Y-%m-%dT%H:%M:%SZ'),
+            'home_team': home_team,
+            'away_team': away_team,
+            'bookmakers': bookmaker_list
+        })
+
+    return payload
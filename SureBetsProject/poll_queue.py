@@ -0,0 +1,180 @@
+# poll_queue.py
+# This module decides when each sport should be polled next. Sports are kept in a
+# priority queue ordered by their next due time, and the interval of each sport adapts to:
+#   - how soon its next game kicks off (odds move most in the final hours),
+#   - how volatile its odds were recently (the share of markets whose best price changed),
+#   - the remaining API quota, so polling slows down instead of running out before the reset
+#     (and, when there is quota to spare, the most volatile sports are polled more often),
+#   - consecutive errors, which trigger an exponential backoff for that sport only.
+
+import heapq
+import time
+from datetime import datetime, timezone
+import config
+from odds_book import OddsBook
+
+# Weight of the newest observation in the exponential moving average of volatility.
+VOLATILITY_SMOOTHING = 0.3
+
+# Weight of the newest request in the moving average of each sport's request cost. Costs vary
+# from poll to poll when the request planner alternates full sweeps and shaped requests.
+COST_SMOOTHING = 0.3
+
+def seconds_until_quota_reset(now: float) -> float:
+    """
+    Estimates how long until the monthly API quota resets (the start of the next month, UTC).
+
+    Args:
+        now: The current time as a Unix timestamp.
+
+    Returns:
+        The number of seconds until the reset.
+    """
+    today = datetime.fromtimestamp(now, timezone.utc)
+    if today.month == 12:
+        reset = datetime(today.year + 1, 1, 1, tzinfo=timezone.utc)
+    else:
+        reset = datetime(today.year, today.month + 1, 1, tzinfo=timezone.utc)
+    return max(reset.timestamp() - now, 60.0)
+
+class PollQueue:
+    """A priority queue of sports, ordered by the time each one should be polled next."""
+    def __init__(self, sport_keys: list[str]):
+        self.heap = [(0.0, sport) for sport in sport_keys]  # (due_time, sport_key); all due immediately.
+        heapq.heapify(self.heap)
+        self.volatility = dict.fromkeys(sport_keys, 0.5)    # Smoothed share of markets that changed per poll.
+        self.failures = dict.fromkeys(sport_keys, 0)        # Consecutive failed polls per sport.
+        self.intervals = {}                                 # Latest normal polling interval per sport, in seconds.
+        self.request_cost = dict.fromkeys(sport_keys, 1)    # Smoothed quota used per request, per sport.
+        self.requests_remaining = None                      # Latest quota reported by the API.
+
+    def add_sport(self, sport_key: str, now: float = 0.0):
+        """
+        Adds a sport that is not in the queue yet (e.g., a league whose season just started).
+
+        Args:
+            sport_key: The key of the sport.
+            now: The sport's first due time. Defaults to immediately.
+        """
+        if sport_key in self.failures:
+            return
+        heapq.heappush(self.heap, (now, sport_key))
+        self.volatility[sport_key] = 0.5
+        self.failures[sport_key] = 0
+        self.request_cost[sport_key] = 1
+
+    def pop_due(self, now: float) -> list[str]:
+        """
+        Removes and returns every sport whose due time has arrived.
+
+        Args:
+            now: The current time as a Unix timestamp.
+
+        Returns:
+            The list of sport keys to poll now.
+        """
+        due_sports = []
+        while self.heap and self.heap[0][0] <= now:
+            due_sports.append(heapq.heappop(self.heap)[1])
+        return due_sports
+
+    def seconds_until_next(self, now: float) -> float:
+        """Returns how long to wait until the next sport is due (0 if one is already due)."""
+        if not self.heap:
+            return config.RUN_INTERVAL_MINUTES * 60
+        return max(self.heap[0][0] - now, 0.0)
+
+    def base_interval(self, sport_key: str, odds_book: OddsBook, now: float) -> float:
+        """
+        Computes the polling interval of a sport from its next kickoff and its volatility.
+
+        Args:
+            sport_key: The key of the sport.
+            odds_book: The OddsBook holding the sport's games.
+            now: The current time as a Unix timestamp.
+
+        Returns:
+            The interval in seconds, between MIN_POLL_INTERVAL_MINUTES and RUN_INTERVAL_MINUTES.
+        """
+        min_interval = config.MIN_POLL_INTERVAL_MINUTES * 60
+        max_interval = config.RUN_INTERVAL_MINUTES * 60
+
+        kickoff = odds_book.next_kickoff(sport_key, datetime.fromtimestamp(now, timezone.utc))
+        if kickoff is None:
+            return max_interval  # No upcoming games: nothing urgent to watch.
+
+        # 0.0 for a game kicking off now, 1.0 for a game at or beyond the horizon.
+        hours_to_kickoff = (kickoff.timestamp() - now) / 3600
+        kickoff_factor = min(hours_to_kickoff / config.KICKOFF_HORIZON_HOURS, 1.0)
+
+        # Volatile sports are polled up to twice as often.
+        volatility_factor = 1 - 0.5 * self.volatility[sport_key]
+
+        return min_interval + (max_interval - min_interval) * kickoff_factor * volatility_factor
+
+    def budget_factor(self, now: float) -> float:
+        """
+        Compares the quota the current intervals would spend with the quota left until the reset.
+
+        Args:
+            now: The current time as a Unix timestamp.
+
+        Returns:
+            A multiplier for the intervals: above 1.0 to stretch them so the quota lasts until the reset,
+            below 1.0 (down to 1 / HOT_SPORT_SPEEDUP) when the schedule leaves quota unused. Polling
+            only speeds up with the request planner enabled, whose shaped requests make it affordable.
+        """
+        if self.requests_remaining is None or not self.intervals:
+            return 1.0
+
+        # Quota units per second that the current schedule would consume.
+        demand = sum(self.request_cost[sport] / interval for sport, interval in self.intervals.items())
+        # Quota units per second that we can afford until the reset.
+        supply = (self.requests_remaining - config.QUOTA_RESERVE) / seconds_until_quota_reset(now)
+
+        if supply <= 0:
+            return seconds_until_quota_reset(now) / min(self.intervals.values())
+        fastest = 1 / config.HOT_SPORT_SPEEDUP if config.REQUEST_PLANNER_ENABLED else 1.0
+        return max(demand / supply, fastest)
+
+    def reschedule(self, sport_key: str, status: dict | None, odds_book: OddsBook, now: float = None):
+        """
+        Puts a sport back in the queue after a poll, with a due time based on the poll's outcome.
+
+        Args:
+            sport_key: The key of the sport that was polled.
+            status: The sport's entry from main.last_fetch_status for this poll, or None if it failed.
+            odds_book: The OddsBook holding the sport's games.
+            now: The current time as a Unix timestamp. Defaults to time.time().
+        """
+        now = now or time.time()
+
+        if not status or not status['ok']:
+            # Exponential backoff for this sport only: 1, 2, 4, 8... minutes, capped at the normal interval.
+            self.failures[sport_key] += 1
+            delay = config.ERROR_BACKOFF_MINUTES * 60 * 2 ** (self.failures[sport_key] - 1)
+            delay = min(delay, config.RUN_INTERVAL_MINUTES * 60)
+            print(f"'{sport_key}' failed {self.failures[sport_key]} time(s) in a row. Retrying in {delay / 60:.1f} minutes.")
+            heapq.heappush(self.heap, (now + delay, sport_key))
+            return
+
+        self.failures[sport_key] = 0
+        if status['requests_remaining'] is not None:
+            self.requests_remaining = status['requests_remaining']
+        if status['requests_last'] is not None:
+            self.request_cost[sport_key] += COST_SMOOTHING * (status['requests_last'] - self.request_cost[sport_key])
+        if status.get('markets'):
+            changed_share = status['changed_markets'] / status['markets']
+            self.volatility[sport_key] += VOLATILITY_SMOOTHING * (changed_share - self.volatility[sport_key])
+
+        self.intervals[sport_key] = self.base_interval(sport_key, odds_book, now)
+        factor = self.budget_factor(now)
+        if factor < 1.0:
+            # Spare quota only goes to sports at least as volatile as the average. Since only part of
+            # the demand is sped up, by at most supply / demand, the total stays within the supply.
+            average_volatility = sum(self.volatility.values()) / len(self.volatility)
+            if self.volatility[sport_key] < average_volatility:
+                factor = 1.0
+        interval = max(self.intervals[sport_key] * factor, config.MIN_POLL_INTERVAL_MINUTES * 60)
+        print(f"Next check of '{sport_key}' in {interval / 60:.1f} minutes.")
+        heapq.heappush(self.heap, (now + interval, sport_key))
@@ -0,0 +1,194 @@
+# price_history.py
+# This module keeps a short history of the best price of every outcome, and uses it to estimate
+# how long each surebet is likely to survive, so alerts can be prioritized.
+#   - Each game holds fixed-size ring buffers (one per market, outcome and line)
+#     stored in flat arrays of C doubles instead of lists of Odd objects. Only price changes
+#     are written, so a quiet price costs nothing and the memory per game is bounded.
+#   - Only the best price of each outcome is recorded: a surebet is built from those prices and
+#     closes when they move, whichever bookmaker offers them.
+#   - From a leg's ring, we know how often its price moves (changes per second) and by how
+#     much (RMS of the log price changes). Each move shifts the leg's implied probability
+#     (1 / price) by about its RMS change divided by the price.
+#   - A surebet closes once the implied probabilities of its legs rise by its margin. Treating
+#     their moves as a random walk, this takes about margin^2 / variance_rate seconds, and
+#     never longer than the time left before kickoff (pre-match prices are suspended then).
+#   - The priority of an alert is the profit expected to be lost if it waited one more send
+#     slot of the dispatcher: profit * (1 - exp(-slot / expected_lifetime)). Fast-closing and
+#     profitable surebets therefore go out first.
+# Games are forgotten at kickoff, like in the OddsBook.
+
+import math
+import time
+from array import array
+import config
+from models import Game, Market
+from odds_book import parse_commence_time
+from surebet_calculator import find_best_odds
+
+# How often games that have kicked off are looked for and removed, in seconds.
+PRUNE_INTERVAL = 60
+
+class PriceRings:
+    """
+    The ring buffers of one game. Ring 'slot' occupies positions slot * size to slot * size + size - 1
+    of the 'times' and 'prices' arrays; 'heads' holds its next write position and 'counts' how
+    many of its positions are filled.
+    """
+    __slots__ = ('size', 'kickoff', 'slots', 'times', 'prices', 'heads', 'counts')
+
+    def __init__(self, size: int, kickoff: float):
+        self.size = size
+        self.kickoff = kickoff      # Kickoff time of the game, as a Unix timestamp.
+        self.slots = {}             # Maps each (market_key, outcome, point) leg to its ring.
+        self.times = array('d')     # When each price was first seen, as Unix timestamps.
+        self.prices = array('d')
+        self.heads = array('H')
+        self.counts = array('H')
+
+    def record(self, leg: tuple, price: float, now: float):
+        """
+        Writes a price to a leg's ring, unless it is the same as the last one written.
+
+        Args:
+            leg: The (market_key, outcome, point) key of the leg.
+            price: The current decimal price.
+            now: The current time as a Unix timestamp.
+        """
+        slot = self.slots.get(leg)
+        if slot is None:
+            slot = self.slots[leg] = len(self.heads)
+            empty = bytes(self.size * self.times.itemsize)
+            self.times.frombytes(empty)
+            self.prices.frombytes(empty)
+            self.heads.append(0)
+            self.counts.append(0)
+
+        base = slot * self.size
+        head, count = self.heads[slot], self.counts[slot]
+        if count and self.prices[base + (head - 1) % self.size] == price:
+            return
+        self.times[base + head] = now
+        self.prices[base + head] = price
+        self.heads[slot] = (head + 1) % self.size
+        self.counts[slot] = min(count + 1, self.size)
+
+    def leg_stats(self, leg: tuple, now: float) -> tuple[float, float]:
+        """
+        Measures how often and how much a leg's price has moved.
+
+        Args:
+            leg: The (market_key, outcome, point) key of the leg.
+            now: The current time as a Unix timestamp.
+
+        Returns:
+            A tuple (changes_per_second, rms_log_change), or (0.0, 0.0) if the price never moved.
+        """
+        slot = self.slots.get(leg)
+        if slot is None or self.counts[slot] < 2:
+            return 0.0, 0.0
+
+        count = self.counts[slot]
+        base, oldest = slot * self.size, self.heads[slot] - count
+        positions = [base + (oldest + index) % self.size for index in range(count)]
+        span = now - self.times[positions[0]]
+        squares = sum(math.log(self.prices[after] / self.prices[before]) ** 2
+                      for before, after in zip(positions, positions[1:]))
+        return ((count - 1) / span if span > 0 else 0.0), math.sqrt(squares / (count - 1))
+
+class PriceTracker:
+    """Records the price changes of analyzed markets and estimates the lifetime of surebets."""
+    def __init__(self):
+        self.games = {}         # Maps each game ID to its PriceRings.
+        self.pruned_at = 0.0
+
+    def record_markets(self, market_pairs: list[tuple[Game, Market]], now: float = None):
+        """
+        Writes the current best price of each outcome of a batch of markets to their rings.
+
+        Args:
+            market_pairs: A list of (game, market) tuples, as given to analyze_markets.
+            now: The current time as a Unix timestamp. Defaults to time.time().
+        """
+        now = now or time.time()
+        for game, market in market_pairs:
+            rings = self.games.get(game.id)
+            if rings is None:
+                kickoff = parse_commence_time(game.commence_time).timestamp()
+                rings = self.games[game.id] = PriceRings(config.PRICE_HISTORY_SIZE, kickoff)
+            for odd in find_best_odds(market):
+                rings.record((market.key, odd.name, odd.point), odd.price, now)
+
+        if now - self.pruned_at >= PRUNE_INTERVAL:
+            self.prune(now)
+
+    def prune(self, now: float):
+        """Forgets the games that have kicked off."""
+        self.games = {game_id: rings for game_id, rings in self.games.items() if rings.kickoff > now}
+        self.pruned_at = now
+
+    def estimate(self, surebet: dict, now: float = None) -> tuple[float, float]:
+        """
+        Estimates how volatile a surebet's prices are and how long it will stay open.
+
+        Args:
+            surebet: A surebet dictionary.
+            now: The current time as a Unix timestamp. Defaults to time.time().
+
+        Returns:
+            A tuple (volatility, expected_lifetime): the standard deviation of the legs' combined
+            implied probability per square root of a second, and the expected lifetime in seconds
+            (0.0 if the game has already kicked off).
+        """
+        now = now or time.time()
+        game, market = surebet['game'], surebet['market']
+        rings = self.games.get(game.id)
+
+        variance_rate = 0.0
+        for odd in surebet['legs']:
+            if rings is not None:
+                changes_per_second, rms_log_change = rings.leg_stats((market.key, odd.name, odd.point), now)
+                variance_rate += changes_per_second * (rms_log_change / odd.price) ** 2
+
+        margin = surebet['profit_margin'] / 100
+        lifetime = margin ** 2 / variance_rate if variance_rate > 0 else config.DEFAULT_SUREBET_LIFETIME_SECONDS
+        # Pre-match prices are suspended at kickoff, whatever their volatility.
+        time_to_kickoff = parse_commence_time(game.commence_time).timestamp() - now
+        if time_to_kickoff <= 0:
+            return math.sqrt(variance_rate), 0.0
+        return math.sqrt(variance_rate), max(min(lifetime, time_to_kickoff), 1.0)
+
+    def annotate(self, surebets: list, now: float = None):
+        """
+        Adds 'volatility', 'expected_lifetime' (seconds) and 'priority' to each surebet dictionary.
+        Surebets of games that have already kicked off can no longer be placed and get priority 0.
+
+        Args:
+            surebets: The surebet dictionaries found in a batch of markets.
+            now: The current time as a Unix timestamp. Defaults to time.time().
+        """
+        send_slot = 1 / config.ALERT_RATE_PER_SECOND
+        for surebet in surebets:
+            volatility, lifetime = self.estimate(surebet, now)
+            surebet['volatility'] = volatility
+            surebet['expected_lifetime'] = lifetime
+            surebet['priority'] = surebet['profit_margin'] * (1 - math.exp(-send_slot / lifetime)) if lifetime > 0 else 0.0
+
+    def __len__(self):
+        """Returns the number of rings (legs) currently stored."""
+        return sum(len(rings.slots) for rings in self.games.values())
+
+def rank_surebets(surebets: list) -> list:
+    """
+    Sorts surebets so the ones with the highest alert priority come first.
+    Surebets without a priority (price history disabled) keep their order.
+
+    Args:
+        surebets: A list of surebet dictionaries.
+
+    Returns:
+        A new, sorted list.
+    """
+    return sorted(surebets, key=lambda surebet: surebet.get('priority', 0.0), reverse=True)
+
+# The tracker shared by the whole session.
+tracker = PriceTracker()
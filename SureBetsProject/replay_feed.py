@@ -0,0 +1,148 @@
+# replay_feed.py
+# This script is a local stand-in for a live odds feed, used to test the streaming daemon
+# (stream_ingest.py) without a real push source. It replays an Odds API response, either
+# recorded (a saved JSON response or a snapshot from the HTTP cache) or synthetic:
+#   1. It first sends the whole snapshot, one update per game and bookmaker.
+#   2. It then simulates price moves: each update re-sends one bookmaker's market with
+#      slightly changed prices, and some moves open a surebet on purpose.
+# Updates are written as NDJSON, either to the daemon's socket or appended to a file.
+#
+# Examples:
+#   python replay_feed.py --target tcp://127.0.0.1:9109 --moves 5000 --rate 500
+#   python replay_feed.py --input recorded_response.json --target odds_updates.ndjson
+
+import argparse
+import json
+import random
+import socket
+import time
+from http_cache import CachedResponse
+from payload_generator import generate_payload
+
+def load_games(args: argparse.Namespace) -> list[dict]:
+    """
+    Loads the games to replay.
+
+    Args:
+        args: The parsed command-line arguments.
+
+    Returns:
+        A list of game objects in the Odds API format.
+    """
+    if not args.input:
+        return generate_payload(games=args.games, bookmakers=args.bookmakers, surebet_density=0.0, seed=args.seed)
+    if args.input.endswith('.gz'):
+        return CachedResponse(args.input).json()  # A snapshot from the HTTP cache folder.
+    with open(args.input, encoding='utf-8') as file:
+        return json.load(file)
+
+def build_update(game: dict, bookmaker: dict, market_key: str = None) -> dict:
+    """
+    Builds one feed update: the game's header with a single bookmaker and, optionally,
+    only that bookmaker's entries of one market key.
+
+    Args:
+        game: The game object.
+        bookmaker: One of the game's bookmakers.
+        market_key: The market key to send, or None to send all of the bookmaker's markets.
+
+    Returns:
+        The update dictionary.
+    """
+    markets = [market for market in bookmaker['markets'] if market_key is None or market['key'] == market_key]
+    update = {key: game[key] for key in ('id', 'sport_key', 'home_team', 'away_team', 'commence_time') if key in game}
+    update['bookmakers'] = [{'key': bookmaker['key'], 'title': bookmaker.get('title', bookmaker['key']), 'markets': markets}]
+    return update
+
+def move_prices(rng: random.Random, market: dict, surebet_chance: float):
+    """
+    Changes the prices of a bookmaker's market in place, like a live price move.
+
+    Args:
+        rng: The random generator to use.
+        market: One market entry of a bookmaker.
+        surebet_chance: Probability that the move overprices one outcome enough to open a surebet.
+    """
+    for outcome in market['outcomes']:
+        outcome['price'] = max(round(outcome['price'] * rng.uniform(0.98, 1.02), 2), 1.01)
+    if rng.random() < surebet_chance:
+        outcome = rng.choice(market['outcomes'])
+        outcome['price'] = round(outcome['price'] * 1.3, 2)
+
+def iter_updates(games: list[dict], args: argparse.Namespace):
+    """
+    Yields the snapshot updates, then the simulated price moves.
+
+    Args:
+        games: The games to replay.
+        args: The parsed command-line arguments.
+
+    Yields:
+        Update dictionaries.
+    """
+    for game in games:
+        for bookmaker in game['bookmakers']:
+            yield build_update(game, bookmaker)
+
+    rng = random.Random(args.seed)
+    quoted_games = [game for game in games if game['bookmakers']]
+    for _ in range(args.moves):
+        game = rng.choice(quoted_games)
+        bookmaker = rng.choice(game['bookmakers'])
+        if not bookmaker['markets']:
+            continue
+        market = rng.choice(bookmaker['markets'])
+        move_prices(rng, market, args.surebet_chance)
+        yield build_update(game, bookmaker, market['key'])
+
+def open_target(target: str):
+    """
+    Opens the destination of the feed.
+
+    Args:
+        target: 'tcp://host:port' to connect to the daemon's socket, or the path of a file to append to.
+
+    Returns:
+        A function that writes one encoded line, and a function that closes the destination.
+    """
+    if target.startswith('tcp://'):
+        host, port = target[len('tcp://'):].rsplit(':', 1)
+        connection = socket.create_connection((host, int(port)))
+        return connection.sendall, connection.close
+    file = open(target, 'ab')
+    def write(line: bytes):
+        file.write(line)
+        file.flush()  # Make each update visible to the follower right away.
+    return write, file.close
+
+def parse_arguments() -> argparse.Namespace:
+    """Defines and parses the command-line options."""
+    parser = argparse.ArgumentParser(description="Replay recorded or synthetic odds as a live NDJSON feed.")
+    parser.add_argument('--target', default='tcp://127.0.0.1:9109', help="tcp://host:port of the daemon, or a file to append to.")
+    parser.add_argument('--input', help="A saved Odds API response (.json) or HTTP cache snapshot (.json.gz). Synthetic data if omitted.")
+    parser.add_argument('--games', type=int, default=50, help="Number of synthetic games.")
+    parser.add_argument('--bookmakers', type=int, default=20, help="Number of synthetic bookmakers per game.")
+    parser.add_argument('--moves', type=int, default=1000, help="Number of price moves sent after the snapshot.")
+    parser.add_argument('--rate', type=float, default=100.0, help="Updates per second (0 = as fast as possible).")
+    parser.add_argument('--surebet-chance', type=float, default=0.02, help="Share of moves that open a surebet.")
+    parser.add_argument('--seed', type=int, default=42, help="Seed of the generator and the price moves.")
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    args = parse_arguments()
+    games = load_games(args)
+    write, close = open_target(args.target)
+    delay = 1 / args.rate if args.rate > 0 else 0
+
+    sent = 0
+    started = time.perf_counter()
+    try:
+        for update in iter_updates(games, args):
+            update['sent_at'] = time.time()
+            write(json.dumps(update).encode() + b'\n')
+            sent += 1
+            if delay:
+                time.sleep(delay)
+    finally:
+        close()
+    print(f"Sent {sent} updates in {time.perf_counter() - started:.1f} seconds.")
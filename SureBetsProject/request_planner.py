@@ -0,0 +1,157 @@
+# request_planner.py
+# This module shapes odds requests so they only pay for data that matters. The API charges
+# quota per market x region, yet most bookmakers in those regions never hold a best price.
+#   - Every few polls of a sport, a full sweep requests all of TARGET_MARKETS in all REGIONS.
+#   - From each sweep the planner learns, per sport, how often each bookmaker held the best
+#     price of a market (smoothed across sweeps) and how close each market came to an arbitrage.
+#   - Polls in between only request the markets that came close to an arbitrage, and only from
+#     the few bookmakers that supplied the best prices, using the API's 'bookmakers' parameter
+#     (every 10 bookmakers cost the same as one region).
+# Learning only from full sweeps keeps the statistics unbiased: shaped responses never include
+# the bookmakers that were left out. The cheaper polls are picked up by the adaptive scheduler
+# through the 'x-requests-last' header, which lets it poll hot sports more often.
+
+import threading
+import config
+from models import Game
+
+# Weight of the newest sweep in the exponential moving average of best-price shares.
+SHARE_SMOOTHING = 0.3
+
+class RequestPlanner:
+    """Learns, per sport, which markets and bookmakers are worth requesting."""
+    def __init__(self):
+        self.lock = threading.Lock()  # Sports are fetched from several threads at once.
+        self.shares = {}              # sport -> {market_key: {bookmaker: smoothed share of best prices}}.
+        self.closest_margins = {}     # sport -> {market_key: lowest sum of 1/best_price in the last sweep}.
+        self.polls_since_sweep = {}   # sport -> shaped polls since the last full sweep.
+        self.pending = {}             # sport -> (best-price hits, slots, lowest sums) of the sweep being read.
+
+    def plan(self, sport_key: str, full_params: dict) -> tuple[dict, bool]:
+        """
+        Chooses the parameters of the next odds request of a sport.
+
+        Args:
+            sport_key: The key of the sport.
+            full_params: The parameters of a full sweep (every target market in every region).
+
+        Returns:
+            A tuple (params, is_full_sweep).
+        """
+        with self.lock:
+            polls = self.polls_since_sweep.get(sport_key, 0)
+            if not self.shares.get(sport_key) or polls + 1 >= config.PLANNER_FULL_SWEEP_EVERY:
+                return full_params, True
+
+            markets = self.select_markets(sport_key)
+            bookmakers = self.select_bookmakers(sport_key, markets)
+            if not markets or not bookmakers:
+                return full_params, True
+            self.polls_since_sweep[sport_key] = polls + 1
+
+        # The 'bookmakers' parameter replaces 'regions'.
+        params = {key: value for key, value in full_params.items() if key != 'regions'}
+        params['bookmakers'] = ','.join(bookmakers)
+        params['markets'] = ','.join(markets)
+        return params, False
+
+    def select_markets(self, sport_key: str) -> list[str]:
+        """
+        Keeps the target markets that came within PLANNER_MARKET_MARGIN of an arbitrage in the
+        last sweep (or the closest one, so the sport keeps being watched).
+
+        Args:
+            sport_key: The key of the sport.
+
+        Returns:
+            A list of market keys, in the order of TARGET_MARKETS.
+        """
+        margins = self.closest_margins.get(sport_key, {})
+        if not margins:
+            return []
+        markets = [market_key for market_key in config.TARGET_MARKETS.split(',')
+                   if margins.get(market_key, float('inf')) <= 1 + config.PLANNER_MARKET_MARGIN]
+        return markets or [min(margins, key=margins.get)]
+
+    def select_bookmakers(self, sport_key: str, markets: list[str]) -> list[str]:
+        """
+        Picks, for each market, the bookmakers that together held PLANNER_COVERAGE of its best prices,
+        then keeps the strongest ones up to PLANNER_MAX_BOOKMAKERS.
+
+        Args:
+            sport_key: The key of the sport.
+            markets: The market keys that will be requested.
+
+        Returns:
+            A sorted list of bookmaker keys.
+        """
+        strength = {}  # The highest share each selected bookmaker has in any of the markets.
+        for market_key in markets:
+            shares = self.shares[sport_key].get(market_key, {})
+            total = sum(shares.values())
+            covered = 0.0
+            for bookmaker, share in sorted(shares.items(), key=lambda item: item[1], reverse=True):
+                if covered >= config.PLANNER_COVERAGE * total:
+                    break
+                covered += share
+                strength[bookmaker] = max(strength.get(bookmaker, 0.0), share)
+
+        strongest = sorted(strength, key=strength.get, reverse=True)[:config.PLANNER_MAX_BOOKMAKERS]
+        return sorted(strongest)
+
+    def observe_game(self, sport_key: str, game: Game):
+        """
+        Counts which bookmakers hold the best prices of a game from a full sweep.
+
+        Args:
+            sport_key: The key of the sport.
+            game: A Game object from the full sweep's response.
+        """
+        with self.lock:
+            hits, slots, closest = self.pending.setdefault(sport_key, ({}, {}, {}))
+            for market in game.markets.values():
+                best_prices = {}
+                for odd in market.outcomes:
+                    if odd.price > best_prices.get(odd.name, 0):
+                        best_prices[odd.name] = odd.price
+
+                market_hits = hits.setdefault(market.key, {})
+                for odd in market.outcomes:
+                    if odd.price == best_prices[odd.name]:
+                        market_hits[odd.bookmaker] = market_hits.get(odd.bookmaker, 0) + 1
+                slots[market.key] = slots.get(market.key, 0) + len(best_prices)
+
+                if len(best_prices) >= 2:
+                    implied_total = sum(1 / price for price in best_prices.values())
+                    closest[market.key] = min(closest.get(market.key, float('inf')), implied_total)
+
+    def finish_sweep(self, sport_key: str):
+        """
+        Folds the counts of a completed full sweep into the smoothed shares of the sport.
+
+        Args:
+            sport_key: The key of the sport.
+        """
+        with self.lock:
+            hits, slots, closest = self.pending.pop(sport_key, ({}, {}, {}))
+            self.polls_since_sweep[sport_key] = 0
+            if not slots:
+                return  # Nothing to learn (e.g., no upcoming games); the next poll sweeps again.
+
+            sport_shares = self.shares.setdefault(sport_key, {})
+            for market_key in sport_shares.keys() | hits.keys():
+                market_shares = sport_shares.setdefault(market_key, {})
+                market_hits = hits.get(market_key, {})
+                for bookmaker in market_shares.keys() | market_hits.keys():
+                    share = market_hits.get(bookmaker, 0) / slots[market_key] if market_key in slots else 0.0
+                    previous = market_shares.get(bookmaker, share)
+                    market_shares[bookmaker] = previous + SHARE_SMOOTHING * (share - previous)
+            self.closest_margins[sport_key] = closest
+
+    def discard_sweep(self, sport_key: str):
+        """Forgets the counts of a full sweep that failed halfway, so a partial sweep is never learned."""
+        with self.lock:
+            self.pending.pop(sport_key, None)
+
+# The planner shared by every fetch of the session.
+planner = RequestPlanner()
@@ -5,7 +5,14 @@
 
 import time
 import config
-from main import run_single_check  # Imports the main function that performs the check.
+from main import run_single_check, last_fetch_status  # Imports the main function that performs the check.
+from notifier import flush_alerts
+from history_store import flush_history
+from metrics import start_metrics_server
+from odds_book import OddsBook
+from poll_queue import PollQueue
+from sports_catalog import resolve_target_sports
+from stream_ingest import run_stream_daemon
 
 def start_scheduler():
     """Starts the main automation loop."""
@@ -13,6 +20,9 @@ def start_scheduler():
     print("--- AUTOMATION MODE STARTED ---")
     print(f"Checking for surebets every {config.RUN_INTERVAL_MINUTES} minutes.")
     print("Press Ctrl+C to stop the bot at any time.")
+
+    # The odds book lives for the whole session, so each cycle only re-analyzes what changed.
+    odds_book = OddsBook() if config.INCREMENTAL_ANALYSIS_ENABLED else None
     
     while True:
         try:
@@ -20,7 +30,7 @@ def start_scheduler():
             print(f"[{time.strftime('%Y-%m-%d %H:%M:%S')}] Starting new check cycle...")
             
             # Call the main function that does all the work.
-            run_single_check()
+            run_single_check(odds_book)
             
             print(f"Check finished. Next check in {config.RUN_INTERVAL_MINUTES} minutes.")
             print("=======================================================\n")
@@ -38,16 +48,84 @@ def start_scheduler():
             print("Waiting for the next cycle to try again...")
             time.sleep(config.RUN_INTERVAL_MINUTES * 60)
 
+def start_adaptive_scheduler():
+    """
+    Starts the adaptive automation loop. Instead of polling every sport on a fixed interval,
+    each sport is polled when it is due according to its next kickoff, its recent odds
+    volatility, the remaining API quota and its own error backoff.
+    """
+
+    print("--- ADAPTIVE AUTOMATION MODE STARTED ---")
+    print(f"Polling each sport every {config.MIN_POLL_INTERVAL_MINUTES} to {config.RUN_INTERVAL_MINUTES} minutes.")
+    print("Press Ctrl+C to stop the bot at any time.")
+
+    # The odds book is always kept here, since kickoff times and volatility come from it.
+    odds_book = OddsBook()
+    poll_queue = PollQueue([])
+    consecutive_errors = 0  # Loop iterations in a row that ended with an unexpected error.
+
+    while True:
+        try:
+            now = time.time()
+            # Wildcard patterns can match new sports while the bot runs (e.g., a season starting).
+            target_sports = resolve_target_sports() if config.SPORTS_CATALOG_ENABLED else config.TARGET_SPORTS
+            for sport in target_sports:
+                poll_queue.add_sport(sport)
+            due_sports = poll_queue.pop_due(now)
+
+            if due_sports:
+                print("\n=======================================================")
+                print(f"[{time.strftime('%Y-%m-%d %H:%M:%S')}] Checking {len(due_sports)} sport(s): {', '.join(due_sports)}")
+                try:
+                    run_single_check(odds_book, sport_keys=due_sports)
+                finally:
+                    # Every popped sport goes back onto the queue exactly once, even if the cycle
+                    # failed. Only status entries written during this cycle are trusted; a sport
+                    # without one is backed off.
+                    for sport in due_sports:
+                        status = last_fetch_status.get(sport)
+                        poll_queue.reschedule(sport, status if status and status['checked_at'] >= now else None, odds_book)
+                print("=======================================================\n")
+
+            consecutive_errors = 0
+            # Sleep until the next sport is due.
+            time.sleep(poll_queue.seconds_until_next(time.time()))
+
+        except KeyboardInterrupt:
+            # Allows the user to stop the bot cleanly using Ctrl+C.
+            print("\n\n--- AUTOMATION STOPPED BY USER ---")
+            break
+        except Exception as e:
+            # The sports of the failed cycle were already rescheduled (and backed off) above. An error
+            # outside a cycle (e.g., resolving the sports) would repeat at once, so the loop backs off
+            # too: 1, 2, 4, 8... minutes, capped at the normal interval.
+            consecutive_errors += 1
+            delay = min(config.ERROR_BACKOFF_MINUTES * 60 * 2 ** (consecutive_errors - 1), config.RUN_INTERVAL_MINUTES * 60)
+            print(f"\nAN UNEXPECTED ERROR OCCURRED: {e}")
+            print(f"Retrying in {delay / 60:.1f} minute(s).")
+            time.sleep(delay)
 
 # This is the main entry point when the script is executed.
 if __name__ == "__main__":
-    # Check the flag in the config file to decide which mode to run.
-    if config.AUTOMATION_ENABLED:
+    # The metrics endpoint runs in the background for the whole session.
+    if config.METRICS_ENABLED:
+        start_metrics_server()
+
+    # Check the flags in the config file to decide which mode to run.
+    if config.STREAM_SOURCE:
+        # A live feed replaces polling: each update is analyzed as soon as it arrives.
+        run_stream_daemon()
+    elif config.AUTOMATION_ENABLED:
         # If automation is on, start the continuous scheduler.
-        start_scheduler()
+        if config.ADAPTIVE_SCHEDULING_ENABLED:
+            start_adaptive_scheduler()
+        else:
+            start_scheduler()
     else:
         # If automation is off, run the check only once and then exit.
         print("--- MANUAL RUN MODE ---")
         print("Automation is disabled in config.py. Running a single check.")
         run_single_check()
+        flush_alerts()  # Let queued alerts go out before the program exits.
+        flush_history()
         print("\n--- MANUAL RUN FINISHED ---")
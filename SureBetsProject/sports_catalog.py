@@ -0,0 +1,207 @@
+# sports_catalog.py
+# This module keeps a cached copy of The Odds API's list of sports and uses it to decide
+# which sports are worth a request in each cycle:
+#   - TARGET_SPORTS may contain wildcard patterns (e.g., 'soccer_*'), resolved against the catalog.
+#   - Sports the API reports as inactive (off-season) are skipped.
+#   - Sports that returned no games for a while are skipped too, and only re-checked now and
+#     then so the bot notices when their season starts. This state is kept in a small JSON file,
+#     so it survives restarts.
+# The '/v4/sports' endpoint does not count against the quota, but skipping an idle sport saves
+# an odds request (which does) and its round-trip.
+
+import fnmatch
+import json
+import os
+import tempfile
+import time
+import requests
+import config
+from http_cache import cached_get
+
+# The latest catalog, as (fetched_at, sports), so it is not decoded from disk every cycle.
+_catalog = None
+
+def fetch_sports(session: requests.Session = None, api_key: str = None) -> list[dict]:
+    """
+    Returns the list of sports, including inactive ones, refreshed at most once per
+    config.CACHE_TTL_SECONDS['sports'] (through the on-disk HTTP cache when it is enabled).
+
+    Args:
+        session: Optional HTTP session to use.
+        api_key: The API key to use. Defaults to config.API_KEY.
+
+    Returns:
+        A list of sport dictionaries ('key', 'group', 'title', 'active', 'has_outrights', ...).
+
+    Raises:
+        requests.exceptions.RequestException: If the list could not be fetched.
+    """
+    global _catalog
+    ttl = config.CACHE_TTL_SECONDS['sports']
+    if _catalog is not None and time.time() - _catalog[0] < ttl:
+        return _catalog[1]
+
+    params = {'api_key': api_key or config.API_KEY, 'all': 'true'}
+    response = cached_get(session or requests.Session(), f'{config.ODDS_API_BASE_URL}/sports', params, ttl)
+    response.raise_for_status()
+    sports = response.json()
+    _catalog = (time.time(), sports)
+    return sports
+
+def load_catalog(session: requests.Session = None) -> list[dict]:
+    """
+    Returns the catalog, falling back to the last known copy (or an empty list) when it cannot be fetched.
+
+    Args:
+        session: Optional HTTP session to use.
+
+    Returns:
+        A list of sport dictionaries.
+    """
+    try:
+        return fetch_sports(session)
+    except (requests.exceptions.RequestException, ValueError) as e:
+        print(f"Could not fetch the sports catalog ({e}). Using the last known list.")
+        return _catalog[1] if _catalog else []  # A stale catalog is better than none.
+
+def is_pattern(sport_key: str) -> bool:
+    """Tells whether an entry of TARGET_SPORTS is a wildcard pattern rather than a sport key."""
+    return any(character in sport_key for character in '*?[')
+
+def resolve_sport_patterns(patterns: list[str], sports: list[dict]) -> list[str]:
+    """
+    Expands wildcard patterns into the matching sport keys of the catalog.
+    Patterns only match active sports without outrights (futures markets have no totals or
+    spreads); plain keys are kept as they are. The order of the patterns is preserved.
+
+    Args:
+        patterns: Sport keys and/or patterns, e.g., ['soccer_*', 'basketball_nba'].
+        sports: The catalog returned by fetch_sports.
+
+    Returns:
+        The list of sport keys, without duplicates.
+    """
+    candidates = [sport['key'] for sport in sports if sport.get('active') and not sport.get('has_outrights')]
+    sport_keys = []
+    for pattern in patterns:
+        matches = fnmatch.filter(candidates, pattern) if is_pattern(pattern) else [pattern]
+        for sport_key in matches:
+            if sport_key not in sport_keys:
+                sport_keys.append(sport_key)
+    return sport_keys
+
+def state_path() -> str:
+    """Returns the path of the activity state file (relative paths are resolved from the project folder)."""
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), config.SPORTS_STATE_PATH)
+
+def load_activity() -> dict:
+    """
+    Loads the per-sport activity state.
+
+    Returns:
+        A dictionary mapping each sport key to {'empty_since': timestamp or None, 'last_checked_at': timestamp}.
+    """
+    try:
+        with open(state_path(), encoding='utf-8') as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return {}
+
+def save_activity(activity: dict):
+    """Writes the activity state atomically, so a parallel process never reads a half-written file."""
+    path = state_path()
+    file_descriptor, temporary_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    try:
+        with os.fdopen(file_descriptor, 'w', encoding='utf-8') as file:
+            json.dump(activity, file, indent=2, sort_keys=True)
+        os.replace(temporary_path, path)
+    except OSError as e:
+        print(f"Could not save the sports activity state: {e}")
+        if os.path.exists(temporary_path):
+            os.remove(temporary_path)
+
+def record_sport_results(markets_per_sport: dict[str, int], now: float = None):
+    """
+    Updates the activity state with the sports fetched successfully in this cycle.
+
+    Args:
+        markets_per_sport: Maps each fetched sport key to the number of markets it returned.
+        now: The current time as a Unix timestamp. Defaults to time.time().
+    """
+    if not markets_per_sport:
+        return
+    now = now or time.time()
+    activity = load_activity()
+    for sport_key, markets in markets_per_sport.items():
+        entry = activity.setdefault(sport_key, {'empty_since': None, 'last_checked_at': now})
+        if markets:
+            entry['empty_since'] = None
+        elif entry['empty_since'] is None:
+            entry['empty_since'] = now  # First empty answer of a new streak.
+        entry['last_checked_at'] = now
+    save_activity(activity)
+
+def is_idle(entry: dict | None, now: float) -> bool:
+    """
+    Tells whether a sport should be skipped because it has returned no games for a while.
+    An idle sport is still checked once every SPORT_IDLE_RECHECK_HOURS.
+
+    Args:
+        entry: The sport's activity state, or None if it was never checked.
+        now: The current time as a Unix timestamp.
+
+    Returns:
+        True if the sport should be skipped in this cycle.
+    """
+    if not entry or entry['empty_since'] is None:
+        return False
+    empty_for = now - entry['empty_since']
+    since_last_check = now - entry['last_checked_at']
+    return (empty_for >= config.SPORT_IDLE_AFTER_HOURS * 3600
+            and since_last_check < config.SPORT_IDLE_RECHECK_HOURS * 3600)
+
+def resolve_target_sports(patterns: list[str] = None, session: requests.Session = None) -> list[str]:
+    """
+    Resolves the wildcard patterns of TARGET_SPORTS with the catalog. Nothing is fetched
+    when there are no patterns.
+
+    Args:
+        patterns: Sport keys and/or patterns. Defaults to config.TARGET_SPORTS.
+        session: Optional HTTP session to use.
+
+    Returns:
+        The list of sport keys.
+    """
+    patterns = patterns if patterns is not None else config.TARGET_SPORTS
+    if not any(is_pattern(pattern) for pattern in patterns):
+        return list(patterns)
+    return resolve_sport_patterns(patterns, load_catalog(session))
+
+def select_sports(patterns: list[str], session: requests.Session = None, now: float = None) -> tuple[list[str], list[str]]:
+    """
+    Decides which sports to request in this cycle.
+
+    Args:
+        patterns: Sport keys and/or wildcard patterns.
+        session: Optional HTTP session to use.
+        now: The current time as a Unix timestamp. Defaults to time.time().
+
+    Returns:
+        A tuple (sports_to_check, skipped_sports).
+    """
+    now = now or time.time()
+    sports = load_catalog(session)
+    inactive = {sport['key'] for sport in sports if not sport.get('active')}
+    activity = load_activity()
+
+    sports_to_check, skipped_sports = [], []
+    for sport_key in resolve_sport_patterns(patterns, sports):
+        if sport_key in inactive:
+            print(f"Skipping '{sport_key}': the API reports it as inactive.")
+            skipped_sports.append(sport_key)
+        elif is_idle(activity.get(sport_key), now):
+            print(f"Skipping '{sport_key}': no games for over {config.SPORT_IDLE_AFTER_HOURS} hours.")
+            skipped_sports.append(sport_key)
+        else:
+            sports_to_check.append(sport_key)
+    return sports_to_check, skipped_sports
@@ -0,0 +1,248 @@
+# stream_ingest.py
+# This module runs the bot as a streaming daemon. Instead of polling the API on a schedule,
+# it consumes a continuous feed of odds updates and reacts to each price change as it arrives:
+#   1. Reader threads take NDJSON lines (one update per line) from a local TCP socket or from a
+#      file being appended to (like 'tail -f') and put them on a bounded queue.
+#   2. A single consumer applies each update to the live OddsBook, which reports the markets
+#      whose best prices changed.
+#   3. Only those markets (and the game's cross-line middles) are re-analyzed, and any surebet
+#      goes straight to the alert dispatcher, typically within milliseconds of the update.
+#
+# Each update is a game object in the same format as The Odds API response, usually carrying a
+# single bookmaker and market. For every (bookmaker, market key) pair it contains, the update
+# replaces that bookmaker's previous odds. An optional 'sent_at' field (Unix time) is used to
+# report end-to-end latency. A line may also hold a whole API response (a list of games).
+#
+# Example (see replay_feed.py for a local stand-in feed):
+#   python stream_ingest.py tcp://127.0.0.1:9109
+#   python stream_ingest.py odds_updates.ndjson
+
+import json
+import os
+import queue
+import socketserver
+import sys
+import threading
+import time
+import config
+from main import build_game, analyze_markets, expire_started_games
+from metrics import metrics, start_metrics_server
+from notifier import dispatch_surebet_alert, flush_alerts
+from history_store import flush_history
+from odds_book import OddsBook
+from price_history import rank_surebets
+
+# How often a tailed file is checked for new lines when it has none, in seconds.
+FILE_POLL_INTERVAL = 0.05
+
+# The longest the daemon waits before expiring started games when the feed is quiet, in seconds.
+EXPIRY_CHECK_INTERVAL = 1.0
+
+class UpdateHandler(socketserver.StreamRequestHandler):
+    """Reads NDJSON updates from one feed connection and queues them."""
+    def handle(self):
+        for line in self.rfile:
+            if line.strip():
+                self.server.updates.put((line, time.time()))  # Blocks when full, slowing the sender down.
+
+class UpdateServer(socketserver.ThreadingTCPServer):
+    """A local TCP server accepting any number of feed connections."""
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address: tuple[str, int], updates: queue.Queue):
+        super().__init__(address, UpdateHandler)
+        self.updates = updates
+
+def listen_socket(host: str, port: int, updates: queue.Queue) -> UpdateServer:
+    """
+    Starts accepting feed connections in a background thread.
+
+    Args:
+        host: The interface to listen on.
+        port: The port to listen on (0 picks a free one).
+        updates: The queue receiving (line, received_at) tuples.
+
+    Returns:
+        The running server.
+    """
+    server = UpdateServer((host, port), updates)
+    threading.Thread(target=server.serve_forever, name='stream-socket', daemon=True).start()
+    print(f"Listening for odds updates on tcp://{server.server_address[0]}:{server.server_address[1]}")
+    return server
+
+def follow_file(path: str, updates: queue.Queue, stop: threading.Event = None):
+    """
+    Reads an NDJSON file from the beginning and keeps reading the lines appended to it.
+    A truncated or replaced file is read again from the start.
+
+    Args:
+        path: The file to follow.
+        updates: The queue receiving (line, received_at) tuples.
+        stop: Optional event that ends the loop when set.
+    """
+    position = 0
+    partial = b''   # An incomplete last line, kept until its newline arrives.
+    while not (stop and stop.is_set()):
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            size = position = 0
+        if size < position:
+            position, partial = 0, b''  # The file was truncated or rotated.
+        if size == position:
+            time.sleep(FILE_POLL_INTERVAL)
+            continue
+
+        with open(path, 'rb') as file:
+            file.seek(position)
+            data = file.read()
+            position = file.tell()
+        received_at = time.time()
+        lines = (partial + data).split(b'\n')
+        partial = lines.pop()
+        for line in lines:
+            if line.strip():
+                updates.put((line, received_at))
+
+def start_source(source: str, updates: queue.Queue):
+    """
+    Starts reading updates from a feed.
+
+    Args:
+        source: 'tcp://host:port' to listen on a socket, or the path of an NDJSON file to follow.
+        updates: The queue receiving (line, received_at) tuples.
+    """
+    if source.startswith('tcp://'):
+        host, port = source[len('tcp://'):].rsplit(':', 1)
+        listen_socket(host, int(port), updates)
+    else:
+        print(f"Following odds updates from '{source}'")
+        threading.Thread(target=follow_file, args=(source, updates), name='stream-file', daemon=True).start()
+
+def updated_pairs(update: dict) -> set[tuple[str, str]]:
+    """Returns the (bookmaker_key, market_key) pairs covered by an update."""
+    return {(bookmaker['key'], market['key']) for bookmaker in update['bookmakers'] for market in bookmaker['markets']}
+
+def validate_prices(update: dict):
+    """
+    Rejects an update carrying a price the engines cannot use (missing, non-numeric, or not
+    above zero). It is checked before the book is touched, so a bad update never replaces
+    a bookmaker's odds or the market's signature.
+
+    Args:
+        update: One game object from the feed.
+
+    Raises:
+        ValueError: If any outcome has an invalid price.
+    """
+    for bookmaker in update['bookmakers']:
+        for market in bookmaker['markets']:
+            for outcome in market['outcomes']:
+                price = outcome.get('price')
+                if isinstance(price, bool) or not isinstance(price, (int, float)) or not price > 0:
+                    raise ValueError(f"invalid price {price!r} from '{bookmaker['key']}' in '{market['key']}'")
+
+def process_update(odds_book: OddsBook, update: dict) -> list:
+    """
+    Applies one update to the book and analyzes only the markets whose best prices changed.
+
+    Args:
+        odds_book: The live OddsBook.
+        update: One game object from the feed.
+
+    Returns:
+        A list of surebet dictionaries found in the changed markets.
+    """
+    validate_prices(update)
+    dirty_markets = odds_book.apply_update(build_game(update), updated_pairs(update))
+    return analyze_markets(dirty_markets) if dirty_markets else []
+
+def handle_line(odds_book: OddsBook, line: bytes, received_at: float) -> list:
+    """
+    Decodes one feed line, processes its update(s) and dispatches the alerts. An update that is
+    malformed or fails to process is logged and skipped on its own; the other updates of the
+    line are still applied.
+
+    Args:
+        odds_book: The live OddsBook.
+        line: The raw NDJSON line.
+        received_at: When the line was read from the feed.
+
+    Returns:
+        A list of surebet dictionaries found.
+    """
+    try:
+        data = json.loads(line)
+    except ValueError as e:
+        print(f"Ignoring malformed update: {e}")
+        metrics.increment('surebet_stream_errors_total')
+        return []
+
+    surebets = []
+    applied = []
+    for update in data if isinstance(data, list) else [data]:
+        try:
+            surebets.extend(process_update(odds_book, update))
+            applied.append(update)
+        except Exception as e:
+            print(f"Ignoring malformed update: {e!r}")
+            metrics.increment('surebet_stream_errors_total')
+    if not applied:
+        return surebets
+
+    metrics.increment('surebet_stream_updates_total', len(applied))
+    metrics.observe('stream', time.time() - received_at)
+    for surebet in rank_surebets(surebets):
+        dispatch_surebet_alert(surebet)
+
+    if surebets:
+        sent_at = applied[-1].get('sent_at')
+        if isinstance(sent_at, bool) or not isinstance(sent_at, (int, float)):
+            sent_at = received_at  # Missing or unusable: measure from when the line was read.
+        print(f"{len(surebets)} surebet(s) detected {(time.time() - sent_at) * 1000:.1f} ms after the price change.")
+    return surebets
+
+def run_stream_daemon(source: str = None, odds_book: OddsBook = None):
+    """
+    Runs the streaming daemon until it is interrupted with Ctrl+C.
+
+    Args:
+        source: The feed to read (see start_source). Defaults to config.STREAM_SOURCE.
+        odds_book: Optional OddsBook to start from. Defaults to an empty one.
+    """
+    source = source or config.STREAM_SOURCE
+    odds_book = odds_book if odds_book is not None else OddsBook()
+    updates = queue.Queue(maxsize=config.STREAM_QUEUE_SIZE)
+
+    print("--- STREAMING MODE STARTED ---")
+    start_source(source, updates)
+    print("Press Ctrl+C to stop the bot at any time.")
+
+    try:
+        while True:
+            try:
+                line, received_at = updates.get(timeout=EXPIRY_CHECK_INTERVAL)
+                handle_line(odds_book, line, received_at)
+            except queue.Empty:
+                pass
+            except Exception as e:
+                # One bad line must never stop the daemon.
+                print(f"Error while processing an update: {e!r}")
+                metrics.increment('surebet_stream_errors_total')
+            # Cheap when nothing is due: only the top of the expiry heap is checked.
+            expire_started_games(odds_book)
+    except KeyboardInterrupt:
+        print("\n\n--- STREAMING STOPPED BY USER ---")
+        flush_alerts()
+        flush_history()
+
+# This block allows the daemon to be started directly, optionally with the feed as an argument.
+if __name__ == "__main__":
+    if config.METRICS_ENABLED:
+        start_metrics_server()
+    if len(sys.argv) < 2 and not config.STREAM_SOURCE:
+        print("Usage: python stream_ingest.py <tcp://host:port | path/to/updates.ndjson>")
+        print("(or set STREAM_SOURCE in config.py)")
+        sys.exit(1)
+    run_stream_daemon(sys.argv[1] if len(sys.argv) > 1 else None)
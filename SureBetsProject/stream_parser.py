@@ -0,0 +1,107 @@
+# stream_parser.py
+# This module parses a JSON array incrementally, one element at a time, straight from
+# the chunks of an HTTP response body. It lets the bot process a large Odds API response
+# game by game, without ever holding the whole raw payload or the full list of parsed
+# dictionaries in memory.
+
+import codecs
+import json
+import re
+
+# Matches the whitespace and commas that separate the elements of a JSON array.
+_SEPARATORS = re.compile(r'[\s,]*')
+
+# Matches what may follow a complete element: a comma or the end of the array.
+_ELEMENT_END = re.compile(r'\s*[,\]]')
+
+# Matches the tokens that matter when looking for the end of an object or array: a whole
+# string (so braces inside it are skipped; group 1 is None if it is not closed yet) or a bracket.
+_STRUCTURE = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*(")?|[{}\[\]]')
+
+def iter_json_array(chunks):
+    """
+    Incrementally parses a top-level JSON array and yields each element as soon as it is complete.
+    The end of an object or array element is found by scanning only the newly received data for
+    brackets (skipping strings), so each element is decoded exactly once, however many chunks it spans.
+
+    Args:
+        chunks: An iterable of bytes objects (e.g., response.iter_content()) that together
+            form a JSON array.
+
+    Yields:
+        Each element of the array, decoded into Python objects.
+
+    Raises:
+        ValueError: If the data is not a JSON array or ends before the array is closed.
+    """
+    json_decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder('utf-8')()
+    buffer = ''
+    position = 0            # Start of the next unparsed data in the buffer.
+    array_started = False
+    scan = None             # While an element is incomplete: how far it has been scanned...
+    depth = 0               # ...and how many of its brackets are still open.
+
+    for chunk in chunks:
+        # Drop everything already parsed and append the new data.
+        buffer = buffer[position:] + text_decoder.decode(chunk)
+        if scan is not None:
+            scan -= position
+        position = 0
+
+        while True:
+            if scan is None:
+                position = _SEPARATORS.match(buffer, position).end()
+                if position >= len(buffer):
+                    break  # Need more data.
+
+                if not array_started:
+                    if buffer[position] != '[':
+                        raise ValueError(f"Expected a JSON array, got: {buffer[position:position + 80]!r}")
+                    array_started = True
+                    position += 1
+                    continue
+
+                if buffer[position] == ']':
+                    return  # The array is complete.
+
+                if buffer[position] not in '{[':
+                    # A scalar element (rare): decode it once a comma or ']' follows it, so a
+                    # number split across two chunks (e.g., '1.' and '5') is not read too early.
+                    try:
+                        element, position_after = json_decoder.raw_decode(buffer, position)
+                    except json.JSONDecodeError:
+                        break
+                    if not _ELEMENT_END.match(buffer, position_after):
+                        break
+                    yield element
+                    position = position_after
+                    continue
+                scan, depth = position, 0
+
+            # Scan the new data of the current object or array for its closing bracket.
+            end = None
+            for token in _STRUCTURE.finditer(buffer, scan):
+                text = token.group()
+                if text[0] == '"':
+                    if token.group(1) is None:
+                        break  # The string continues in the next chunk.
+                elif text in '{[':
+                    depth += 1
+                else:
+                    depth -= 1
+                    if depth == 0:
+                        end = token.end()
+                        break
+                scan = token.end()
+            else:
+                scan = len(buffer)
+
+            if end is None:
+                break  # Need more data; scanning resumes where it stopped.
+
+            element, _ = json_decoder.raw_decode(buffer[:end], position)
+            yield element
+            position, scan = end, None
+
+    raise ValueError("The JSON array ended unexpectedly (truncated response?).")
@@ -1,49 +1,65 @@
 # surebet_calculator.py
 # This module contains the core logic for identifying the best odds within a market
 # and calculating the profit margin to determine if a surebet exists.
+# Markets may have any number of outcomes, such as 3-way soccer h2h (Home/Draw/Away).
 
-from models import Game, Market, Odd
+from models import Game, Market, Odd, make_surebet
+from line_index import find_middles_for_game
 
-def find_best_odds(market: Market) -> tuple[Odd | None, Odd | None]:
+def find_best_odds(market: Market) -> list[Odd]:
     """
-    Finds the highest available odds for each side of a 2-way market.
-    For example, in a 'totals' market, it finds the best 'Over' odd and the best 'Under' odd.
+    Finds the highest available odd for each outcome of a market, in a single pass over its odds.
+    For example, in a 'totals' market, it finds the best 'Over' odd and the best 'Under' odd;
+    in a 3-way 'h2h' market, the best 'Home', 'Draw' and 'Away' odds.
 
     Args:
         market: A Market object containing a list of outcomes.
 
     Returns:
-        A tuple containing the best Odd object for each side (best_odd_A, best_odd_B),
-        or (None, None) if the market is not a clear 2-way market.
+        A list with the best Odd object of each outcome, in the order the outcomes first appear.
+        On a tie, the first odd seen is kept.
     """
-    best_outcome_A = None
-    best_outcome_B = None
+    # Dictionaries keep insertion order, so replacing a best odd keeps its outcome's position.
+    best_odds = {}
+    for odd in market.outcomes:
+        best_odd = best_odds.get(odd.name)
+        if best_odd is None or odd.price > best_odd.price:
+            best_odds[odd.name] = odd
+    return list(best_odds.values())
 
-    # Identify the two unique outcome names in the market (e.g., ["Over", "Under"] or ["Team A", "Team B"]).
-    outcome_names = list(set(o.name for o in market.outcomes))
-    
-    # A surebet can only be calculated for markets with exactly two opposing outcomes.
-    if len(outcome_names) != 2:
-        return None, None 
+def check_market(game: Game, market: Market) -> dict | None:
+    """
+    Checks a single market of a game (with any number of outcomes) for a surebet.
 
-    name_A, name_B = outcome_names[0], outcome_names[1]
+    Args:
+        game: The Game object the market belongs to.
+        market: The Market object to check.
 
-    # Iterate through all odds in the market to find the highest price for each outcome.
-    for odd in market.outcomes:
-        if odd.name == name_A:
-            # If this is the first odd for outcome A or its price is higher than the current best, update it.
-            if best_outcome_A is None or odd.price > best_outcome_A.price:
-                best_outcome_A = odd
-        elif odd.name == name_B:
-            # If this is the first odd for outcome B or its price is higher than the current best, update it.
-            if best_outcome_B is None or odd.price > best_outcome_B.price:
-                best_outcome_B = odd
-    
-    return best_outcome_A, best_outcome_B
+    Returns:
+        A dictionary with detailed information about the surebet (see models.make_surebet),
+        or None if there is none.
+    """
+    legs = find_best_odds(market)
+
+    # A surebet needs at least two opposing outcomes to bet on.
+    if len(legs) < 2:
+        return None
+
+    # The core surebet formula: calculate the sum of the inverse of the odds.
+    margin = sum(1 / odd.price for odd in legs)
+
+    # If the margin is 1 or more, there is no guaranteed profit.
+    if margin >= 1:
+        return None
+
+    # A surebet is found! Return all relevant information in a dictionary,
+    # including the profit percentage and how to split the stake.
+    return make_surebet(game, market, legs, margin)
 
 def find_surebets_for_game(game: Game) -> list:
     """
-    Analyzes all markets within a single game and returns a list of any surebets found.
+    Analyzes all markets within a single game and returns a list of any surebets found,
+    followed by any cross-line middles between its totals or spreads lines.
 
     Args:
         game: A Game object containing all its markets.
@@ -56,26 +72,9 @@ def find_surebets_for_game(game: Game) -> list:
 
     # Check each market (e.g., 'totals 2.5', 'h2h') within the game.
     for market in game.markets.values():
-        best_odd_A, best_odd_B = find_best_odds(market)
-
-        # Proceed only if we found the best odds for both sides of the market.
-        if best_odd_A and best_odd_B:
-            # The core surebet formula: calculate the sum of the inverse of the odds.
-            margin = (1 / best_odd_A.price) + (1 / best_odd_B.price)
-
-            # If the margin is less than 1, it's a guaranteed profit (a surebet).
-            if margin < 1:
-                # Calculate the profit percentage.
-                profit = (1 - margin) * 100
-                
-                # A surebet is found! Store all relevant information in a dictionary.
-                surebet_info = {
-                    "game": game,
-                    "market": market,
-                    "best_odd_A": best_odd_A,
-                    "best_odd_B": best_odd_B,
-                    "profit_margin": profit
-                }
-                surebets_found.append(surebet_info)
+        surebet_info = check_market(game, market)
+        if surebet_info:
+            surebets_found.append(surebet_info)
 
+    surebets_found.extend(find_middles_for_game(game))
     return surebets_found
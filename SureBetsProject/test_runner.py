@@ -2,10 +2,25 @@
 # This script runs a unit test to verify that the core components of the bot
 # are working as expected. It tests both the surebet calculation logic and
 # the Telegram notification system.
+# Run it with '--mock' to send the test alert to a local stand-in for Telegram
+# (see mock_servers.py) instead of the real chat.
 
+import json
+import os
+import sys
+import tempfile
+import time
+import config
 from models import Game, Market, Odd
-from surebet_calculator import find_surebets_for_game
-from notifier import send_telegram_alert # Import the notifier module to test it.
+from surebet_calculator import find_surebets_for_game, check_market
+from notifier import send_telegram_alert, format_surebet_alert, AlertDispatcher # Import the notifier module to test it.
+from line_index import find_middles_for_game
+from odds_book import OddsBook, parse_commence_time
+from stream_parser import iter_json_array
+from main import build_game, process_api_data, select_markets, fetch_odds_for_sport, stream_odds_for_sport
+from payload_generator import generate_payload
+from price_history import PriceTracker, rank_surebets
+from request_planner import RequestPlanner
 
 def run_surebet_test():
     """
@@ -31,7 +46,7 @@ def run_surebet_test():
     normal_odd_under = Odd(name="Under", price=1.9, bookmaker="NormalBookie_D", point=2.5)
     
     test_market.outcomes.extend([surebet_odd_over, surebet_odd_under, normal_odd_over, normal_odd_under])
-    test_game.markets['totals_2.5'] = test_market
+    test_game.markets[('totals', 2.5)] = test_market
 
     print("Mock game created. Feeding it to the 'surebet_calculator'...")
     
@@ -44,23 +59,8 @@ def run_surebet_test():
     if found_surebets:
         print("\n✅ PASS! The bot's brain correctly detected the surebet.")
         
-        surebet = found_surebets[0]
-        profit_margin = surebet['profit_margin']
-        game_info = surebet['game']
-        market_info = surebet['market']
-        odd_A = surebet['best_odd_A']
-        odd_B = surebet['best_odd_B']
-
         # 4. Format the Telegram message exactly as the main bot would.
-        message = (
-            f"<b>💰 TEST SUREBET FOUND! 💰</b>\n\n"
-            f"<b>Guaranteed Profit:</b> {profit_margin:.2f}%\n\n"
-            f"<b>Game:</b> {game_info.home_team} vs {game_info.away_team}\n"
-            f"<b>Market:</b> {market_info.key.capitalize()} (Line: {market_info.point})\n\n"
-            f"<b>Bets to place:</b>\n"
-            f"  1. <b>{odd_A.price}</b> on <code>{odd_A.name}</code> at <b>{odd_A.bookmaker}</b>\n"
-            f"  2. <b>{odd_B.price}</b> on <code>{odd_B.name}</code> at <b>{odd_B.bookmaker}</b>"
-        )
+        message = format_surebet_alert(found_surebets[0], title="TEST SUREBET FOUND!")
         
         print("\nFormatting and sending test alert to Telegram...")
         # 5. Call the notification function to test the Telegram integration.
@@ -69,6 +69,375 @@ def run_surebet_test():
     else:
         print("\n❌ FAIL! The bot's brain DID NOT detect the guaranteed surebet.")
 
+def run_middle_test():
+    """
+    Verifies that a cross-line middle (Over 2.5 against Under 3.5) is detected,
+    while the two lines are analyzed as separate markets.
+    """
+    print("\n--- STARTING MIDDLE DETECTION TEST ---")
+
+    test_game = Game(id="test_game_02", home_team="Test Team A", away_team="Test Team B", commence_time="2099-01-01T12:00:00Z")
+    market_low = Market(key="totals", point=2.5)
+    market_high = Market(key="totals", point=3.5)
+
+    # Over 2.5 and Under 3.5 at 2.1 each: no single line is a surebet, but the pair is.
+    market_low.outcomes.extend([Odd(name="Over", price=2.1, bookmaker="TestBookie_A", point=2.5), Odd(name="Under", price=1.6, bookmaker="TestBookie_A", point=2.5)])
+    market_high.outcomes.extend([Odd(name="Over", price=1.4, bookmaker="TestBookie_B", point=3.5), Odd(name="Under", price=2.1, bookmaker="TestBookie_B", point=3.5)])
+    test_game.markets[('totals', 2.5)] = market_low
+    test_game.markets[('totals', 3.5)] = market_high
+
+    middles = find_middles_for_game(test_game)
+
+    print("\n--- TEST RESULT ---")
+    if len(middles) == 1 and middles[0]['market'].point == (2.5, 3.5):
+        print("\n✅ PASS! The Over 2.5 / Under 3.5 middle was detected.")
+        print(format_surebet_alert(middles[0], title="TEST MIDDLE FOUND!"))
+    else:
+        print(f"\n❌ FAIL! Expected one 2.5 / 3.5 middle, got: {middles}")
+
+def run_three_way_test():
+    """
+    Verifies that a 3-way market (Home/Draw/Away, as in soccer h2h) is analyzed,
+    and that the stake split makes every bet pay out the same amount.
+    """
+    print("\n--- STARTING 3-WAY MARKET TEST ---")
+    test_game = Game(id="test_game_03", home_team="Test Team A", away_team="Test Team B", commence_time="2099-01-01T12:00:00Z")
+    test_market = Market(key="h2h", point=0.0)
+
+    # 1/3.2 + 1/3.6 + 1/3.8 is about 0.853: a surebet only when the three best prices are combined.
+    test_market.outcomes.extend([
+        Odd(name="Test Team A", price=3.2, bookmaker="TestBookie_A"), Odd(name="Draw", price=3.0, bookmaker="TestBookie_A"),
+        Odd(name="Test Team B", price=2.4, bookmaker="TestBookie_A"), Odd(name="Test Team A", price=2.0, bookmaker="TestBookie_B"),
+        Odd(name="Draw", price=3.6, bookmaker="TestBookie_B"), Odd(name="Test Team B", price=3.8, bookmaker="TestBookie_C")
+    ])
+    test_game.markets[('h2h', 0.0)] = test_market
+
+    found_surebets = find_surebets_for_game(test_game)
+
+    print("\n--- TEST RESULT ---")
+    if len(found_surebets) == 1 and [odd.price for odd in found_surebets[0]['legs']] == [3.2, 3.6, 3.8]:
+        surebet = found_surebets[0]
+        payouts = [stake * odd.price for odd, stake in zip(surebet['legs'], surebet['stakes'])]
+        if max(payouts) - min(payouts) < 1e-9:
+            print("\n✅ PASS! The 3-way surebet was detected and every bet pays out the same.")
+        else:
+            print(f"\n❌ FAIL! The stake split pays out unevenly: {payouts}")
+        print(format_surebet_alert(surebet, title="TEST 3-WAY SUREBET FOUND!"))
+    else:
+        print(f"\n❌ FAIL! Expected one Home/Draw/Away surebet at 3.2 / 3.6 / 3.8, got: {found_surebets}")
+
+def run_odds_book_test():
+    """
+    Verifies the OddsBook diff: a snapshot is merged, then a partial update from one bookmaker
+    moves its totals line. Only the changed market must be reported, the bookmaker's old line
+    must be gone, and the games must expire at kickoff and once they are over.
+    """
+    print("\n--- STARTING ODDS BOOK TEST ---")
+
+    def totals(bookmaker, point, over, under):
+        return {'key': bookmaker, 'markets': [{'key': 'totals', 'outcomes': [
+            {'name': 'Over', 'price': over, 'point': point}, {'name': 'Under', 'price': under, 'point': point}]}]}
+
+    game_data = {'id': 'test_game_04', 'home_team': 'Test Team A', 'away_team': 'Test Team B',
+                 'commence_time': '2099-01-01T12:00:00Z'}
+    odds_book = OddsBook()
+    # TestBookie_B has the best prices on the 2.5 line, so TestBookie_A leaving it changes nothing there.
+    odds_book.merge([build_game({**game_data, 'bookmakers': [totals('TestBookie_A', 2.5, 1.9, 1.9), totals('TestBookie_B', 2.5, 2.0, 1.95)]})])
+
+    # TestBookie_A moves its totals from the 2.5 line to the 3.0 line.
+    update = build_game({**game_data, 'bookmakers': [totals('TestBookie_A', 3.0, 2.2, 1.7)]})
+    dirty_markets = odds_book.apply_update(update, {('TestBookie_A', 'totals')})
+    stored_game = odds_book.games['test_game_04']
+    old_line_bookmakers = {odd.bookmaker for odd in stored_game.markets[('totals', 2.5)].outcomes}
+
+    # A shaped request for TestBookie_B only must not keep TestBookie_A's older prices.
+    shaped = build_game({**game_data, 'bookmakers': [totals('TestBookie_B', 2.5, 2.0, 1.95)]})
+    odds_book.apply_update(shaped, {('TestBookie_B', 'totals')}, exclusive=True)
+    shaped_lines = set(stored_game.markets)
+
+    kickoff = parse_commence_time(game_data['commence_time']).timestamp()
+    expired_at_kickoff = odds_book.expire(now=kickoff + 1)
+    expired_when_over = odds_book.expire(now=kickoff + config.GAME_RETENTION_HOURS * 3600 + 1)
+
+    print("\n--- TEST RESULT ---")
+    if [market.point for _, market in dirty_markets] != [3.0]:
+        print(f"\n❌ FAIL! Expected only the new 3.0 line to change, got: {dirty_markets}")
+    elif old_line_bookmakers != {'TestBookie_B'}:
+        print(f"\n❌ FAIL! TestBookie_A's old 2.5 line was kept: {old_line_bookmakers}")
+    elif shaped_lines != {('totals', 2.5)}:
+        print(f"\n❌ FAIL! The shaped update kept lines of unrequested bookmakers: {shaped_lines}")
+    elif expired_at_kickoff != (1, 0) or expired_when_over != (0, 1) or len(odds_book):
+        print(f"\n❌ FAIL! Unexpected expiry: {expired_at_kickoff} at kickoff, {expired_when_over} after the game.")
+    else:
+        print("\n✅ PASS! Only the changed market was reported and the replaced line is gone.")
+
+def run_stream_parser_test():
+    """
+    Verifies that the streaming parser gives the same result as json.loads, whatever the chunk
+    boundaries: inside strings, right after a backslash, inside numbers and multi-byte characters.
+    """
+    print("\n--- STARTING STREAMING PARSER TEST ---")
+    payload = json.dumps([
+        {'id': 'test_game_05', 'home_team': 'Team {A} [1]', 'away_team': 'São "B" \\ ]}', 'bookmakers': [
+            {'key': 'TestBookie_A', 'markets': [{'key': 'totals', 'outcomes': [
+                {'name': 'Over', 'price': 1.95, 'point': 2.5}, {'name': 'Under', 'price': 12.125, 'point': -2.5e1}]}]}]},
+        [1, "\\\"", {}], -0.5, 'text, with ] and }', True, None, 1234567
+    ], ensure_ascii=False).encode('utf-8')
+    expected = json.loads(payload)
+
+    failures = []
+    # Two chunks split at every byte, then fixed chunk sizes.
+    splits = [[payload[:cut], payload[cut:]] for cut in range(len(payload) + 1)]
+    splits += [[payload[i:i + size] for i in range(0, len(payload), size)] for size in (1, 2, 3, 7)]
+    for chunks in splits:
+        try:
+            result = list(iter_json_array(chunks))
+        except ValueError as e:
+            result = e
+        if result != expected:
+            failures.append(([len(chunk) for chunk in chunks], result))
+
+    print("\n--- TEST RESULT ---")
+    if failures:
+        chunk_sizes, result = failures[0]
+        print(f"\n❌ FAIL! {len(failures)} split(s) differ from json.loads; chunks {chunk_sizes[:10]} gave: {result!r}")
+    else:
+        print(f"\n✅ PASS! All {len(splits)} splits matched json.loads.")
+
+def run_engine_parity_test():
+    """
+    Verifies that the NumPy engine finds exactly the same surebets as the Python engine (same
+    markets, same legs, same margins) on a synthetic payload with 2-way and 3-way markets and
+    tied prices. Skipped when NumPy is not installed.
+    """
+    print("\n--- STARTING ENGINE PARITY TEST ---")
+    try:
+        from vectorized_calculator import find_surebets_vectorized
+    except ImportError:
+        print("\nSKIPPED: NumPy is not installed.")
+        return
+
+    payload = generate_payload(games=100, bookmakers=12, lines=3, surebet_density=0.2, include_draw=True, seed=7)
+    for game_data in payload:
+        for bookmaker in game_data['bookmakers']:
+            for market in bookmaker['markets']:
+                for outcome in market['outcomes']:
+                    outcome['price'] = round(outcome['price'], 1)  # Rounded prices create ties between bookmakers.
+    market_pairs = select_markets(process_api_data(payload))
+
+    def describe(surebets):
+        return [(id(surebet['market']), [id(odd) for odd in surebet['legs']], surebet['profit_margin']) for surebet in surebets]
+
+    python_surebets = describe(surebet for game, market in market_pairs if (surebet := check_market(game, market)))
+    numpy_surebets = describe(find_surebets_vectorized(market_pairs))
+
+    print("\n--- TEST RESULT ---")
+    if python_surebets and python_surebets == numpy_surebets:
+        print(f"\n✅ PASS! Both engines found the same {len(python_surebets)} surebets.")
+    else:
+        print(f"\n❌ FAIL! The Python engine found {len(python_surebets)} surebets and the NumPy engine "
+              f"{len(numpy_surebets)}, with different legs or margins.")
+
+def run_price_history_test():
+    """
+    Verifies that a surebet whose prices keep moving is ranked ahead of an equally profitable
+    surebet whose prices have been stable.
+    """
+    print("\n--- STARTING PRICE HISTORY TEST ---")
+    tracker = PriceTracker()
+    fast_game = Game(id="test_game_06", home_team="Test Team A", away_team="Test Team B", commence_time="2099-01-01T12:00:00Z")
+    stable_game = Game(id="test_game_07", home_team="Test Team C", away_team="Test Team D", commence_time="2099-01-01T12:00:00Z")
+
+    def totals_market(over, under):
+        market = Market(key="totals", point=2.5)
+        market.add_odds([Odd(name="Over", price=over, bookmaker="TestBookie_A", point=2.5),
+                         Odd(name="Under", price=under, bookmaker="TestBookie_B", point=2.5)])
+        return market
+
+    # One price update every 10 seconds: the fast game's Over price moves each time, the stable game's never does.
+    started = 1_000_000.0
+    for step, over in enumerate([1.9, 2.0, 1.95, 2.05, 2.1]):
+        fast_market, stable_market = totals_market(over, 2.1), totals_market(2.1, 2.1)
+        tracker.record_markets([(fast_game, fast_market), (stable_game, stable_market)], now=started + step * 10)
+
+    surebets = [check_market(stable_game, stable_market), check_market(fast_game, fast_market)]
+    tracker.annotate(surebets, now=started + 50)
+    ranked = rank_surebets(surebets)
+
+    print("\n--- TEST RESULT ---")
+    if ranked[0]['game'] is fast_game and ranked[0]['expected_lifetime'] < ranked[1]['expected_lifetime']:
+        print(f"\n✅ PASS! The fast-moving surebet ({ranked[0]['expected_lifetime']:.0f} s) is ranked ahead "
+              f"of the stable one ({ranked[1]['expected_lifetime']:.0f} s).")
+    else:
+        print(f"\n❌ FAIL! Expected the fast-moving surebet first, got lifetimes "
+              f"{[round(surebet['expected_lifetime']) for surebet in ranked]} for games {[surebet['game'].id for surebet in ranked]}.")
+
+def run_unwritable_cache_test():
+    """
+    Verifies that odds are still fetched, streamed or not, when the HTTP cache cannot be
+    written (its folder sits under a regular file), using a local stand-in for The Odds API.
+    """
+    print("\n--- STARTING UNWRITABLE CACHE TEST ---")
+    from mock_servers import MockOddsAPI
+    mock_api = MockOddsAPI(sports=1, games=5, bookmakers=4).start()
+    saved = (config.ODDS_API_BASE_URL, config.CACHE_ENABLED, config.CACHE_DIR)
+    with tempfile.NamedTemporaryFile() as blocking_file:
+        config.ODDS_API_BASE_URL, config.CACHE_ENABLED = mock_api.base_url, True
+        config.CACHE_DIR = os.path.join(blocking_file.name, 'cache')
+        try:
+            fetched = fetch_odds_for_sport('mock_sport_0')
+            streamed = list(stream_odds_for_sport('mock_sport_0'))
+            error = None
+        except OSError as e:
+            fetched, streamed, error = [], [], e
+        finally:
+            config.ODDS_API_BASE_URL, config.CACHE_ENABLED, config.CACHE_DIR = saved
+            mock_api.shutdown()
+
+    print("\n--- TEST RESULT ---")
+    if error is None and len(fetched) == 5 and len(streamed) == 5:
+        print("\n✅ PASS! Odds were fetched and streamed without the cache.")
+    else:
+        print(f"\n❌ FAIL! Expected 5 games fetched and 5 streamed, got {len(fetched)} and {len(streamed)} (error: {error!r}).")
+
+def run_alert_dispatcher_test():
+    """
+    Verifies the background alert dispatcher against a local stand-in for Telegram: a repeated
+    alert is sent only once, an alert whose send failed is retried (not suppressed), and the
+    rate and burst limits are respected.
+    """
+    print("\n--- STARTING ALERT DISPATCHER TEST ---")
+    from mock_servers import MockTelegram, FaultProfile
+    mock_telegram = MockTelegram().start()
+    settings = ('TELEGRAM_API_BASE_URL', 'TELEGRAM_ENABLED', 'TELEGRAM_BOT_TOKEN', 'TELEGRAM_CHAT_ID',
+                'ALERT_RATE_PER_SECOND', 'ALERT_BURST', 'ALERT_BATCH_SIZE')
+    saved = {name: getattr(config, name) for name in settings}
+    config.TELEGRAM_API_BASE_URL, config.TELEGRAM_ENABLED = mock_telegram.base_url, True
+    config.TELEGRAM_BOT_TOKEN, config.TELEGRAM_CHAT_ID = 'test-token', 'test-chat'
+    config.ALERT_RATE_PER_SECOND, config.ALERT_BURST, config.ALERT_BATCH_SIZE = 10.0, 2, 1  # One alert per message.
+
+    def make_surebet(number):
+        game = Game(id=f"test_dispatch_{number}", home_team="Test Team A", away_team="Test Team B", commence_time="2099-01-01T12:00:00Z")
+        market = Market(key="totals", point=2.5)
+        market.add_odds([Odd(name="Over", price=2.1, bookmaker="TestBookie_A", point=2.5),
+                         Odd(name="Under", price=2.1, bookmaker="TestBookie_B", point=2.5)])
+        return check_market(game, market)
+
+    failures = []
+    try:
+        dispatcher = AlertDispatcher()
+
+        # 1. The same opportunity, while queued and once delivered, is sent only once.
+        repeated = make_surebet(0)
+        queued = [dispatcher.submit(repeated), dispatcher.submit(repeated)]
+        dispatcher.flush(5)
+        queued.append(dispatcher.submit(make_surebet(0)))
+        if queued != [True, False, False] or len(mock_telegram.messages) != 1:
+            failures.append(f"repeat queued as {queued}, {len(mock_telegram.messages)} message(s) sent")
+
+        # 2. A failed send is not suppressed: the next cycle can queue the alert again.
+        mock_telegram.fault = FaultProfile(error_rate=1.0)
+        dispatcher.submit(make_surebet(1))
+        dispatcher.flush(5)
+        mock_telegram.fault = FaultProfile()
+        retried = dispatcher.submit(make_surebet(1))
+        dispatcher.flush(5)
+        if dispatcher.failed_count != 1 or not retried or len(mock_telegram.messages) != 2:
+            failures.append(f"failed send: {dispatcher.failed_count} failed, requeued={retried}, {len(mock_telegram.messages)} message(s)")
+
+        # 3. Eight alerts at once: two go out back to back, the rest at most 10 per second.
+        time.sleep(1)  # Let the bucket refill to its burst size.
+        already_sent = len(mock_telegram.messages)
+        for number in range(2, 10):
+            dispatcher.submit(make_surebet(number))
+        dispatcher.flush(10)
+        arrivals = [received_at for received_at, _ in mock_telegram.messages[already_sent:]]
+        too_early = [index for index in range(config.ALERT_BURST, len(arrivals))
+                     if arrivals[index] - arrivals[0] < (index - config.ALERT_BURST + 1) / config.ALERT_RATE_PER_SECOND - 0.02]
+        if len(arrivals) != 8 or too_early:
+            failures.append(f"rate limit: {len(arrivals)} of 8 messages sent, messages {too_early} sent too early")
+    finally:
+        for name, value in saved.items():
+            setattr(config, name, value)
+        mock_telegram.shutdown()
+
+    print("\n--- TEST RESULT ---")
+    if failures:
+        print("\n❌ FAIL! " + "; ".join(failures))
+    else:
+        print("\n✅ PASS! Repeats were suppressed, the failed alert was retried and the rate limit held.")
+
+def run_request_planner_test():
+    """
+    Verifies the request planner: after two full sweeps where two bookmakers hold every best
+    totals price and spreads stay far from an arbitrage, shaped requests ask only for totals
+    from those two bookmakers, and every PLANNER_FULL_SWEEP_EVERY-th request is a full sweep.
+    """
+    print("\n--- STARTING REQUEST PLANNER TEST ---")
+    planner = RequestPlanner()
+    full_params = {'api_key': 'test', 'regions': 'eu,uk', 'markets': config.TARGET_MARKETS, 'oddsFormat': 'decimal'}
+
+    def sweep_game(number):
+        game = Game(id=f"test_planner_{number}", home_team="Test Team A", away_team="Test Team B", commence_time="2099-01-01T12:00:00Z")
+        totals, spreads = Market(key="totals", point=2.5), Market(key="spreads", point=-1.5)
+        # Over 2.05 / Under 2.0 is within 3% of an arbitrage; the spreads sit at a 20% margin.
+        totals.add_odds([Odd(name="Over", price=2.05, bookmaker="TestBookie_A", point=2.5), Odd(name="Under", price=1.8, bookmaker="TestBookie_A", point=2.5),
+                         Odd(name="Over", price=1.8, bookmaker="TestBookie_B", point=2.5), Odd(name="Under", price=2.0, bookmaker="TestBookie_B", point=2.5),
+                         Odd(name="Over", price=1.7, bookmaker="TestBookie_C", point=2.5), Odd(name="Under", price=1.7, bookmaker="TestBookie_C", point=2.5)])
+        spreads.add_odds([Odd(name="Test Team A", price=1.66, bookmaker="TestBookie_C", point=-1.5),
+                          Odd(name="Test Team B", price=1.66, bookmaker="TestBookie_C", point=1.5)])
+        game.markets[('totals', 2.5)], game.markets[('spreads', -1.5)] = totals, spreads
+        return game
+
+    # Two cycles of best-price history, each read from a full sweep.
+    for number in range(2):
+        planner.observe_game('test_sport', sweep_game(number))
+        planner.finish_sweep('test_sport')
+
+    # The next requests: shaped ones in between, a full sweep every PLANNER_FULL_SWEEP_EVERY requests.
+    plans = []
+    for number in range(2 * config.PLANNER_FULL_SWEEP_EVERY):
+        params, full_sweep = planner.plan('test_sport', full_params)
+        plans.append((params, full_sweep))
+        if full_sweep:
+            planner.observe_game('test_sport', sweep_game(number + 2))
+            planner.finish_sweep('test_sport')
+
+    full_positions = [index for index, (_, full_sweep) in enumerate(plans) if full_sweep]
+    expected_positions = [config.PLANNER_FULL_SWEEP_EVERY - 1, 2 * config.PLANNER_FULL_SWEEP_EVERY - 1]
+    shaped = [params for params, full_sweep in plans if not full_sweep]
+    expected_shape = {'api_key': 'test', 'markets': 'totals', 'oddsFormat': 'decimal', 'bookmakers': 'TestBookie_A,TestBookie_B'}
+
+    print("\n--- TEST RESULT ---")
+    if full_positions != expected_positions:
+        print(f"\n❌ FAIL! Expected full sweeps at requests {expected_positions}, got {full_positions}.")
+    elif any(params != expected_shape for params in shaped):
+        print(f"\n❌ FAIL! Expected shaped requests {expected_shape}, got: {shaped[0]}")
+    else:
+        print("\n✅ PASS! Shaped requests ask only for totals from the two best-price bookmakers, with a full sweep every "
+              f"{config.PLANNER_FULL_SWEEP_EVERY} requests.")
+
 # This is the entry point for running the test script directly.
 if __name__ == "__main__":
+    mock_telegram = None
+    if '--mock' in sys.argv:
+        from mock_servers import MockTelegram
+        mock_telegram = MockTelegram().start()
+        config.TELEGRAM_API_BASE_URL = mock_telegram.base_url
+        config.TELEGRAM_ENABLED = True
+        config.TELEGRAM_BOT_TOKEN = 'test-token'
+        config.TELEGRAM_CHAT_ID = 'test-chat'
+
     run_surebet_test()
+    run_middle_test()
+    run_three_way_test()
+    run_odds_book_test()
+    run_stream_parser_test()
+    run_engine_parity_test()
+    run_price_history_test()
+    run_unwritable_cache_test()
+    run_alert_dispatcher_test()
+    run_request_planner_test()
+
+    if mock_telegram:
+        print(f"\nThe mock Telegram server received {len(mock_telegram.messages)} message(s).")
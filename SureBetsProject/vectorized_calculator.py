@@ -0,0 +1,159 @@
+# vectorized_calculator.py
+# This module contains a batch version of the surebet engine built on NumPy.
+# Instead of looping over each Odd in Python, it packs all the odds of many markets
+# into flat columns (one row per odd) and finds the best prices, margins and profits
+# for every market in a single vectorized pass. Markets may have any number of outcomes
+# (e.g., 3-way h2h); the work is a few linear passes over the rows, whatever the number
+# of bookmakers, and the columns come ready-made from parsing (see models.Market).
+
+import numpy as np
+from models import Game, Market, Odd, make_surebet
+
+class OddsMatrix:
+    """
+    A columnar view of the odds of many markets. Row i of every column describes the same odd.
+    The columns are joined from the price and outcome code arrays each Market fills while it is
+    parsed, so building the matrix costs one step per market rather than one per odd.
+    """
+    def __init__(self, market_pairs: list[tuple[Game, Market]]):
+        self.games = []             # The Game object of each market, indexed by the 'market' column.
+        self.markets = []           # The Market objects, indexed by the 'market' column.
+        price_buffers, code_buffers, counts = [], [], []
+
+        for game, market in market_pairs:
+            # A market needs at least two outcomes to hold a surebet, just like check_market.
+            if len(market.outcome_codes) < 2:
+                continue
+            columns = market
+            if not market.columns_in_sync():
+                # The odds were set on 'outcomes' directly (e.g., by hand in a test): rebuild the columns.
+                columns = Market(key=market.key, point=market.point)
+                columns.add_odds(market.outcomes)
+            self.games.append(game)
+            self.markets.append(market)
+            price_buffers.append(columns.prices)
+            code_buffers.append(columns.codes)
+            counts.append(len(columns.prices))
+
+        counts = np.array(counts, dtype=np.int64)
+        self.price = np.frombuffer(b''.join(price_buffers), dtype=np.float64)
+        self.outcome = np.frombuffer(b''.join(code_buffers), dtype=np.intc).astype(np.int32, copy=False)
+        self.market = np.repeat(np.arange(len(self.markets), dtype=np.int32), counts)
+        self.starts = np.concatenate(([0], np.cumsum(counts)[:-1])).astype(np.int64)  # First row of each market.
+
+    def odd(self, row: int) -> Odd:
+        """Returns the original Odd object of a row."""
+        market_index = int(self.market[row])
+        return self.markets[market_index].outcomes[row - int(self.starts[market_index])]
+
+    def __len__(self):
+        """Returns the number of rows (odds) in the matrix."""
+        return len(self.price)
+
+def best_price_rows(market: np.ndarray, outcome: np.ndarray, price: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Finds the row holding the best price for every (market, outcome) slot.
+
+    Args:
+        market: The market index of each row.
+        outcome: The local outcome index (0, 1, ...) of each row.
+        price: The price of each row.
+
+    Returns:
+        A tuple (best_rows, starts): the row index of the best odd of every slot, ordered by
+        market and then by outcome, and the position in best_rows where each market begins.
+    """
+    # Rows of a market are contiguous and markets are numbered in order, so each (market, outcome)
+    # slot gets a dense index without sorting the rows.
+    slot_count = int(outcome.max()) + 1
+    local_market = (market - market[0]).astype(np.int64)
+    slot = local_market * slot_count + outcome
+    slots = (int(local_market[-1]) + 1) * slot_count
+
+    best_price = np.full(slots, -np.inf)
+    np.maximum.at(best_price, slot, price)
+    # On a tie, the first odd seen wins, which matches the behaviour of find_best_odds.
+    candidates = np.flatnonzero(price == best_price[slot])
+    first_row = np.full(slots, len(price), dtype=np.int64)
+    np.minimum.at(first_row, slot[candidates], candidates)
+    best_rows = first_row[first_row < len(price)]
+
+    best_market = market[best_rows]
+    starts = np.flatnonzero(np.concatenate(([True], best_market[1:] != best_market[:-1])))
+    return best_rows, starts
+
+def evaluate_markets(market: np.ndarray, outcome: np.ndarray, price: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Runs the surebet formula over columnar odds and keeps only the markets that are surebets.
+
+    Args:
+        market: The market index of each row.
+        outcome: The local outcome index (0, 1, ...) of each row.
+        price: The price of each row.
+
+    Returns:
+        A tuple (leg_rows, leg_counts, margins): the rows of the legs of every surebet, one
+        surebet after the other, the number of legs of each surebet, and the margin (sum of
+        1 / price) of each one.
+    """
+    if len(price) == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), np.empty(0)
+
+    best_rows, starts = best_price_rows(market, outcome, price)
+
+    # The core surebet formula, computed for every market at the same time. The legs are added one
+    # position at a time, in the same order as check_market, so the margins match it exactly.
+    inverse = 1 / price[best_rows]
+    leg_counts = np.diff(np.append(starts, len(best_rows)))
+    leg_market = np.repeat(np.arange(len(starts)), leg_counts)
+    leg_position = np.arange(len(best_rows)) - np.repeat(starts, leg_counts)
+    margins = np.zeros(len(starts))
+    for position in range(int(leg_counts.max())):
+        at_position = leg_position == position
+        margins[leg_market[at_position]] += inverse[at_position]
+    is_surebet = margins < 1
+
+    return best_rows[np.repeat(is_surebet, leg_counts)], leg_counts[is_surebet], margins[is_surebet]
+
+def build_surebets(matrix: OddsMatrix, leg_rows: np.ndarray, leg_counts: np.ndarray, margins: np.ndarray) -> list:
+    """
+    Turns surebet rows back into the surebet dictionaries used by the rest of the bot.
+
+    Args:
+        matrix: The OddsMatrix the rows refer to.
+        leg_rows: The rows of the legs of every surebet, one surebet after the other.
+        leg_counts: The number of legs of each surebet.
+        margins: The margin of each surebet.
+
+    Returns:
+        A list of surebet dictionaries.
+    """
+    surebets_found = []
+    leg_rows = leg_rows.tolist()
+    position = 0
+    for leg_count, margin in zip(leg_counts.tolist(), margins.tolist()):
+        rows = leg_rows[position:position + leg_count]
+        position += leg_count
+        surebets_found.append(make_surebet(
+            matrix.games[matrix.market[rows[0]]],
+            matrix.markets[matrix.market[rows[0]]],
+            [matrix.odd(row) for row in rows],
+            margin
+        ))
+    return surebets_found
+
+def find_surebets_vectorized(market_pairs: list[tuple[Game, Market]]) -> list:
+    """
+    Analyzes many markets at once and returns a list of any surebets found.
+    It produces exactly the same surebet dictionaries as check_market.
+
+    Args:
+        market_pairs: A list of (game, market) tuples, typically every market of a sport
+            or only the markets whose odds changed since the last cycle.
+
+    Returns:
+        A list of surebet dictionaries. Returns an empty list if no surebets are found.
+    """
+    matrix = OddsMatrix(market_pairs)
+    leg_rows, leg_counts, margins = evaluate_markets(matrix.market, matrix.outcome, matrix.price)
+    return build_surebets(matrix, leg_rows, leg_counts, margins)